@@ -0,0 +1,107 @@
+# backend/analytics.py
+"""Analyse d'une collection (mots, mentions, vocabulaire), à partir de chapter_stats.
+
+Utilisée par la route GET /collections/<id>/analytics et par le job
+`collection_analytics` (cf. jobs).
+"""
+from collections import Counter
+from sqlalchemy import case
+from .database import db
+from .models import Saga, Tome, Chapter, ChapterStats
+from .text_stats import store_chapter_stats, top_words
+
+STREAM_BATCH = 50
+
+
+def missing_stats_ids(scope_filter) -> list[str]:
+    """Chapitres du périmètre (filtre sur Chapter / Tome / Saga) sans ligne chapter_stats."""
+    return [ch_id for (ch_id,) in (
+        db.session.query(Chapter.id)
+        .join(Tome, Chapter.tome_id == Tome.id)
+        .join(Saga, Tome.saga_id == Saga.id)
+        .outerjoin(ChapterStats, ChapterStats.chapter_id == Chapter.id)
+        .filter(scope_filter, ChapterStats.chapter_id.is_(None))
+    )]
+
+
+def store_missing_stats(chapter_ids) -> None:
+    """Calcule et persiste les stats d'un lot de chapitres (commit)."""
+    for ch_id, content in db.session.query(Chapter.id, Chapter.content).filter(Chapter.id.in_(chapter_ids)).all():
+        store_chapter_stats(ch_id, content)
+    db.session.commit()
+
+
+def backfill_stats(scope_filter, progress=None) -> int:
+    """Stats des chapitres du périmètre qui n'en ont pas, par lots de STREAM_BATCH (un commit par lot).
+
+    Seuls les chapitres antérieurs à chapter_stats sont concernés : les écritures
+    tiennent les stats à jour. Retourne le nombre de chapitres traités.
+    """
+    missing = missing_stats_ids(scope_filter)
+    for start in range(0, len(missing), STREAM_BATCH):
+        store_missing_stats(missing[start:start + STREAM_BATCH])
+        if progress is not None:
+            progress(min(start + STREAM_BATCH, len(missing)) / len(missing))
+    return len(missing)
+
+
+def collection_analytics(collection_id: str, words_limit: int = 100) -> dict:
+    """Stats de tous les chapitres d'une collection, en une seule passe sur `chapters`.
+
+    Les stats viennent de `chapter_stats` ; seul le HTML des chapitres sans stats
+    est lu (et parsé une fois, puis persisté).
+    """
+    missing = ChapterStats.chapter_id.is_(None)
+    q = (
+        db.session.query(
+            Chapter.id, Chapter.title,
+            Tome.id, Tome.name, Saga.id,
+            ChapterStats.word_count, ChapterStats.char_count,
+            ChapterStats.entities, ChapterStats.words,
+            case((missing, Chapter.content), else_=None),
+        )
+        .join(Tome, Chapter.tome_id == Tome.id)
+        .join(Saga, Tome.saga_id == Saga.id)
+        .outerjoin(ChapterStats, ChapterStats.chapter_id == Chapter.id)
+        .filter(Saga.collection_id == collection_id)
+        .order_by(Tome.name.asc(), Tome.id.asc(), Chapter.rank.asc(), Chapter.created_at.asc())
+        .execution_options(yield_per=STREAM_BATCH)
+    )
+
+    chapters, total_words, stored = [], 0, False
+    vocab, vocab_by_tome = Counter(), {}
+    positions = Counter()   # place dans le tome (1..), dans l'ordre des rangs
+    # les lignes sont streamées par lots : on ne garde jamais tout le HTML en mémoire
+    for (ch_id, title, tome_id, tome_name, saga_id,
+         word_count, char_count, entities, words, content) in q:
+        positions[tome_id] += 1
+        if word_count is None:
+            stored = True
+            st = store_chapter_stats(ch_id, content)
+            word_count, char_count, entities, words = st.word_count, st.char_count, st.entities, st.words
+        total_words += word_count
+        vocab.update(words or {})
+        vocab_by_tome.setdefault(tome_id, Counter()).update(words or {})
+        chapters.append({
+            "collectionId": collection_id,
+            "sagaId": saga_id,
+            "tomeId": tome_id,
+            "tomeName": tome_name or "",
+            "chapterId": ch_id,
+            "chapterTitle": title,
+            "position": positions[tome_id],
+            "wordCount": word_count,
+            "charCount": char_count,
+            "entities": entities or [],
+        })
+    if stored:
+        db.session.commit()
+
+    return {
+        "collectionId": collection_id,
+        "totalWords": total_words,
+        "totalChapters": len(chapters),
+        "chapters": chapters,
+        "topWords": top_words(vocab, words_limit),
+        "topWordsByTome": {tid: top_words(c, words_limit) for tid, c in vocab_by_tome.items()},
+    }
@@ -1,14 +1,20 @@
-from flask import Flask, request
+from flask import Flask
 from flask_cors import CORS
-from .database import db
+from .database import db, init_db, database_uri
 from .routes.registerRoutes import register_routes
+from . import (
+    search, chapter_revisions, jobs, query_plans, instrumentation, project_tree, json_provider, compression,
+    map_storage, timeline_index, event_histogram,
+)
 from flask_migrate import Migrate
 
 
 def create_app(test_config=None):
     app = Flask(__name__, static_folder=None)
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///wanvil.sqlite'
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_uri()
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    if test_config:
+        app.config.update(test_config)
 
     CORS(app, resources={
         r"/api/*": {
@@ -21,16 +27,23 @@ def create_app(test_config=None):
         }
     })
 
-    @app.before_request
-    def log_request():
-        print("REQUEST:", request.method, request.path)
-
     @app.get("/ping")
     def ping():
         return {"ok": True}, 200
 
-    db.init_app(app)
+    init_db(app)
+    json_provider.init_app(app)
+    instrumentation.init_app(app)
+    compression.init_app(app)
     Migrate(app, db)
+    search.init_app(app)
+    chapter_revisions.init_app(app)
+    jobs.init_app(app)
+    query_plans.init_app(app)
+    project_tree.init_app(app)
+    map_storage.init_app(app)
+    timeline_index.init_app(app)
+    event_histogram.init_app(app)
 
     register_routes(app)
 
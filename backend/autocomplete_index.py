@@ -0,0 +1,218 @@
+# backend/autocomplete_index.py
+"""Index de préfixes en mémoire pour l'auto-complétion.
+
+Par collection : une liste triée de clés (label sans accents, découpé à chaque
+début de mot, + le hint) parcourue par bisect. L'index est construit à la
+première requête, tenu à jour par les routes create/update/delete des entités,
+et les collections les moins récemment utilisées sont évincées au-delà de
+AUTOCOMPLETE_INDEX_BUDGET octets (estimation).
+
+L'index vit dans le process : avec plusieurs workers, AUTOCOMPLETE_INDEX_TTL
+borne la durée pendant laquelle un worker peut ignorer l'écriture d'un autre.
+"""
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from threading import RLock
+from flask import current_app
+from .database import db
+from .models import Character, Place, Item, Event
+
+DEFAULT_BUDGET = 32 * 1024 * 1024
+DEFAULT_TTL = 300
+
+# poids de classement (plus petit = mieux)
+_EXACT, _LABEL_PREFIX, _WORD_PREFIX, _HINT_PREFIX = 0, 1, 2, 3
+_MAX_WEIGHT = _HINT_PREFIX + 1
+
+_MAX = "\U0010ffff"
+
+
+def fold(s: str) -> str:
+    """Minuscules sans accents ('Élodie' -> 'elodie')."""
+    s = unicodedata.normalize("NFKD", s or "")
+    return "".join(ch for ch in s if not unicodedata.combining(ch)).casefold().strip()
+
+
+def _event_hint(start, end):
+    s = start.isoformat() if start else ""
+    return f"{s} → {end.isoformat()}" if end else s
+
+
+def entry_for(obj) -> dict:
+    """Ligne d'auto-complétion d'une entité ORM."""
+    if isinstance(obj, Character):
+        return {"id": obj.id, "type": "character",
+                "label": f"{obj.firstname} {obj.lastname}".strip(), "hint": None}
+    if isinstance(obj, Place):
+        return {"id": obj.id, "type": "place", "label": obj.name, "hint": obj.location}
+    if isinstance(obj, Item):
+        return {"id": obj.id, "type": "item", "label": obj.name, "hint": obj.category}
+    if isinstance(obj, Event):
+        return {"id": obj.id, "type": "event", "label": obj.name,
+                "hint": _event_hint(obj.start_date, obj.end_date)}
+    raise TypeError(f"not an autocomplete entity: {type(obj).__name__}")
+
+
+def _keys_for(entry):
+    """(clé, poids) : label complet, chaque suffixe commençant à un mot, hint."""
+    label = fold(entry["label"])
+    keys = [(label, _LABEL_PREFIX)]
+    words = label.split()
+    for i in range(1, len(words)):
+        keys.append((" ".join(words[i:]), _WORD_PREFIX))
+    if entry["type"] in ("place", "item") and entry["hint"]:
+        keys.append((fold(entry["hint"]), _HINT_PREFIX))
+    return keys
+
+
+class _CollectionIndex:
+    def __init__(self):
+        self.keys = []        # [(clé, type, id, poids)] trié
+        self.entries = {}     # (type, id) -> entry
+        self.sort_keys = {}   # (type, id) -> label replié (tri secondaire)
+        self.size = 0         # estimation mémoire (octets)
+        self.built_at = time.monotonic()
+
+    @staticmethod
+    def _cost(key):
+        return 120 + 2 * len(key)
+
+    def add(self, entry):
+        ref = (entry["type"], entry["id"])
+        self.remove(*ref)
+        self.entries[ref] = entry
+        self.sort_keys[ref] = fold(entry["label"])
+        self.size += 300 + 2 * len(entry["label"] or "")
+        for key, weight in _keys_for(entry):
+            insort(self.keys, (key, entry["type"], entry["id"], weight))
+            self.size += self._cost(key)
+
+    def load(self, entries):
+        """Chargement initial : un seul tri au lieu d'un insort par clé."""
+        for entry in entries:
+            ref = (entry["type"], entry["id"])
+            self.entries[ref] = entry
+            self.sort_keys[ref] = fold(entry["label"])
+            self.size += 300 + 2 * len(entry["label"] or "")
+            for key, weight in _keys_for(entry):
+                self.keys.append((key, entry["type"], entry["id"], weight))
+                self.size += self._cost(key)
+        self.keys.sort()
+
+    def remove(self, etype, eid):
+        entry = self.entries.pop((etype, eid), None)
+        if entry is None:
+            return
+        del self.sort_keys[(etype, eid)]
+        self.size -= 300 + 2 * len(entry["label"] or "")
+        for key, weight in _keys_for(entry):
+            row = (key, etype, eid, weight)
+            i = bisect_left(self.keys, row)
+            if i < len(self.keys) and self.keys[i] == row:
+                del self.keys[i]
+                self.size -= self._cost(key)
+
+    def lookup(self, q, limit):
+        fq = fold(q)
+        lo = bisect_left(self.keys, (fq,))
+        hi = bisect_left(self.keys, (fq + _MAX,), lo)
+        best = {}
+        for key, etype, eid, weight in self.keys[lo:hi]:
+            if weight == _LABEL_PREFIX and key == fq:
+                weight = _EXACT
+            ref = (etype, eid)
+            if weight < best.get(ref, _MAX_WEIGHT):
+                best[ref] = weight
+        ranked = sorted(best.items(), key=lambda kv: (kv[1], self.sort_keys[kv[0]], kv[0]))
+        return [self.entries[ref] for ref, _w in ranked[:limit]]
+
+
+_lock = RLock()
+_indexes: "OrderedDict[str, _CollectionIndex]" = OrderedDict()
+_total_size = 0
+
+
+def _build(collection_id) -> _CollectionIndex:
+    entries = []
+    rows = db.session.query(Character.id, Character.firstname, Character.lastname).filter_by(collection_id=collection_id)
+    entries += [{"id": cid, "type": "character", "label": f"{first} {last}".strip(), "hint": None}
+                for cid, first, last in rows]
+    rows = db.session.query(Place.id, Place.name, Place.location).filter_by(collection_id=collection_id)
+    entries += [{"id": pid, "type": "place", "label": name, "hint": location} for pid, name, location in rows]
+    rows = db.session.query(Item.id, Item.name, Item.category).filter_by(collection_id=collection_id)
+    entries += [{"id": iid, "type": "item", "label": name, "hint": category} for iid, name, category in rows]
+    rows = db.session.query(Event.id, Event.name, Event.start_date, Event.end_date).filter_by(collection_id=collection_id)
+    entries += [{"id": eid, "type": "event", "label": name, "hint": _event_hint(start, end)}
+                for eid, name, start, end in rows]
+    idx = _CollectionIndex()
+    idx.load(entries)
+    return idx
+
+
+def _account(delta):
+    """Ajuste la taille totale et évince les index LRU au-delà du budget."""
+    global _total_size
+    _total_size += delta
+    budget = current_app.config.get("AUTOCOMPLETE_INDEX_BUDGET", DEFAULT_BUDGET)
+    while _total_size > budget and len(_indexes) > 1:
+        _cid, old = _indexes.popitem(last=False)
+        _total_size -= old.size
+
+
+def _get(collection_id) -> _CollectionIndex:
+    ttl = current_app.config.get("AUTOCOMPLETE_INDEX_TTL", DEFAULT_TTL)
+    with _lock:
+        idx = _indexes.get(collection_id)
+        if idx is not None and time.monotonic() - idx.built_at < ttl:
+            _indexes.move_to_end(collection_id)
+            return idx
+    # construction hors verrou : les autres collections restent servies
+    idx = _build(collection_id)
+    with _lock:
+        drop(collection_id)
+        _indexes[collection_id] = idx
+        _account(idx.size)
+    return idx
+
+
+def is_loaded(collection_id: str) -> bool:
+    return collection_id in _indexes
+
+
+def lookup(collection_id: str, q: str, limit: int = 10) -> list[dict]:
+    idx = _get(collection_id)
+    with _lock:
+        return idx.lookup(q, limit)
+
+
+def refresh(obj):
+    """À appeler après commit d'une création / modification d'entité."""
+    with _lock:
+        idx = _indexes.get(obj.collection_id)
+        if idx is None:
+            return  # pas encore construit : il le sera à la prochaine requête
+        before = idx.size
+        idx.add(entry_for(obj))
+        _account(idx.size - before)
+
+
+def discard(collection_id: str, etype: str, eid: str):
+    """À appeler après suppression d'une entité."""
+    with _lock:
+        idx = _indexes.get(collection_id)
+        if idx is None:
+            return
+        before = idx.size
+        idx.remove(etype, eid)
+        _account(idx.size - before)
+
+
+def drop(collection_id: str):
+    """Oublie l'index d'une collection (suppression, import...)."""
+    global _total_size
+    with _lock:
+        idx = _indexes.pop(collection_id, None)
+        if idx is not None:
+            _total_size -= idx.size
@@ -0,0 +1,174 @@
+# backend/chapter_ops.py
+"""Sauvegardes incrémentales des chapitres (journal d'opérations texte).
+
+Le client envoie des opérations `{at, delete, insert}` calculées contre une
+version connue (`baseVersion`, hash de content + notes). Les opérations sont
+ajoutées à `chapter_ops` ; `Chapter.content` / `Chapter.notes` ne sont
+réécrits (snapshot compacté) que toutes les CHAPTER_OPS_SNAPSHOT_EVERY
+opérations, ou lors d'un PUT classique.
+
+Entre deux snapshots, la version courante d'un chapitre = snapshot + ops en
+attente : les lecteurs du texte passent par `materialize()`. Chaque ajout
+d'ops touche `updated_at` et recalcule les stats (chapter_stats) et la ligne
+de recherche sur le texte courant : ils n'attendent pas la compaction.
+
+Les positions sont en unités UTF-16 (String.length / indices côté JS).
+"""
+import hashlib
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import func, select
+from sqlalchemy.orm import aliased
+from .database import db
+from .models import Chapter, ChapterOp
+from . import lexorank
+from .text_stats import refresh_chapter_stats
+from . import search
+
+DEFAULT_SNAPSHOT_EVERY = 20
+
+TEXT_FIELDS = ("content", "notes")
+
+
+class StaleVersion(Exception):
+    def __init__(self, current):
+        super().__init__("stale base version")
+        self.current = current
+
+
+class InvalidOps(ValueError):
+    pass
+
+
+def document_version(content: str, notes: str) -> str:
+    h = hashlib.sha1()
+    h.update((content or "").encode("utf-8"))
+    h.update(b"\0")
+    h.update((notes or "").encode("utf-8"))
+    return h.hexdigest()
+
+
+def apply_ops(text: str, ops) -> str:
+    """Applique des ops `{at, delete, insert}` successives (positions UTF-16)."""
+    if not ops:
+        return text or ""
+    if not isinstance(ops, list):
+        raise InvalidOps("ops must be a list")
+    buf = bytearray((text or "").encode("utf-16-le"))
+    for op in ops:
+        if not isinstance(op, dict):
+            raise InvalidOps("each op must be an object")
+        at, delete, insert = op.get("at"), op.get("delete", 0), op.get("insert", "")
+        if not isinstance(at, int) or not isinstance(delete, int) or not isinstance(insert, str):
+            raise InvalidOps("op fields: at (int), delete (int), insert (str)")
+        size = len(buf) // 2
+        if at < 0 or delete < 0 or at + delete > size:
+            raise InvalidOps(f"op out of range (at={at}, delete={delete}, length={size})")
+        buf[2 * at:2 * (at + delete)] = insert.encode("utf-16-le")
+    try:
+        return buf.decode("utf-16-le")
+    except UnicodeDecodeError:
+        raise InvalidOps("op splits a surrogate pair")
+
+
+def pending_query(chapter_id, after_seq):
+    """Ops du chapitre postérieures au snapshot (seq > after_seq), dans l'ordre."""
+    return (ChapterOp.query
+            .filter(ChapterOp.chapter_id == chapter_id, ChapterOp.seq > after_seq)
+            .order_by(ChapterOp.seq.asc()))
+
+
+def _pending(chapter):
+    return pending_query(chapter.id, chapter.ops_seq or 0).all()
+
+
+def materialize(chapter):
+    """(content, notes, version, seq) courants : snapshot + ops en attente."""
+    content, notes = chapter.content or "", chapter.notes or ""
+    pending = _pending(chapter)
+    for op in pending:
+        content = apply_ops(content, op.ops.get("content"))
+        notes = apply_ops(notes, op.ops.get("notes"))
+    if pending:
+        return content, notes, pending[-1].version, pending[-1].seq
+    return content, notes, document_version(content, notes), chapter.ops_seq or 0
+
+
+def chapter_stamp(chapter_id):
+    """(updated_at ou created_at, hash de la dernière op en attente, position 1..) sans lire le texte ;
+    None si absent. Parties de l'ETag d'un chapitre.
+
+    Le hash de la dernière op change à chaque sauvegarde incrémentale, updated_at
+    aux autres écritures (PUT, compaction, déplacement...). La position change
+    aussi quand un autre chapitre du tome est déplacé ou supprimé.
+    """
+    last_op = (
+        select(ChapterOp.version)
+        .where(ChapterOp.chapter_id == Chapter.id, ChapterOp.seq > Chapter.ops_seq)
+        .order_by(ChapterOp.seq.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    sibling = aliased(Chapter)
+    before = (
+        select(func.count())
+        .select_from(sibling)
+        .where(sibling.tome_id == Chapter.tome_id, sibling.rank < Chapter.rank)
+        .scalar_subquery()
+    )
+    row = (db.session.query(Chapter.updated_at, Chapter.created_at, last_op, before)
+           .filter(Chapter.id == chapter_id)
+           .first())
+    if row is None:
+        return None
+    updated, created, version, before = row
+    return updated or created, version, before + 1
+
+
+def chapter_payload(chapter, state=None, position=None):
+    """Chapter.to_dict() avec le texte courant, sa version et sa position (1..) dans le tome."""
+    content, notes, version, _seq = state or materialize(chapter)
+    if position is None:
+        position = lexorank.index_of("chapters", chapter) + 1
+    return {**chapter.to_dict(), "content": content, "notes": notes, "version": version, "position": position}
+
+
+def compact(chapter, state=None):
+    """Écrit le texte courant dans le chapitre et purge le journal (sans commit)."""
+    content, notes, _version, seq = state or materialize(chapter)
+    chapter.content, chapter.notes = content, notes
+    if seq != (chapter.ops_seq or 0):
+        chapter.ops_seq = seq
+        ChapterOp.query.filter(ChapterOp.chapter_id == chapter.id, ChapterOp.seq <= seq).delete()
+    refresh_chapter_stats(chapter)
+
+
+def append_ops(chapter, base_version: str, changes: dict):
+    """Applique `changes` ({content: [ops], notes: [ops]}) si `base_version` est à jour.
+
+    Retourne (version, seq, compacted). Lève StaleVersion / InvalidOps. Sans commit.
+    """
+    content, notes, version, seq = materialize(chapter)
+    if base_version != version:
+        raise StaleVersion(version)
+    ops = {f: changes[f] for f in TEXT_FIELDS if changes.get(f)}
+    if not ops:
+        return version, seq, False
+    content = apply_ops(content, ops.get("content"))
+    notes = apply_ops(notes, ops.get("notes"))
+    new_version = document_version(content, notes)
+    seq += 1
+    db.session.add(ChapterOp(chapter_id=chapter.id, seq=seq, base_version=version,
+                             version=new_version, ops=ops))
+
+    every = current_app.config.get("CHAPTER_OPS_SNAPSHOT_EVERY", DEFAULT_SNAPSHOT_EVERY)
+    compacted = seq - (chapter.ops_seq or 0) >= every
+    if compacted:
+        db.session.flush()
+        compact(chapter, (content, notes, new_version, seq))
+    else:
+        chapter.updated_at = datetime.utcnow()   # snapshot inchangé : onupdate ne joue pas
+        if "content" in ops:
+            refresh_chapter_stats(chapter, content)
+            search.index_chapter(chapter, content)
+    return new_version, seq, compacted
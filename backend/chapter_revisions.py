@@ -0,0 +1,291 @@
+# backend/chapter_revisions.py
+"""Historique des chapitres : keyframes + deltas compressés (zlib).
+
+Chaque snapshot du texte (création, PUT, compaction des ops) ajoute une ligne
+à `chapter_revisions`. Une révision est soit une keyframe (document complet),
+soit un delta contre la révision précédente. Une nouvelle keyframe est posée
+toutes les CHAPTER_REVISIONS_KEYFRAME_EVERY révisions, ou dès que les deltas
+accumulés depuis la dernière keyframe pèsent plus qu'elle : relire une
+révision coûte au plus une keyframe + quelques deltas, et le stockage reste
+de l'ordre de deux keyframes compressées par fenêtre.
+
+Delta : liste de `[début, longueur]` (copie depuis la révision précédente) ou
+de chaînes (texte inséré), calculée sur des jetons balise / mot.
+
+Les keyframes relues sont gardées dans un LRU (CHAPTER_REVISIONS_CACHE_BUDGET
+octets, estimation) : une révision est immuable, le cache n'est jamais invalidé.
+"""
+import json
+import re
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from difflib import SequenceMatcher
+from threading import RLock
+import click
+from flask import current_app
+from sqlalchemy import func
+from .database import db
+from .models import Chapter, ChapterRevision
+from .chapter_ops import document_version
+
+DEFAULT_KEYFRAME_EVERY = 25
+DEFAULT_CACHE_BUDGET = 16 * 1024 * 1024
+
+FIELDS = ("content", "notes")
+
+# balise | mot (+ espaces qui suivent) | espaces | '<' isolé : couvre tout le texte
+_TOKEN_RE = re.compile(r"<[^>]*>|[^<\s]+\s*|\s+|<")
+
+
+# ---------- Deltas ----------------------------------------------------------
+
+def make_delta(old: str, new: str) -> list:
+    """Delta minimal (au jeton près) pour passer de `old` à `new`."""
+    if old == new:
+        return [[0, len(old)]] if old else []
+    # préfixe / suffixe communs : le cas courant d'une édition locale
+    n = min(len(old), len(new))
+    pre = 0
+    while pre < n and old[pre] == new[pre]:
+        pre += 1
+    suf = 0
+    while suf < n - pre and old[-1 - suf] == new[-1 - suf]:
+        suf += 1
+    a = _TOKEN_RE.findall(old[pre:len(old) - suf])
+    b = _TOKEN_RE.findall(new[pre:len(new) - suf])
+
+    delta = []
+    def copy(start, length):
+        if length <= 0:
+            return
+        if delta and isinstance(delta[-1], list) and sum(delta[-1]) == start:
+            delta[-1][1] += length
+        else:
+            delta.append([start, length])
+    def insert(s):
+        if not s:
+            return
+        if delta and isinstance(delta[-1], str):
+            delta[-1] += s
+        else:
+            delta.append(s)
+
+    copy(0, pre)
+    offsets, pos = [], pre
+    for tok in a:
+        offsets.append(pos)
+        pos += len(tok)
+    offsets.append(pos)
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, a, b).get_opcodes():
+        if tag == "equal":
+            copy(offsets[i1], offsets[i2] - offsets[i1])
+        else:
+            insert("".join(b[j1:j2]))
+    copy(len(old) - suf, suf)
+    return delta
+
+
+def apply_delta(old: str, delta: list) -> str:
+    return "".join(x if isinstance(x, str) else old[x[0]:x[0] + x[1]] for x in delta)
+
+
+def _pack(obj) -> bytes:
+    return zlib.compress(json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 6)
+
+
+def _unpack(data: bytes):
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+# ---------- LRU des keyframes -----------------------------------------------
+
+_lock = RLock()
+_cache: "OrderedDict[tuple, dict]" = OrderedDict()
+_cache_size = 0
+
+
+def _doc_cost(doc) -> int:
+    return 200 + 2 * sum(len(doc[f]) for f in FIELDS)
+
+
+def _cache_get(key):
+    with _lock:
+        doc = _cache.get(key)
+        if doc is not None:
+            _cache.move_to_end(key)
+        return doc
+
+
+def _cache_put(key, doc):
+    global _cache_size
+    budget = current_app.config.get("CHAPTER_REVISIONS_CACHE_BUDGET", DEFAULT_CACHE_BUDGET)
+    with _lock:
+        if key in _cache:
+            return
+        _cache[key] = doc
+        _cache_size += _doc_cost(doc)
+        while _cache_size > budget and len(_cache) > 1:
+            _key, old = _cache.popitem(last=False)
+            _cache_size -= _doc_cost(old)
+
+
+# ---------- Lecture ---------------------------------------------------------
+
+def load_revision(chapter_id: str, number: int):
+    """Document {content, notes} de la révision `number` (None si absente)."""
+    key = (
+        db.session.query(func.max(ChapterRevision.number))
+        .filter(ChapterRevision.chapter_id == chapter_id,
+                ChapterRevision.number <= number,
+                ChapterRevision.is_keyframe.is_(True))
+        .scalar()
+    )
+    if key is None:
+        return None
+    rows = (
+        db.session.query(ChapterRevision.number, ChapterRevision.data)
+        .filter(ChapterRevision.chapter_id == chapter_id,
+                ChapterRevision.number > key, ChapterRevision.number <= number)
+        .order_by(ChapterRevision.number.asc())
+        .all()
+    )
+    if key != number and (not rows or rows[-1][0] != number):
+        return None
+    doc = _cache_get((chapter_id, key))
+    if doc is None:
+        data = (db.session.query(ChapterRevision.data)
+                .filter_by(chapter_id=chapter_id, number=key).scalar())
+        doc = _unpack(data)
+        _cache_put((chapter_id, key), doc)
+    for _n, data in rows:
+        delta = _unpack(data)
+        doc = {f: apply_delta(doc[f], delta.get(f, [])) for f in FIELDS}
+    return doc
+
+
+def revisions_query(chapter_id: str):
+    """Métadonnées des révisions du chapitre, la plus récente d'abord (sans les données)."""
+    return (
+        db.session.query(
+            ChapterRevision.number, ChapterRevision.version, ChapterRevision.is_keyframe,
+            ChapterRevision.size, func.length(ChapterRevision.data), ChapterRevision.created_at,
+        )
+        .filter(ChapterRevision.chapter_id == chapter_id)
+        .order_by(ChapterRevision.number.desc())
+    )
+
+
+def list_revisions(chapter_id: str) -> list[dict]:
+    rows = revisions_query(chapter_id).all()
+    return [{
+        "number": number,
+        "version": version,
+        "keyframe": bool(is_key),
+        "size": size,
+        "storedBytes": stored,
+        "createdAt": created.isoformat() if created else None,
+    } for number, version, is_key, size, stored, created in rows]
+
+
+# ---------- Écriture --------------------------------------------------------
+
+def record_revision(chapter: Chapter):
+    """Ajoute une révision pour le snapshot courant du chapitre (sans commit).
+
+    Sans effet si le texte n'a pas changé depuis la dernière révision.
+    """
+    doc = {"content": chapter.content or "", "notes": chapter.notes or ""}
+    version = document_version(doc["content"], doc["notes"])
+    last = (
+        db.session.query(ChapterRevision.number, ChapterRevision.version)
+        .filter(ChapterRevision.chapter_id == chapter.id)
+        .order_by(ChapterRevision.number.desc())
+        .first()
+    )
+    if last is not None and last[1] == version:
+        return None
+
+    rev = ChapterRevision(chapter_id=chapter.id, version=version,
+                          size=sum(len(doc[f]) for f in FIELDS))
+    keyframe = _pack(doc)
+    if last is None:
+        rev.number, rev.is_keyframe, rev.data = 1, True, keyframe
+    else:
+        rev.number = last[0] + 1
+        rev.is_keyframe, rev.data = _delta_or_keyframe(chapter.id, last[0], doc, keyframe)
+    db.session.add(rev)
+    return rev
+
+
+def _delta_or_keyframe(chapter_id, previous, doc, keyframe):
+    every = current_app.config.get("CHAPTER_REVISIONS_KEYFRAME_EVERY", DEFAULT_KEYFRAME_EVERY)
+    key_number = (
+        db.session.query(func.max(ChapterRevision.number))
+        .filter(ChapterRevision.chapter_id == chapter_id, ChapterRevision.is_keyframe.is_(True))
+        .scalar()
+    )
+    if previous + 1 - key_number >= every:
+        return True, keyframe
+    base = load_revision(chapter_id, previous)
+    if base is None:
+        return True, keyframe
+    delta = _pack({f: make_delta(base[f], doc[f]) for f in FIELDS})
+    window = (
+        db.session.query(func.coalesce(func.sum(func.length(ChapterRevision.data)), 0))
+        .filter(ChapterRevision.chapter_id == chapter_id, ChapterRevision.number > key_number)
+        .scalar()
+    )
+    if window + len(delta) > len(keyframe):
+        return True, keyframe
+    return False, delta
+
+
+def prune_revisions(chapter_id: str, before: datetime) -> int:
+    """Supprime les révisions antérieures à `before` (la dernière est toujours gardée).
+
+    La plus ancienne révision conservée est réécrite en keyframe si besoin.
+    Retourne le nombre de révisions supprimées (sans commit).
+    """
+    rows = (
+        db.session.query(ChapterRevision.number, ChapterRevision.is_keyframe, ChapterRevision.created_at)
+        .filter(ChapterRevision.chapter_id == chapter_id)
+        .order_by(ChapterRevision.number.asc())
+        .all()
+    )
+    if not rows:
+        return 0
+    keep = next((i for i, r in enumerate(rows) if r[2] is not None and r[2] >= before), len(rows) - 1)
+    if keep == 0:
+        return 0
+    number, is_key, _created = rows[keep]
+    if not is_key:
+        doc = load_revision(chapter_id, number)
+        (ChapterRevision.query
+         .filter_by(chapter_id=chapter_id, number=number)
+         .update({ChapterRevision.is_keyframe: True, ChapterRevision.data: _pack(doc)},
+                 synchronize_session=False))
+        _cache_put((chapter_id, number), doc)
+    return (ChapterRevision.query
+            .filter(ChapterRevision.chapter_id == chapter_id, ChapterRevision.number < number)
+            .delete(synchronize_session=False))
+
+
+def prune_all(before: datetime) -> int:
+    chapter_ids = [cid for (cid,) in (
+        db.session.query(ChapterRevision.chapter_id)
+        .filter(ChapterRevision.created_at < before)
+        .distinct()
+    )]
+    n = sum(prune_revisions(cid, before) for cid in chapter_ids)
+    db.session.commit()
+    return n
+
+
+def init_app(app):
+    @app.cli.command("revisions-prune")
+    @click.option("--days", type=int, default=90, show_default=True)
+    def revisions_prune_command(days):
+        """Supprime les révisions de chapitres plus anciennes que N jours."""
+        n = prune_all(datetime.utcnow() - timedelta(days=days))
+        print(f"{n} révisions supprimées")
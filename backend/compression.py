@@ -0,0 +1,84 @@
+# backend/compression.py
+"""Compression des réponses (Content-Encoding br / gzip).
+
+Seules les réponses textuelles (JSON, HTML, texte...) d'au moins
+COMPRESS_MIN_SIZE octets sont compressées, selon l'Accept-Encoding du client :
+brotli s'il est installé (pip install brotli, facultatif) et accepté, sinon
+gzip. Les flux (export, send_file) et les réponses déjà encodées passent tels
+quels.
+
+Le corps compressé n'est plus identique octet pour octet : un ETag fort devient
+faible (W/"..."), ce que `conditional.not_modified` accepte déjà.
+
+Options (config) :
+- COMPRESS_ENABLED (défaut : True) ;
+- COMPRESS_MIN_SIZE (défaut : 1024 octets) ;
+- COMPRESS_GZIP_LEVEL (défaut : 6), COMPRESS_BROTLI_QUALITY (défaut : 5) :
+  compromis taux / CPU pour des réponses produites à chaque requête.
+"""
+import gzip
+from flask import request
+
+try:
+    import brotli  # pip install brotli (facultatif)
+except ImportError:
+    brotli = None
+
+DEFAULT_MIN_SIZE = 1024
+
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+}
+
+
+def _compressible(response) -> bool:
+    mimetype = response.mimetype or ""
+    return mimetype.startswith("text/") or mimetype in COMPRESSIBLE_TYPES
+
+
+def choose_encoding(accept_encodings):
+    """Meilleur encodage accepté par le client (None : pas de compression)."""
+    if brotli is not None and accept_encodings["br"]:
+        return "br"
+    if accept_encodings["gzip"]:
+        return "gzip"
+    return None
+
+
+def compress(data: bytes, encoding: str, config) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=config.get("COMPRESS_BROTLI_QUALITY", 5))
+    return gzip.compress(data, compresslevel=config.get("COMPRESS_GZIP_LEVEL", 6), mtime=0)
+
+
+def init_app(app):
+    """À appeler après instrumentation.init_app : les after_request s'exécutent
+    dans l'ordre inverse, la taille mesurée est donc celle envoyée."""
+    if not app.config.get("COMPRESS_ENABLED", True):
+        return
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code < 200 or response.status_code in (204, 206, 304)
+                or response.direct_passthrough or response.is_streamed
+                or "Content-Encoding" in response.headers
+                or not _compressible(response)):
+            return response
+        # la représentation dépend de l'Accept-Encoding, même si celui-ci ne demande rien
+        response.vary.add("Accept-Encoding")
+        min_size = app.config.get("COMPRESS_MIN_SIZE", DEFAULT_MIN_SIZE)
+        if (response.content_length or 0) < min_size:
+            return response
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        response.set_data(compress(response.get_data(), encoding, app.config))
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
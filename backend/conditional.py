@@ -0,0 +1,58 @@
+# backend/conditional.py
+"""GET conditionnels : ETag / Last-Modified et réponses 304.
+
+Les routes calculent d'abord un tampon de version bon marché (updated_at,
+hash de contenu, agrégats max/count...) et appellent `not_modified()` avant
+de construire la réponse complète ; sinon `with_validators()` pose les en-têtes.
+
+`Cache-Control: no-cache` : le navigateur garde la réponse mais revalide à
+chaque fetch (If-None-Match), ce qui suffit au front sans code particulier.
+"""
+import hashlib
+from datetime import timezone
+from flask import request, Response
+
+
+def make_etag(*parts) -> str:
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(b"\0")
+        h.update(("" if part is None else part.isoformat() if hasattr(part, "isoformat") else str(part))
+                 .encode("utf-8"))
+    return h.hexdigest()
+
+
+def _http_date(dt):
+    """datetime naïf (UTC, comme les colonnes *_at) -> aware, à la seconde."""
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.replace(microsecond=0)
+
+
+def with_validators(response, etag: str, last_modified=None):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = _http_date(last_modified)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def not_modified(etag: str, last_modified=None):
+    """Réponse 304 si le client a déjà cette version, sinon None.
+
+    If-None-Match prime sur If-Modified-Since (RFC 9110) ; la comparaison est
+    faible : un ETag réécrit en W/"..." par un proxy (compression) reste valide.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return None
+    if request.if_none_match:
+        fresh = request.if_none_match.contains_weak(etag)
+    elif last_modified is not None and request.if_modified_since is not None:
+        fresh = _http_date(last_modified) <= request.if_modified_since
+    else:
+        fresh = False
+    if not fresh:
+        return None
+    return with_validators(Response(status=304), etag, last_modified)
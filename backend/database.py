@@ -1,3 +1,79 @@
+"""Base de données : instance SQLAlchemy et configuration du moteur.
+
+URL : variable d'environnement DATABASE_URL (ex. `postgresql+psycopg://user:pw@host/wanvil`,
+driver à installer à part), sinon `sqlite:///wanvil.sqlite` dans le dossier instance.
+
+SQLite : chaque connexion reçoit les PRAGMA de SQLITE_PRAGMAS (WAL par défaut :
+les lecteurs ne bloquent plus derrière un écrivain, et un commit n'attend plus
+de fsync avec synchronous=NORMAL). Pool de connexions : DB_POOL_SIZE,
+DB_MAX_OVERFLOW, DB_POOL_TIMEOUT (+ pre-ping / recyclage côté serveur).
+"""
+import os
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+db = SQLAlchemy()
+
+DEFAULT_DATABASE_URI = "sqlite:///wanvil.sqlite"
+
+DEFAULT_SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,     # en Kio (négatif) : 64 Mio par connexion
+    "busy_timeout": 5000,         # ms d'attente sur un verrou avant SQLITE_BUSY
+    "temp_store": "MEMORY",
+}
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_MAX_OVERFLOW = 20
+DEFAULT_POOL_TIMEOUT = 30
+
+
+def database_uri() -> str:
+    url = os.environ.get("DATABASE_URL") or DEFAULT_DATABASE_URI
+    # URL au format Heroku / docker (postgres://) : nom de dialecte attendu par SQLAlchemy
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    return url
+
+
+def _is_memory(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def engine_options(config) -> dict:
+    """Options du moteur (pool) ; SQLALCHEMY_ENGINE_OPTIONS garde la priorité."""
+    url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    options = {}
+    if not _is_memory(url):  # SQLite en mémoire : SingletonThreadPool, sans taille
+        options.update(
+            pool_size=config.get("DB_POOL_SIZE", DEFAULT_POOL_SIZE),
+            max_overflow=config.get("DB_MAX_OVERFLOW", DEFAULT_MAX_OVERFLOW),
+            pool_timeout=config.get("DB_POOL_TIMEOUT", DEFAULT_POOL_TIMEOUT),
+        )
+    if url.get_backend_name() != "sqlite":
+        options.update(pool_pre_ping=True, pool_recycle=1800)
+    options.update(config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    return options
+
+
+def _sqlite_pragmas(pragmas):
+    def on_connect(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+    return on_connect
+
 
-db = SQLAlchemy()
\ No newline at end of file
+def init_db(app):
+    """db.init_app avec les options de pool et les PRAGMA SQLite de la config."""
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app.config)
+    db.init_app(app)
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name == "sqlite":
+        pragmas = {**DEFAULT_SQLITE_PRAGMAS, **(app.config.get("SQLITE_PRAGMAS") or {})}
+        event.listen(engine, "connect", _sqlite_pragmas(pragmas))
@@ -0,0 +1,322 @@
+# backend/entity_batch.py
+"""Mutations groupées sur les fiches d'une collection (personnages, lieux, objets, événements).
+
+Une requête = une liste d'opérations appliquées dans une seule transaction
+(un seul commit, donc un seul fsync) :
+
+    {"op": "create", "type": "character", "data": {...}}           # data : comme le POST
+    {"op": "update", "type": "place", "id": "...", "data": {...}}  # data : comme le PUT
+    {"op": "delete", "type": "item", "id": "..."}
+    {"op": "tag", "type": "character", "ids": [...], "add": [tagIds], "remove": [tagIds]}
+    {"op": "tag", "type": "event", "ids": [...], "set": [tagIds]}
+
+Les fiches visées et tous les tags cités sont chargés en une requête par type
+(portée et collection vérifiées une fois) ; les opérations `tag` écrivent les
+tables d'association directement, par lots. Tout ou rien : à la première
+opération invalide, rien n'est écrit et chaque opération reçoit son résultat
+(ok ou erreur).
+"""
+import uuid
+from datetime import date
+from sqlalchemy import delete, insert, select
+from .database import db
+from .models import Character, CharacterTag, Place, PlaceTag, Item, ItemTag, Event, EventTag, Tag
+from . import autocomplete_index
+
+MAX_OPERATIONS = 1000
+
+OPS = ("create", "update", "delete", "tag")
+
+# type -> (modèle, table d'association, colonne de la fiche dans l'association)
+ENTITY_TYPES = {
+    "character": (Character, CharacterTag, CharacterTag.character_id),
+    "place": (Place, PlaceTag, PlaceTag.place_id),
+    "item": (Item, ItemTag, ItemTag.item_id),
+    "event": (Event, EventTag, EventTag.event_id),
+}
+
+
+class BatchError(ValueError):
+    """Lot refusé : `results` donne le détail par opération."""
+
+    def __init__(self, message, results=None):
+        super().__init__(message)
+        self.results = results or []
+
+
+class _Invalid(ValueError):
+    pass
+
+
+# ---------- Champs (mêmes règles que les routes POST / PUT) -----------------
+
+def _text(data, key, required=False, default=None):
+    v = (data.get(key) or "").strip()
+    if required and not v:
+        raise _Invalid(f"{key} required")
+    return v or default
+
+
+def _date(value, required=False, key="date"):
+    if not value:
+        if required:
+            raise _Invalid(f"{key} required")
+        return None
+    s = str(value)
+    if len(s) >= 10 and s[4] == "-" and s[7] == "-":
+        s = s[:10]
+    try:
+        return date.fromisoformat(s)
+    except ValueError:
+        raise _Invalid(f"Invalid {key}, expected YYYY-MM-DD")
+
+
+def _list(data, key):
+    v = data.get(key) or []
+    if not isinstance(v, list):
+        raise _Invalid(f"{key} must be list")
+    return v
+
+
+def _character_fields(obj, data, creating):
+    if creating or "firstname" in data:
+        obj.firstname = _text(data, "firstname", required=True)
+    if creating or "lastname" in data:
+        obj.lastname = _text(data, "lastname", required=True)
+    if creating or "age" in data:
+        obj.age = data.get("age")
+    if creating or "birthdate" in data:
+        try:
+            obj.birthdate = _date(data.get("birthdate"), key="birthdate")
+        except _Invalid:
+            obj.birthdate = None   # comme la route : date illisible -> vide
+    if creating or "avatarUrl" in data:
+        obj.avatar_url = _text(data, "avatarUrl")
+    if creating or "content" in data:
+        obj.content = data.get("content") or {}
+
+
+def _place_fields(obj, data, creating):
+    if creating or "name" in data:
+        obj.name = _text(data, "name", required=True)
+    if creating or "location" in data:
+        obj.location = _text(data, "location")
+    if creating or "description" in data:
+        obj.description = data.get("description") or None
+    if creating or "images" in data:
+        obj.images = _list(data, "images")
+    if creating or "content" in data:
+        obj.content = data.get("content") or {}
+
+
+def _item_fields(obj, data, creating):
+    if creating:
+        obj.name = _text(data, "name", default="Nouvel objet")
+    elif "name" in data:
+        obj.name = _text(data, "name", required=True)
+    if creating or "description" in data:
+        obj.description = data.get("description") or ""
+    if creating or "images" in data:
+        obj.images = _list(data, "images")
+    if creating or "content" in data:
+        obj.content = data.get("content") or {}
+
+
+def _event_fields(obj, data, creating):
+    if creating or "name" in data:
+        obj.name = _text(data, "name", required=True)
+    if creating or "startDate" in data:
+        obj.start_date = _date(data.get("startDate"), required=True, key="startDate")
+    if creating or "endDate" in data:
+        obj.end_date = _date(data.get("endDate"), key="endDate")
+    if creating or "description" in data:
+        obj.description = data.get("description") or ""
+    if creating or "images" in data:
+        obj.images = _list(data, "images")
+    if creating or "content" in data:
+        obj.content = data.get("content") or {}
+
+
+_FIELDS = {
+    "character": _character_fields,
+    "place": _place_fields,
+    "item": _item_fields,
+    "event": _event_fields,
+}
+
+
+# ---------- Exécution -------------------------------------------------------
+
+def _check_shape(operations):
+    if not isinstance(operations, list) or not operations:
+        raise BatchError("operations list required")
+    if len(operations) > MAX_OPERATIONS:
+        raise BatchError(f"at most {MAX_OPERATIONS} operations per batch")
+    results, ok = [], True
+    for i, op in enumerate(operations):
+        error = None
+        if not isinstance(op, dict):
+            error = "operation must be an object"
+        elif op.get("op") not in OPS:
+            error = f"op must be one of {', '.join(OPS)}"
+        elif op.get("type") not in ENTITY_TYPES:
+            error = f"type must be one of {', '.join(ENTITY_TYPES)}"
+        elif op["op"] in ("create", "update") and not isinstance(op.get("data", {}), dict):
+            error = "data must be an object"
+        elif op["op"] in ("update", "delete") and not isinstance(op.get("id"), str):
+            error = "id required"
+        elif op["op"] == "tag":
+            if (not isinstance(op.get("ids"), list) or not op["ids"]
+                    or not all(isinstance(i, str) for i in op["ids"])):
+                error = "ids list required"
+            elif not any(k in op for k in ("add", "remove", "set")):
+                error = "add, remove or set required"
+            elif any(not isinstance(op.get(k, []), list) for k in ("add", "remove", "set")):
+                error = "add, remove and set must be lists"
+            elif "set" in op and ("add" in op or "remove" in op):
+                error = "set cannot be combined with add / remove"
+        results.append({"index": i, "error": error} if error else {"index": i})
+        ok = ok and error is None
+    if not ok:
+        raise BatchError("invalid operations", results)
+
+
+def _tag_ids_of(op):
+    if op["op"] in ("create", "update"):
+        ids = (op.get("data") or {}).get("tagIds")
+        return ids if isinstance(ids, list) else []
+    if op["op"] == "tag":
+        return [*op.get("add", []), *op.get("remove", []), *op.get("set", [])]
+    return []
+
+
+def _load(collection_id, operations):
+    """Fiches visées (une requête par type) et tags cités (une requête)."""
+    wanted = {etype: set() for etype in ENTITY_TYPES}
+    tag_ids = set()
+    for op in operations:
+        if op["op"] in ("update", "delete"):
+            wanted[op["type"]].add(op["id"])
+        elif op["op"] == "tag":
+            wanted[op["type"]].update(i for i in op["ids"] if isinstance(i, str))
+        tag_ids.update(t for t in _tag_ids_of(op) if isinstance(t, str))
+
+    entities = {}
+    for etype, ids in wanted.items():
+        if ids:
+            model = ENTITY_TYPES[etype][0]
+            entities[etype] = {o.id: o for o in model.query.filter(model.collection_id == collection_id,
+                                                                   model.id.in_(ids))}
+        else:
+            entities[etype] = {}
+    tags = {}
+    if tag_ids:
+        tags = {t.id: t for t in Tag.query.filter(Tag.collection_id == collection_id, Tag.id.in_(tag_ids))}
+    return entities, tags
+
+
+def _scoped_tags(tags, etype, ids):
+    """Tags de la collection et de la portée du type, sans doublons ; erreur sinon."""
+    out, seen = [], set()
+    for tag_id in ids:
+        tag = tags.get(tag_id) if isinstance(tag_id, str) else None
+        if tag is None:
+            raise _Invalid(f"unknown tag {tag_id}")
+        if tag.scope != etype:
+            raise _Invalid(f"tag {tag_id} has scope {tag.scope}, not {etype}")
+        if tag.id not in seen:
+            seen.add(tag.id)
+            out.append(tag)
+    return out
+
+
+def _retag(etype, entity_ids, add=(), remove=(), replace=False):
+    """Écrit les associations fiche <-> tag par lots (sans passer par les collections ORM)."""
+    _model, assoc, entity_col = ENTITY_TYPES[etype]
+    table = assoc.__table__
+    db.session.flush()
+    if replace:
+        db.session.execute(delete(table).where(entity_col.in_(entity_ids)))
+    elif remove:
+        db.session.execute(delete(table).where(entity_col.in_(entity_ids), assoc.tag_id.in_(remove)))
+    if not add:
+        return
+    existing = set() if replace else set(db.session.execute(
+        select(entity_col, assoc.tag_id).where(entity_col.in_(entity_ids), assoc.tag_id.in_(add))).all())
+    rows = [{entity_col.key: eid, "tag_id": tid}
+            for eid in entity_ids for tid in add if (eid, tid) not in existing]
+    if rows:
+        db.session.execute(insert(table), rows)
+
+
+def _apply(collection_id, op, entities, tags, deleted, touched):
+    etype = op["type"]
+    model = ENTITY_TYPES[etype][0]
+    kind = op["op"]
+
+    if kind == "create":
+        data = op.get("data") or {}
+        obj = model(id=str(uuid.uuid4()), collection_id=collection_id)   # id connu sans flush
+        _FIELDS[etype](obj, data, creating=True)
+        tag_ids = data.get("tagIds")
+        if isinstance(tag_ids, list) and tag_ids:
+            obj.tags = _scoped_tags(tags, etype, tag_ids)
+        db.session.add(obj)
+        touched.append(obj)
+        return {"status": "created", "id": obj.id}
+
+    ids = [op["id"]] if kind in ("update", "delete") else list(dict.fromkeys(op["ids"]))
+    for eid in ids:
+        if eid in deleted:
+            raise _Invalid(f"{etype} {eid} deleted earlier in this batch")
+        if eid not in entities[etype]:
+            raise _Invalid(f"{etype} {eid} not found")
+
+    if kind == "update":
+        obj = entities[etype][op["id"]]
+        data = op.get("data") or {}
+        _FIELDS[etype](obj, data, creating=False)
+        if isinstance(data.get("tagIds"), list):
+            obj.tags = _scoped_tags(tags, etype, data["tagIds"])
+        touched.append(obj)
+        return {"status": "updated", "id": obj.id}
+
+    if kind == "delete":
+        obj = entities[etype][op["id"]]
+        db.session.delete(obj)
+        deleted[obj.id] = etype
+        return {"status": "deleted", "id": obj.id}
+
+    if "set" in op:
+        _retag(etype, ids, add=[t.id for t in _scoped_tags(tags, etype, op["set"])], replace=True)
+    else:
+        _retag(etype, ids,
+               add=[t.id for t in _scoped_tags(tags, etype, op.get("add", []))],
+               remove=[t.id for t in _scoped_tags(tags, etype, op.get("remove", []))])
+    return {"status": "tagged", "count": len(ids)}
+
+
+def run_batch(collection_id, operations) -> list[dict]:
+    """Applique et commite le lot ; lève BatchError (rien n'est écrit) si une opération échoue."""
+    _check_shape(operations)
+    entities, tags = _load(collection_id, operations)
+
+    results, failed = [], False
+    deleted, touched = {}, []
+    for i, op in enumerate(operations):
+        try:
+            results.append({"index": i, **_apply(collection_id, op, entities, tags, deleted, touched)})
+        except _Invalid as e:
+            results.append({"index": i, "error": str(e)})
+            failed = True
+    if failed:
+        db.session.rollback()
+        raise BatchError("batch rejected, nothing was applied", results)
+
+    db.session.commit()
+    for obj in touched:
+        if obj.id not in deleted:
+            autocomplete_index.refresh(obj)
+    for eid, etype in deleted.items():
+        autocomplete_index.discard(collection_id, etype, eid)
+    return results
@@ -0,0 +1,279 @@
+# backend/event_histogram.py
+"""Densité des événements d'une collection par niveau de zoom (jour, mois, année, décennie).
+
+La frise plaçait chaque événement dans le navigateur ; au-delà de quelques
+milliers, vue d'ensemble illisible et lente. Le serveur répond désormais par
+des buckets quand on est dézoomé, par les événements eux-mêmes quand la
+fenêtre en contient peu.
+
+`event_buckets` garde, pour chaque niveau, le nombre d'événements qui
+commencent (`starts`) et qui se terminent (`ends`) dans chaque bucket, et non
+le nombre d'événements présents : un événement de cinq siècles toucherait
+sinon 180 000 buckets journaliers. Le nombre d'événements en cours dans un
+bucket est une somme glissante :
+
+    en cours(b) = débuts avant la fin de b - fins avant le début de b
+
+Le préfixe (tout ce qui précède une date) se lit sur les niveaux eux-mêmes :
+décennies entières avant la date, puis années de sa décennie, mois de son
+année, jours de son mois, soit au plus ~1000 + 53 lignes lues par la clé
+primaire. Chaque création, redatation ou suppression d'événement ajuste au
+plus 8 compteurs (hooks de session), quelle que soit la durée de l'événement.
+"""
+from collections import Counter
+from datetime import date, timedelta
+from flask import current_app
+from sqlalchemy import and_, bindparam, delete, event, func, inspect, insert, select, tuple_, union_all, update
+from .database import db
+from .models import Collection, Event, EventBucket
+
+LEVELS = ("day", "month", "year", "decade")   # du plus fin au plus grossier
+DEFAULT_MAX_BUCKETS = 500
+DEFAULT_EVENT_THRESHOLD = 500
+
+_buckets = EventBucket.__table__
+_events = Event.__table__
+
+
+class HistogramError(ValueError):
+    pass
+
+
+# ---------- Buckets ---------------------------------------------------------
+
+def bucket_of(level, d: date) -> int:
+    if level == "day":
+        return d.toordinal()
+    if level == "month":
+        return d.year * 12 + d.month - 1
+    if level == "year":
+        return d.year
+    return d.year // 10
+
+
+def bucket_start(level, b) -> date:
+    if level == "day":
+        return date.fromordinal(b)
+    if level == "month":
+        return date(b // 12, b % 12 + 1, 1)
+    if level == "year":
+        return date(b, 1, 1)
+    return date(max(b * 10, 1), 1, 1)
+
+
+def bucket_end(level, b) -> date:
+    try:
+        return bucket_start(level, b + 1) - timedelta(days=1)
+    except (ValueError, OverflowError):
+        return date.max
+
+
+def bucket_count(level, start: date, end: date) -> int:
+    return bucket_of(level, end) - bucket_of(level, start) + 1
+
+
+def _bounds(start, end):
+    """(début, fin) d'un événement ; fin absente ou antérieure au début -> début."""
+    return start, max(end, start) if end is not None else start
+
+
+def _add(deltas, collection_id, start, end, sign):
+    start, end = _bounds(start, end)
+    for level in LEVELS:
+        deltas[(collection_id, level, bucket_of(level, start), "starts")] += sign
+        deltas[(collection_id, level, bucket_of(level, end), "ends")] += sign
+
+
+def _apply(conn, deltas):
+    """Ajoute les deltas {(collection, niveau, bucket, colonne): n} ; supprime les buckets vidés."""
+    per_key = {}
+    for (collection_id, level, b, column), n in deltas.items():
+        if n:
+            per_key.setdefault((collection_id, level, b), {"starts": 0, "ends": 0})[column] += n
+    if not per_key:
+        return
+    key = and_(_buckets.c.collection_id == bindparam("b_cid"), _buckets.c.level == bindparam("b_level"),
+               _buckets.c.bucket == bindparam("b_bucket"))
+    existing = set()
+    for keys in _chunks(list(per_key), 300):
+        existing.update(tuple(r) for r in conn.execute(
+            select(_buckets.c.collection_id, _buckets.c.level, _buckets.c.bucket)
+            .where(tuple_(_buckets.c.collection_id, _buckets.c.level, _buckets.c.bucket).in_(keys))))
+    params = [{"b_cid": k[0], "b_level": k[1], "b_bucket": k[2], "b_starts": v["starts"], "b_ends": v["ends"]}
+              for k, v in per_key.items() if k in existing]
+    if params:
+        conn.execute(update(_buckets).where(key).values(starts=_buckets.c.starts + bindparam("b_starts"),
+                                                        ends=_buckets.c.ends + bindparam("b_ends")), params)
+        conn.execute(delete(_buckets).where(key, _buckets.c.starts == 0, _buckets.c.ends == 0),
+                     [{k: p[k] for k in ("b_cid", "b_level", "b_bucket")} for p in params])
+    rows = [{"collection_id": k[0], "level": k[1], "bucket": k[2], **v}
+            for k, v in per_key.items() if k not in existing]
+    if rows:
+        conn.execute(insert(_buckets), rows)
+
+
+def _chunks(seq, n):
+    for i in range(0, len(seq), n):
+        yield seq[i:i + n]
+
+
+def rebuild(conn, collection_id):
+    """Recalcule l'histogramme d'une collection (import d'archive, réparation). Sans commit."""
+    conn.execute(delete(_buckets).where(_buckets.c.collection_id == collection_id))
+    deltas = Counter()
+    for start, end in conn.execute(select(_events.c.start_date, _events.c.end_date)
+                                   .where(_events.c.collection_id == collection_id)):
+        _add(deltas, collection_id, start, end, 1)
+    _apply(conn, deltas)
+
+
+# ---------- Lecture ---------------------------------------------------------
+
+_PREFIX_STMT = None
+
+
+def prefix_stmt():
+    """Débuts et fins dans les buckets strictement avant une date (un niveau par tranche de temps)."""
+    global _PREFIX_STMT
+    if _PREFIX_STMT is None:
+        cid = _buckets.c.collection_id == bindparam("cid")
+        parts = [
+            select(_buckets.c.starts, _buckets.c.ends)
+            .where(cid, _buckets.c.level == level, _buckets.c.bucket >= bindparam(f"{level}_lo"),
+                   _buckets.c.bucket < bindparam(f"{level}_hi"))
+            for level in LEVELS
+        ]
+        rows = union_all(*parts).subquery()
+        _PREFIX_STMT = select(func.coalesce(func.sum(rows.c.starts), 0), func.coalesce(func.sum(rows.c.ends), 0))
+    return _PREFIX_STMT
+
+
+def prefix_params(d):
+    """Tranches de prefix_stmt() pour la date d (None : après la dernière date possible)."""
+    if d is None:
+        return {"decade_lo": 0, "decade_hi": bucket_of("decade", date.max) + 1,
+                "year_lo": 0, "year_hi": 0, "month_lo": 0, "month_hi": 0, "day_lo": 0, "day_hi": 0}
+    decade, year, month = bucket_of("decade", d), d.year, bucket_of("month", d)
+    return {"decade_lo": 0, "decade_hi": decade,
+            "year_lo": decade * 10, "year_hi": year,
+            "month_lo": year * 12, "month_hi": month,
+            "day_lo": d.replace(day=1).toordinal(), "day_hi": d.toordinal()}
+
+
+def _before(collection_id, d):
+    """(débuts, fins) des événements avant la date d (None : après la dernière date possible)."""
+    return tuple(db.session.execute(prefix_stmt(), {"cid": collection_id, **prefix_params(d)}).one())
+
+
+def count(collection_id, start: date, end: date) -> int:
+    """Nombre d'événements qui recoupent [start, end]."""
+    after = end + timedelta(days=1) if end < date.max else None
+    return _before(collection_id, after)[0] - _before(collection_id, start)[1]
+
+
+def pick_level(start, end, max_buckets):
+    """Niveau le plus fin qui découpe [start, end] en au plus max_buckets buckets (décennie sinon)."""
+    for level in LEVELS:
+        if bucket_count(level, start, end) <= max_buckets:
+            return level
+    return LEVELS[-1]
+
+
+def buckets_stmt(collection_id, level, b0, b1):
+    """Buckets non vides du niveau entre b0 et b1 (inclus)."""
+    return (select(_buckets.c.bucket, _buckets.c.starts, _buckets.c.ends)
+            .where(_buckets.c.collection_id == collection_id, _buckets.c.level == level,
+                   _buckets.c.bucket.between(b0, b1)))
+
+
+def histogram(collection_id, level, start: date, end: date) -> list[dict]:
+    """Buckets non vides du niveau qui recoupent [start, end] : événements en cours et débuts."""
+    if level not in LEVELS:
+        raise HistogramError(f"level must be one of {', '.join(LEVELS)}")
+    b0, b1 = bucket_of(level, start), bucket_of(level, end)
+    limit = current_app.config.get("TIMELINE_MAX_BUCKETS", DEFAULT_MAX_BUCKETS)
+    if level != LEVELS[-1] and b1 - b0 + 1 > limit:   # décennies : au plus 1000
+        raise HistogramError(f"too many {level} buckets in this window, use a coarser level")
+    started, ended = _before(collection_id, bucket_start(level, b0))
+    rows = {r.bucket: r for r in db.session.execute(buckets_stmt(collection_id, level, b0, b1))}
+    out = []
+    for b in range(b0, b1 + 1):
+        r = rows.get(b)
+        if r is not None:
+            started += r.starts
+        active = started - ended
+        if active:
+            out.append({"start": bucket_start(level, b).isoformat(), "end": bucket_end(level, b).isoformat(),
+                        "count": active, "starts": r.starts if r is not None else 0})
+        if r is not None:
+            ended += r.ends   # un événement qui se termine dans b y est encore en cours
+    return out
+
+
+# ---------- Hooks -----------------------------------------------------------
+
+def _committed(state, attr):
+    hist = state.attrs[attr].history
+    if hist.deleted:
+        return hist.deleted[0]
+    if hist.unchanged:
+        return hist.unchanged[0]
+    return getattr(state.obj(), attr)
+
+
+def _before_flush(session, flush_context, instances):
+    """Collection supprimée : son histogramme ; événement supprimé : ses compteurs."""
+    gone = {obj.id for obj in session.deleted if isinstance(obj, Collection)}
+    deltas = Counter()
+    for obj in session.deleted:
+        if isinstance(obj, Event):
+            state = inspect(obj)
+            collection_id = _committed(state, "collection_id")
+            if collection_id not in gone:
+                _add(deltas, collection_id, _committed(state, "start_date"), _committed(state, "end_date"), -1)
+    if not gone and not deltas:
+        return
+    conn = session.connection()
+    for collection_id in gone:
+        conn.execute(delete(_buckets).where(_buckets.c.collection_id == collection_id))
+    _apply(conn, deltas)
+
+
+def _after_flush(session, flush_context):
+    """Événement créé ou redaté : compteurs de ses anciens et nouveaux buckets."""
+    deltas = Counter()
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Event):
+            continue
+        if obj in session.new:
+            _add(deltas, obj.collection_id, obj.start_date, obj.end_date, 1)
+            continue
+        state = inspect(obj)
+        if not any(state.attrs[a].history.has_changes() for a in ("start_date", "end_date", "collection_id")):
+            continue
+        _add(deltas, _committed(state, "collection_id"), _committed(state, "start_date"),
+             _committed(state, "end_date"), -1)
+        _add(deltas, obj.collection_id, obj.start_date, obj.end_date, 1)
+    if deltas:
+        _apply(session.connection(), deltas)
+
+
+def rebuild_all() -> int:
+    conn = db.session.connection()
+    ids = list(conn.execute(select(Collection.id)).scalars())
+    for collection_id in ids:
+        rebuild(conn, collection_id)
+    db.session.commit()
+    return len(ids)
+
+
+def init_app(app):
+    if not event.contains(db.session, "before_flush", _before_flush):
+        event.listen(db.session, "before_flush", _before_flush)
+    if not event.contains(db.session, "after_flush", _after_flush):
+        event.listen(db.session, "after_flush", _after_flush)
+
+    @app.cli.command("event-histogram-rebuild")
+    def event_histogram_rebuild_command():
+        """Recalcule les histogrammes d'événements de toutes les collections."""
+        print(f"{rebuild_all()} collection(s) recalculée(s)")
@@ -0,0 +1,230 @@
+# backend/instrumentation.py
+"""Instrumentation des requêtes HTTP.
+
+Pour chaque requête : durée totale, nombre et durée cumulée des requêtes SQL
+(événements SQLAlchemy du moteur), taille de la réponse et temps de
+sérialisation JSON. Chaque mesure est transmise aux « sinks » enregistrés
+(register_sink) ; le sink par défaut agrège par endpoint pour `/metrics`
+(format texte Prometheus, compteurs propres à chaque process).
+
+Options (config) :
+- SERVER_TIMING : ajoute l'en-tête `Server-Timing` (défaut : mode debug) ;
+- REQUEST_PROFILING : autorise `?_profile=1` (rapport cProfile texte à la
+  place de la réponse) et `?_profile=raw` (dump binaire pour pstats /
+  snakeviz) ; défaut : mode debug ;
+- METRICS_ENABLED : expose `/metrics` (défaut : True).
+"""
+import cProfile
+import io
+import marshal
+import pstats
+import time
+from collections import defaultdict
+from threading import Lock
+from flask import g, has_request_context, request, Response
+from sqlalchemy import event
+from .database import db
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROFILE_LINES = 60
+
+_SKIPPED_ENDPOINTS = {"metrics", "static"}
+
+_sinks = []
+
+
+def register_sink(fn):
+    """`fn(record)` reçoit un dict par requête : endpoint, method, status, duration,
+    sqlCount, sqlTime, responseBytes, serializationTime (durées en secondes)."""
+    _sinks.append(fn)
+    return fn
+
+
+# ---------- Agrégats par endpoint (sink par défaut) -------------------------
+
+class _EndpointStats:
+    __slots__ = ("statuses", "buckets", "duration", "count", "sql_count", "sql_time",
+                 "response_bytes", "serialization_time")
+
+    def __init__(self):
+        self.statuses = defaultdict(int)
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.duration = 0.0
+        self.count = 0
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.response_bytes = 0
+        self.serialization_time = 0.0
+
+
+_lock = Lock()
+_stats: "dict[str, _EndpointStats]" = {}
+
+
+@register_sink
+def _aggregate(record):
+    with _lock:
+        s = _stats.get(record["endpoint"])
+        if s is None:
+            s = _stats[record["endpoint"]] = _EndpointStats()
+        s.statuses[(record["method"], record["status"])] += 1
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if record["duration"] <= bound:
+                s.buckets[i] += 1
+        s.duration += record["duration"]
+        s.count += 1
+        s.sql_count += record["sqlCount"]
+        s.sql_time += record["sqlTime"]
+        s.response_bytes += record["responseBytes"]
+        s.serialization_time += record["serializationTime"]
+
+
+def reset_metrics():
+    with _lock:
+        _stats.clear()
+
+
+def _label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_metrics() -> str:
+    """Agrégats au format texte Prometheus (version 0.0.4)."""
+    with _lock:
+        snapshot = sorted(_stats.items())
+        families = {
+            "wanvil_http_requests_total": ("counter", "Requêtes HTTP traitées.", []),
+            "wanvil_http_request_duration_seconds": ("histogram", "Durée de traitement des requêtes.", []),
+            "wanvil_sql_statements_total": ("counter", "Requêtes SQL exécutées.", []),
+            "wanvil_sql_duration_seconds_total": ("counter", "Temps cumulé des requêtes SQL.", []),
+            "wanvil_http_response_bytes_total": ("counter", "Octets de réponse (hors flux).", []),
+            "wanvil_serialization_seconds_total": ("counter", "Temps de sérialisation JSON.", []),
+        }
+        for endpoint, s in snapshot:
+            ep = f'endpoint="{_label(endpoint)}"'
+            for (method, status), n in sorted(s.statuses.items()):
+                families["wanvil_http_requests_total"][2].append(
+                    f'wanvil_http_requests_total{{{ep},method="{method}",status="{status}"}} {n}')
+            hist = families["wanvil_http_request_duration_seconds"][2]
+            for bound, n in zip(DURATION_BUCKETS, s.buckets):
+                hist.append(f'wanvil_http_request_duration_seconds_bucket{{{ep},le="{bound}"}} {n}')
+            hist.append(f'wanvil_http_request_duration_seconds_bucket{{{ep},le="+Inf"}} {s.count}')
+            hist.append(f"wanvil_http_request_duration_seconds_sum{{{ep}}} {s.duration:.6f}")
+            hist.append(f"wanvil_http_request_duration_seconds_count{{{ep}}} {s.count}")
+            families["wanvil_sql_statements_total"][2].append(f"wanvil_sql_statements_total{{{ep}}} {s.sql_count}")
+            families["wanvil_sql_duration_seconds_total"][2].append(
+                f"wanvil_sql_duration_seconds_total{{{ep}}} {s.sql_time:.6f}")
+            families["wanvil_http_response_bytes_total"][2].append(
+                f"wanvil_http_response_bytes_total{{{ep}}} {s.response_bytes}")
+            families["wanvil_serialization_seconds_total"][2].append(
+                f"wanvil_serialization_seconds_total{{{ep}}} {s.serialization_time:.6f}")
+    lines = []
+    for name, (kind, help_text, samples) in families.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", *samples]
+    return "\n".join(lines) + "\n"
+
+
+# ---------- Mesures de la requête courante ----------------------------------
+
+def _before_cursor_execute(conn, _cursor, _statement, _params, _context, _executemany):
+    if has_request_context():
+        conn.info.setdefault("_instr_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, _cursor, _statement, _params, _context, _executemany):
+    if has_request_context():
+        starts = conn.info.get("_instr_start")
+        if starts:
+            g._instr_sql_time = g.get("_instr_sql_time", 0.0) + time.perf_counter() - starts.pop()
+            g._instr_sql_count = g.get("_instr_sql_count", 0) + 1
+
+
+def _timed_dumps(dumps):
+    def wrapper(obj, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return dumps(obj, **kwargs)
+        finally:
+            if has_request_context():
+                g._instr_ser_time = g.get("_instr_ser_time", 0.0) + time.perf_counter() - t0
+    return wrapper
+
+
+def _server_timing(record) -> str:
+    return ", ".join((
+        f"app;dur={record['duration'] * 1000:.1f}",
+        f'sql;dur={record["sqlTime"] * 1000:.1f};desc="{record["sqlCount"]} queries"',
+        f"ser;dur={record['serializationTime'] * 1000:.1f}",
+    ))
+
+
+def _profile_response(profiler, mode, status) -> Response:
+    if mode == "raw":
+        profiler.create_stats()
+        return Response(marshal.dumps(profiler.stats), mimetype="application/octet-stream",
+                        headers={"Content-Disposition": "attachment; filename=request.prof",
+                                 "X-Profiled-Status": str(status)})
+    out = io.StringIO()
+    stats = pstats.Stats(profiler, stream=out)
+    stats.sort_stats("cumulative").print_stats(PROFILE_LINES)
+    return Response(out.getvalue(), mimetype="text/plain", headers={"X-Profiled-Status": str(status)})
+
+
+def init_app(app):
+    with app.app_context():
+        engine = db.engine
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    app.json.dumps = _timed_dumps(app.json.dumps)
+
+    def enabled(key):
+        value = app.config.get(key)
+        return app.debug if value is None else bool(value)
+
+    @app.before_request
+    def start_instrumentation():
+        g._instr_start = time.perf_counter()
+        mode = request.args.get("_profile")
+        if mode in ("1", "raw") and enabled("REQUEST_PROFILING"):
+            g._instr_profiler = cProfile.Profile()
+            g._instr_profiler.enable()
+
+    @app.after_request
+    def finish_instrumentation(response):
+        start = g.pop("_instr_start", None)
+        if start is None:
+            return response
+        profiler = g.pop("_instr_profiler", None)
+        if profiler is not None:
+            profiler.disable()
+        duration = time.perf_counter() - start
+        size = response.content_length
+        if size is None and not response.is_streamed:
+            size = response.calculate_content_length()
+        record = {
+            "endpoint": request.endpoint or "<unmatched>",
+            "method": request.method,
+            "status": response.status_code,
+            "duration": duration,
+            "sqlCount": g.get("_instr_sql_count", 0),
+            "sqlTime": g.get("_instr_sql_time", 0.0),
+            "responseBytes": size or 0,
+            "serializationTime": g.get("_instr_ser_time", 0.0),
+        }
+        app.logger.debug("%s %s -> %s (%.1f ms, %d SQL)", request.method, request.path,
+                         response.status_code, duration * 1000, record["sqlCount"])
+        if record["endpoint"] not in _SKIPPED_ENDPOINTS:
+            for sink in _sinks:
+                sink(record)
+        if profiler is not None:
+            return _profile_response(profiler, request.args.get("_profile"), response.status_code)
+        if enabled("SERVER_TIMING"):
+            response.headers["Server-Timing"] = _server_timing(record)
+        return response
+
+    if app.config.get("METRICS_ENABLED", True):
+        @app.get("/metrics")
+        def metrics():
+            return Response(render_metrics(), mimetype="text/plain; version=0.0.4; charset=utf-8")
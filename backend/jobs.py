@@ -0,0 +1,242 @@
+# backend/jobs.py
+"""Tâches de fond : table `jobs` (SQLite) + pool de process.
+
+Les routes ne font qu'insérer une ligne `queued` et la soumettre au pool
+(ProcessPoolExecutor, contexte "spawn", JOBS_MAX_WORKERS process). Chaque
+process crée sa propre app (create_app) et exécute le handler enregistré
+pour le `kind` du job ; statut, progression et résultat sont écrits dans la
+table, que les routes de suivi relisent.
+
+Un job n'est exécuté qu'une fois : le worker le « réclame » par un UPDATE
+conditionnel (queued -> running). Au démarrage du pool, les jobs restés
+`queued` sont resoumis et les jobs `running` depuis plus de JOBS_TIMEOUT
+secondes (process tué) passent en `failed`.
+
+Le dédoublonnage (`dedupe_key`) ne réutilise qu'un job que le pool de ce
+process a en charge : un job `running` laissé par un process arrêté (ou
+au-delà de JOBS_TIMEOUT) ne tournera plus, un nouveau job le remplace.
+"""
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from multiprocessing import get_context
+from threading import Lock
+from flask import current_app
+from .database import db
+from .models import Job, Tome
+
+DEFAULT_RETENTION_DAYS = 7
+DEFAULT_TIMEOUT = 3600
+
+# handlers : kind -> fn(params, progress) -> (result JSON, chemin du fichier produit ou None)
+HANDLERS = {}
+
+
+def handler(kind: str):
+    def register(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return register
+
+
+# ---------- Côté web : file d'attente ---------------------------------------
+
+_executor = None
+_executor_lock = Lock()
+_submitted = set()   # jobs soumis au pool de ce process, pas encore terminés
+
+
+def _portable_config(app) -> dict:
+    """Config transmise aux workers (valeurs simples + chemins résolus)."""
+    from .tome_export import export_dir
+    config = {k: v for k, v in app.config.items()
+              if k.isupper() and isinstance(v, (str, int, float, bool, type(None)))}
+    config["SQLALCHEMY_DATABASE_URI"] = db.engine.url.render_as_string(hide_password=False)
+    config["EXPORT_DIR"] = export_dir()
+    return config
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            app = current_app._get_current_object()
+            _executor = ProcessPoolExecutor(
+                max_workers=app.config.get("JOBS_MAX_WORKERS") or os.cpu_count(),
+                mp_context=get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(_portable_config(app),),
+            )
+            _resume(app, _executor)
+        return _executor
+
+
+def _submit(app, executor, job_id):
+    _submitted.add(job_id)
+    future = executor.submit(_execute, job_id)
+    future.add_done_callback(lambda f: _on_done(app, job_id, f))
+
+
+def _on_done(app, job_id, future):
+    """Filet de sécurité : le process worker a planté avant d'écrire le statut."""
+    global _executor
+    _submitted.discard(job_id)
+    exc = future.exception()
+    if exc is None:
+        return
+    with _executor_lock:
+        _executor = None  # pool cassé (BrokenProcessPool) : recréé au prochain job
+    with app.app_context():
+        (Job.query.filter(Job.id == job_id, Job.status.in_(("queued", "running")))
+         .update({Job.status: "failed", Job.error: f"worker crashed: {exc}",
+                  Job.finished_at: datetime.utcnow()}, synchronize_session=False))
+        db.session.commit()
+
+
+def _resume(app, executor):
+    timeout = app.config.get("JOBS_TIMEOUT", DEFAULT_TIMEOUT)
+    (Job.query.filter(Job.status == "running",
+                      Job.started_at < datetime.utcnow() - timedelta(seconds=timeout))
+     .update({Job.status: "failed", Job.error: "interrupted", Job.finished_at: datetime.utcnow()},
+             synchronize_session=False))
+    db.session.commit()
+    for (job_id,) in db.session.query(Job.id).filter(Job.status == "queued").all():
+        _submit(app, executor, job_id)
+
+
+def active_query(dedupe_key: str):
+    """Jobs en attente ou en cours pour une clé, le plus récent d'abord."""
+    return (Job.query
+            .filter(Job.dedupe_key == dedupe_key, Job.status.in_(("queued", "running")))
+            .order_by(Job.created_at.desc()))
+
+
+def _in_progress(job, timeout) -> bool:
+    """Job actif que ce process fera aboutir : soumis à son pool, et pas en cours depuis plus de `timeout` s."""
+    if job.id not in _submitted:
+        return False
+    if job.status == "queued" or job.started_at is None:
+        return True
+    return job.started_at >= datetime.utcnow() - timedelta(seconds=timeout)
+
+
+def enqueue(kind: str, params: dict, dedupe_key: str = None) -> Job:
+    """Crée un job et le soumet au pool. Réutilise un job actif de même dedupe_key."""
+    if kind not in HANDLERS:
+        raise ValueError(f"unknown job kind: {kind}")
+    executor = _get_executor()   # d'abord : reprend les jobs laissés par un redémarrage (_resume)
+    if dedupe_key:
+        timeout = current_app.config.get("JOBS_TIMEOUT", DEFAULT_TIMEOUT)
+        for active in active_query(dedupe_key):
+            if _in_progress(active, timeout):
+                return active
+
+    retention = current_app.config.get("JOBS_RETENTION_DAYS", DEFAULT_RETENTION_DAYS)
+    (Job.query.filter(Job.status.in_(("done", "failed")),
+                      Job.created_at < datetime.utcnow() - timedelta(days=retention))
+     .delete(synchronize_session=False))
+    job = Job(kind=kind, params=params, dedupe_key=dedupe_key)
+    db.session.add(job)
+    db.session.commit()
+    _submit(current_app._get_current_object(), executor, job.id)
+    return job
+
+
+def finished_job(kind: str, params: dict, result: dict = None, result_path: str = None) -> Job:
+    """Job directement terminé (résultat déjà disponible, ex. PDF en cache)."""
+    now = datetime.utcnow()
+    job = Job(kind=kind, params=params, status="done", progress=1.0, result=result,
+              result_path=result_path, started_at=now, finished_at=now)
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+# ---------- Côté worker -----------------------------------------------------
+
+_worker_app = None
+
+
+def _init_worker(config):
+    global _worker_app
+    from .app import create_app
+    _worker_app = create_app(config)
+
+
+class _Progress:
+    """Écrit la progression du job (au plus tous les 2 % ou toutes les secondes)."""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.last_value, self.last_time = 0.0, 0.0
+
+    def __call__(self, fraction: float):
+        fraction = max(0.0, min(float(fraction), 1.0))
+        now = time.monotonic()
+        if fraction - self.last_value < 0.02 and now - self.last_time < 1.0:
+            return
+        self.last_value, self.last_time = fraction, now
+        Job.query.filter_by(id=self.job_id).update({Job.progress: fraction}, synchronize_session=False)
+        db.session.commit()
+
+
+def _execute(job_id: str):
+    with _worker_app.app_context():
+        claimed = (Job.query.filter_by(id=job_id, status="queued")
+                   .update({Job.status: "running", Job.started_at: datetime.utcnow()},
+                           synchronize_session=False))
+        db.session.commit()
+        if not claimed:
+            return  # déjà pris par un autre worker
+        job = db.session.get(Job, job_id)
+        kind, params = job.kind, dict(job.params or {})
+        try:
+            result, path = HANDLERS[kind](params, _Progress(job_id))
+            values = {Job.status: "done", Job.progress: 1.0, Job.result: result, Job.result_path: path}
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error("job %s (%s) failed\n%s", job_id, kind, traceback.format_exc())
+            values = {Job.status: "failed", Job.error: str(e), Job.result: getattr(e, "details", None)}
+        values[Job.finished_at] = datetime.utcnow()
+        Job.query.filter_by(id=job_id).update(values, synchronize_session=False)
+        db.session.commit()
+        db.session.remove()
+
+
+# ---------- Handlers --------------------------------------------------------
+
+@handler("tome_pdf")
+def _tome_pdf_job(params, progress):
+    from .tome_export import tome_pdf
+    tome = db.session.get(Tome, params["tomeId"])
+    if tome is None:
+        raise LookupError("tome not found")
+    path = tome_pdf(tome, progress)
+    return {"filename": f"{tome.name or 'tome'}.pdf"}, path
+
+
+@handler("collection_analytics")
+def _collection_analytics_job(params, progress):
+    from .analytics import backfill_stats, collection_analytics
+    from .models import Saga
+    # le gros du travail : parser le HTML des chapitres sans stats, par lots
+    backfill_stats(Saga.collection_id == params["collectionId"], lambda fraction: progress(0.9 * fraction))
+    return collection_analytics(params["collectionId"], params.get("words", 100)), None
+
+
+@handler("rebalance_ranks")
+def _rebalance_ranks_job(params, progress):
+    from .lexorank import rebalance
+    changed = rebalance(params["scope"], params["parentId"])
+    db.session.commit()
+    return {"changed": changed}, None
+
+
+def init_app(app):
+    @app.cli.command("jobs-run")
+    def jobs_run_command():
+        """Exécute les jobs restés en attente (après un redémarrage) puis rend la main."""
+        _get_executor().shutdown(wait=True)
+        print("jobs en attente traités")
@@ -0,0 +1,183 @@
+# backend/json_patch.py
+"""JSON Patch (RFC 6902) sur les colonnes JSON volumineuses.
+
+Le map-editor, la frise et le gabarit de personnage sauvegardaient tout le
+document à chaque modification ; avec PATCH, le client n'envoie que les
+opérations (add / remove / replace / move / copy / test) calculées depuis la
+révision qu'il connaît. La colonne `revision` du modèle (version_id_col de
+SQLAlchemy) sert de garde : une révision de base périmée -> StaleRevision (409),
+et l'UPDATE lui-même vérifie encore la révision (écritures concurrentes).
+
+Le patch est atomique : il est appliqué sur le document chargé, et à la
+moindre erreur l'appelant annule la session.
+"""
+import copy
+from sqlalchemy.orm.attributes import flag_modified
+
+MAX_OPERATIONS = 5000
+
+_OPS = ("add", "remove", "replace", "move", "copy", "test")
+
+
+class PatchError(ValueError):
+    pass
+
+
+class PatchTestFailed(PatchError):
+    pass
+
+
+class StaleRevision(Exception):
+    def __init__(self, current):
+        super().__init__("stale base revision")
+        self.current = current
+
+
+# ---------- JSON Pointer (RFC 6901) -----------------------------------------
+
+def parse_pointer(pointer) -> list[str]:
+    if not isinstance(pointer, str):
+        raise PatchError("path must be a string")
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise PatchError(f"invalid JSON pointer: {pointer!r}")
+    return [t.replace("~1", "/").replace("~0", "~") for t in pointer[1:].split("/")]
+
+
+def _index(container: list, token: str, for_add=False) -> int:
+    if for_add and token == "-":
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise PatchError(f"invalid array index: {token!r}")
+    i = int(token)
+    if i > len(container) or (i == len(container) and not for_add):
+        raise PatchError(f"array index out of range: {i}")
+    return i
+
+
+def _parent(doc, tokens):
+    """(conteneur parent, dernier token) du chemin ; le parent doit exister."""
+    node = doc
+    for token in tokens[:-1]:
+        if isinstance(node, dict):
+            if token not in node:
+                raise PatchError(f"path not found: /{'/'.join(tokens)}")
+            node = node[token]
+        elif isinstance(node, list):
+            node = node[_index(node, token)]
+        else:
+            raise PatchError(f"path not found: /{'/'.join(tokens)}")
+    if not isinstance(node, (dict, list)):
+        raise PatchError(f"path not found: /{'/'.join(tokens)}")
+    return node, tokens[-1]
+
+
+def _get(doc, tokens):
+    if not tokens:
+        return doc
+    parent, token = _parent(doc, tokens)
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise PatchError(f"path not found: /{'/'.join(tokens)}")
+        return parent[token]
+    return parent[_index(parent, token)]
+
+
+# ---------- Opérations ------------------------------------------------------
+
+def _add(doc, tokens, value):
+    if not tokens:
+        return value
+    parent, token = _parent(doc, tokens)
+    if isinstance(parent, dict):
+        parent[token] = value
+    else:
+        parent.insert(_index(parent, token, for_add=True), value)
+    return doc
+
+
+def _remove(doc, tokens):
+    if not tokens:
+        raise PatchError("cannot remove the document root")
+    parent, token = _parent(doc, tokens)
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise PatchError(f"path not found: /{'/'.join(tokens)}")
+        return parent.pop(token)
+    return parent.pop(_index(parent, token))
+
+
+def _replace(doc, tokens, value):
+    if not tokens:
+        return value
+    _remove(doc, tokens)
+    return _add(doc, tokens, value)
+
+
+def _equal(a, b) -> bool:
+    # 1 == True en Python, pas en JSON
+    if isinstance(a, bool) or isinstance(b, bool):
+        return type(a) is type(b) and a == b
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_equal(a[k], b[k]) for k in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_equal(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def apply_patch(doc, operations):
+    """Applique les opérations (en place quand c'est possible) ; retourne le document.
+
+    Lève PatchError (patch invalide) ou PatchTestFailed (op `test` non vérifiée).
+    """
+    if not isinstance(operations, list):
+        raise PatchError("patch must be a list of operations")
+    if len(operations) > MAX_OPERATIONS:
+        raise PatchError(f"at most {MAX_OPERATIONS} operations per patch")
+    for i, op in enumerate(operations):
+        if not isinstance(op, dict) or op.get("op") not in _OPS:
+            raise PatchError(f"operation {i}: op must be one of {', '.join(_OPS)}")
+        kind = op["op"]
+        tokens = parse_pointer(op.get("path"))
+        if kind in ("add", "replace", "test") and "value" not in op:
+            raise PatchError(f"operation {i}: value required")
+        if kind in ("move", "copy"):
+            source = parse_pointer(op.get("from"))
+
+        if kind == "add":
+            doc = _add(doc, tokens, op["value"])
+        elif kind == "remove":
+            _remove(doc, tokens)
+        elif kind == "replace":
+            doc = _replace(doc, tokens, op["value"])
+        elif kind == "move":
+            if tokens[:len(source)] == source and tokens != source:
+                raise PatchError(f"operation {i}: cannot move a value into one of its children")
+            if tokens != source:
+                doc = _add(doc, tokens, _remove(doc, source))
+        elif kind == "copy":
+            doc = _add(doc, tokens, copy.deepcopy(_get(doc, source)))
+        elif not _equal(_get(doc, tokens), op["value"]):
+            raise PatchTestFailed(f"operation {i}: test failed at {op['path']!r}")
+    return doc
+
+
+def patch_column(obj, attr: str, payload, default=None):
+    """Applique `payload` = {baseRevision, patch} à la colonne JSON `attr` de `obj` (sans commit).
+
+    `default` : document de départ si la colonne est vide (gabarit, frise par défaut).
+    """
+    if not isinstance(payload, dict):
+        raise PatchError("body must be an object: {baseRevision, patch}")
+    base = payload.get("baseRevision")
+    if not isinstance(base, int) or isinstance(base, bool):
+        raise PatchError("baseRevision (int) required")
+    current = obj.revision or 0
+    if base != current:
+        raise StaleRevision(current)
+    doc = getattr(obj, attr)
+    if not doc and default is not None:
+        doc = copy.deepcopy(default)
+    setattr(obj, attr, apply_patch(doc, payload.get("patch")))
+    flag_modified(obj, attr)   # modifié en place : SQLAlchemy ne le verrait pas
@@ -0,0 +1,75 @@
+# backend/json_provider.py
+"""Fournisseur JSON de l'application (app.json / jsonify / request.get_json).
+
+orjson s'il est installé (pip install orjson, facultatif), sinon le module
+json standard. Dans les deux cas :
+- sortie compacte, sans indentation même en debug, et clés non triées ;
+- dates et datetimes en ISO 8601 (le format du front, comme les to_dict),
+  au lieu du format HTTP de Flask ;
+- UTF-8 brut (pas d'échappement \\uXXXX), ce qui allège les chapitres.
+
+Un objet qu'orjson refuse (entier > 64 bits, sous-classe exotique...) repasse
+par le module standard.
+"""
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson  # pip install orjson (facultatif)
+except ImportError:
+    orjson = None
+
+
+def _default(o):
+    if isinstance(o, date):
+        return o.isoformat()
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class JSONProvider(DefaultJSONProvider):
+    compact = True
+    sort_keys = False
+    ensure_ascii = False
+    default = staticmethod(_default)
+
+    def dumps(self, obj, **kwargs) -> str:
+        if orjson is not None and not kwargs:
+            try:
+                return orjson.dumps(obj, default=_default, option=self._orjson_options()).decode("utf-8")
+            except TypeError:
+                pass
+        kwargs.setdefault("default", _default)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        kwargs.setdefault("separators", (",", ":"))
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def _orjson_options(self) -> int:
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps(obj), mimetype=self.mimetype)
+
+
+def init_app(app):
+    """À appeler avant instrumentation.init_app, qui enveloppe app.json.dumps."""
+    app.json = JSONProvider(app)
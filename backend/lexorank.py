@@ -0,0 +1,247 @@
+# backend/lexorank.py
+"""Ordre des chapitres, tickets et colonnes par clés fractionnaires (style LexoRank).
+
+Chaque élément porte une clé `rank` (chiffres base 36, comparée octet par
+octet) ; l'ordre est celui des clés. Déplacer un élément = lui donner une clé
+strictement entre celles de ses nouveaux voisins : une seule ligne écrite,
+quelle que soit la longueur du tome ou de la colonne (avant : UPDATE de toute
+la plage de positions entre l'ancienne et la nouvelle place).
+
+Les clés ne se terminent jamais par "0" : il reste toujours de la place
+avant et entre deux clés. Ajouter en fin (ou en tête) avance d'un pas fixe
+(STEP) sur WIDTH chiffres ; insérer entre deux clés prend le milieu, qui peut
+allonger la clé. Au-delà de RANK_MAX_LENGTH caractères (config, défaut 12),
+un job de fond redistribue les clés du groupe (`rebalance`), sans changer
+l'ordre.
+
+L'API garde des positions entières (1.. pour les chapitres, 0.. pour les
+tickets et colonnes) : elles sont calculées à la lecture, plus stockées.
+"""
+import bisect
+from flask import current_app
+from sqlalchemy import func, select, update
+from .database import db
+from .models import Chapter, Ticket, TicketColumn
+
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+WIDTH = 6                 # chiffres des clés « pleines » (36^6 ≈ 2,2 milliards)
+STEP = BASE ** 3          # écart entre deux clés ajoutées en fin / redistribuées
+DEFAULT_MAX_LENGTH = 12
+
+# groupe -> (modèle, colonne du parent, tri complet)
+SCOPES = {
+    "chapters": (Chapter, Chapter.tome_id, (Chapter.rank, Chapter.created_at)),
+    "tickets": (Ticket, Ticket.column_id, (Ticket.rank,)),
+    "columns": (TicketColumn, TicketColumn.board_id, (TicketColumn.rank,)),
+}
+
+
+class RankError(ValueError):
+    pass
+
+
+# ---------- Clés ------------------------------------------------------------
+
+def _check(key):
+    if not key or key[-1] == "0" or any(c not in DIGITS for c in key):
+        raise RankError(f"invalid rank key: {key!r}")
+
+
+def _encode(value, width=WIDTH) -> str:
+    digits = []
+    for _ in range(width):
+        value, d = divmod(value, BASE)
+        digits.append(DIGITS[d])
+    return "".join(reversed(digits)).rstrip("0")
+
+
+def _decode(key, width=WIDTH) -> int:
+    """Valeur des `width` premiers chiffres (tronquée)."""
+    value = 0
+    for c in key[:width].ljust(width, "0"):
+        value = value * BASE + DIGITS.index(c)
+    return value
+
+
+def _midpoint(lo, hi):
+    """Clé strictement entre lo ("" = début) et hi (None = fin), sans "0" final."""
+    if hi is not None:
+        n = 0
+        while n < len(hi) and (lo[n] if n < len(lo) else "0") == hi[n]:
+            n += 1
+        if n:
+            return hi[:n] + _midpoint(lo[n:], hi[n:])
+    a = DIGITS.index(lo[0]) if lo else 0
+    b = DIGITS.index(hi[0]) if hi is not None else BASE
+    if b - a > 1:
+        return DIGITS[(a + b) // 2]
+    if hi is not None and len(hi) > 1:
+        return hi[0]
+    return DIGITS[a] + _midpoint(lo[1:], None)
+
+
+def between(lo=None, hi=None) -> str:
+    """Nouvelle clé entre lo et hi (None : pas de voisin de ce côté)."""
+    for key in (lo, hi):
+        if key is not None:
+            _check(key)
+    if lo is not None and hi is not None and lo >= hi:
+        raise RankError(f"{lo!r} >= {hi!r}")
+    if hi is None and lo is not None and _decode(lo) + STEP < BASE ** WIDTH:
+        return _encode(_decode(lo) + STEP)          # ajout en fin : pas fixe, longueur stable
+    if lo is None and hi is not None and _decode(hi) > STEP:
+        return _encode(_decode(hi) - STEP)          # ajout en tête
+    if lo is None and hi is None:
+        return key_for_index(0)
+    return _midpoint(lo or "", hi)
+
+
+def key_for_index(i: int) -> str:
+    """Clé du i-ème élément (0..) d'une liste redistribuée, pour i < 36^3 - 1 (= spread(n)[i])."""
+    return _encode((i + 1) * STEP)
+
+
+def spread(n: int) -> list[str]:
+    """n clés croissantes régulièrement espacées (redistribution, migration)."""
+    width = WIDTH
+    while BASE ** width // (n + 1) < BASE:
+        width += 1
+    step = min(STEP, BASE ** width // (n + 1)) if width == WIDTH else BASE ** width // (n + 1)
+    return [_encode((i + 1) * step, width) for i in range(n)]
+
+
+# ---------- Placement dans un groupe ----------------------------------------
+
+def neighbors_stmt(scope, parent_id, index, exclude_id=None):
+    """Clés autour de la place `index` (0..) du groupe, l'élément déplacé exclu."""
+    model, parent, order = SCOPES[scope]
+    return (select(model.rank).where(parent == parent_id, model.id != exclude_id)
+            .order_by(*order).offset(max(index - 1, 0)).limit(2 if index else 1))
+
+
+def last_rank_stmt(scope, parent_id, exclude_id=None):
+    model, parent, _order = SCOPES[scope]
+    return select(func.max(model.rank)).where(parent == parent_id, model.id != exclude_id)
+
+
+def index_stmt(scope, parent_id, rank):
+    """Nombre d'éléments du groupe avant la clé `rank`."""
+    model, parent, _order = SCOPES[scope]
+    return select(func.count()).select_from(model).where(parent == parent_id, model.rank < rank)
+
+
+def _neighbors(scope, parent_id, index, exclude_id):
+    rows = db.session.execute(neighbors_stmt(scope, parent_id, index, exclude_id)).scalars().all()
+    if index == 0:
+        return None, (rows[0] if rows else None)
+    return (rows[0] if rows else None), (rows[1] if len(rows) > 1 else None)
+
+
+def rank_at(scope, parent_id, index, exclude_id=None) -> str:
+    """Clé pour placer un élément à la place `index` (0.., bornée) du groupe."""
+    index = max(index, 0)
+    lo, hi = _neighbors(scope, parent_id, index, exclude_id)
+    if lo is not None and hi is not None and lo >= hi:
+        # clés en double (déplacements concurrents) : redistribution immédiate
+        rebalance(scope, parent_id)
+        lo, hi = _neighbors(scope, parent_id, index, exclude_id)
+    if index and lo is None:
+        lo = last_rank(scope, parent_id, exclude_id)   # au-delà de la fin : dernière place
+    return between(lo, hi)
+
+
+def last_rank(scope, parent_id, exclude_id=None):
+    return db.session.execute(last_rank_stmt(scope, parent_id, exclude_id)).scalar()
+
+
+def rank_after_last(scope, parent_id) -> str:
+    return between(last_rank(scope, parent_id), None)
+
+
+def index_of(scope, obj) -> int:
+    """Place (0..) de l'élément dans son groupe."""
+    _model, parent, _order = SCOPES[scope]
+    return db.session.execute(index_stmt(scope, getattr(obj, parent.key), obj.rank)).scalar()
+
+
+def needs_rebalance(key) -> bool:
+    return len(key) > current_app.config.get("RANK_MAX_LENGTH", DEFAULT_MAX_LENGTH)
+
+
+def rebalance(scope, parent_id) -> int:
+    """Redistribue les clés du groupe (ordre conservé) ; n'écrit que les lignes qui changent. Sans commit."""
+    model, parent, order = SCOPES[scope]
+    rows = db.session.execute(select(model.id, model.rank).where(parent == parent_id).order_by(*order)).all()
+    changed = 0
+    for (item_id, old), new in zip(rows, spread(len(rows))):
+        if old != new:
+            db.session.execute(update(model).where(model.id == item_id).values(rank=new),
+                               execution_options={"synchronize_session": False})
+            changed += 1
+    return changed
+
+
+def schedule_rebalance(scope, parent_id, key):
+    """Après le commit d'un déplacement : job de fond si la clé devient trop longue."""
+    if not needs_rebalance(key):
+        return None
+    from .jobs import enqueue
+    return enqueue("rebalance_ranks", {"scope": scope, "parentId": parent_id},
+                   dedupe_key=f"rebalance_ranks:{scope}:{parent_id}")
+
+
+def reorder(scope, parent_id, order) -> int:
+    """Applique un ordre complet (liste d'ids) en réécrivant le moins de lignes possible.
+
+    Les éléments qui forment la plus longue sous-suite déjà dans l'ordre gardent
+    leur clé ; les autres sont replacés entre leurs voisins. Ids inconnus
+    ignorés, éléments non cités laissés après. Sans commit ; retourne le nombre
+    de lignes réécrites.
+    """
+    model, parent, sort = SCOPES[scope]
+    current = db.session.execute(select(model.id, model.rank).where(parent == parent_id).order_by(*sort)).all()
+    ranks = dict(current)
+    wanted = list(dict.fromkeys(i for i in order if i in ranks))
+    wanted += [i for i, _r in current if i not in set(wanted)]
+
+    keep = _increasing(wanted, ranks)
+    new = {}
+    i = 0
+    while i < len(wanted):
+        if wanted[i] in keep:
+            i += 1
+            continue
+        j = i
+        while j < len(wanted) and wanted[j] not in keep:
+            j += 1
+        lo = new.get(wanted[i - 1], ranks[wanted[i - 1]]) if i else None
+        hi = ranks[wanted[j]] if j < len(wanted) else None
+        for item_id in wanted[i:j]:
+            lo = new[item_id] = between(lo, hi)
+        i = j
+    for item_id, key in new.items():
+        db.session.execute(update(model).where(model.id == item_id).values(rank=key),
+                           execution_options={"synchronize_session": False})
+    if any(needs_rebalance(k) for k in new.values()):
+        rebalance(scope, parent_id)
+    return len(new)
+
+
+def _increasing(ids, ranks) -> set:
+    """Plus longue sous-suite strictement croissante des clés (ids gardés tels quels)."""
+    tails, tail_ids, prev = [], [], {}
+    for item_id in ids:
+        key = ranks[item_id]
+        k = bisect.bisect_left(tails, key)
+        prev[item_id] = tail_ids[k - 1] if k else None
+        if k == len(tails):
+            tails.append(key)
+            tail_ids.append(item_id)
+        else:
+            tails[k], tail_ids[k] = key, item_id
+    out, item_id = set(), tail_ids[-1] if tail_ids else None
+    while item_id is not None:
+        out.add(item_id)
+        item_id = prev[item_id]
+    return out
@@ -0,0 +1,541 @@
+# backend/map_storage.py
+"""Stockage découpé (chunks) et index spatial des cartes du map-editor.
+
+Une carte de plusieurs milliers de salles était un seul document JSON, relu et
+réécrit en entier à chaque ouverture ou déplacement. Découpée, elle devient :
+
+- `map_items` : une ligne par salle / sticker (JSON de l'élément + bbox), rangée
+  dans le chunk (cx, cy) qui contient le centre de sa bbox (côté CHUNK_SIZE) ;
+  une ligne `zone` par zone, de bbox l'union de ses salles ;
+- `map_items_rtree` (SQLite) : R*Tree sur (map_key, x, y) des bbox ; map_key
+  (entier propre à la carte) isole les cartes les unes des autres dans l'index ;
+- `map_chunks` : révision de chaque chunk, garde des sauvegardes par chunk ;
+- `GameDesignComponentModel.data` : les métadonnées seules (zones, roomBank,
+  caméra...), `chunk_size` renseigné.
+
+Une requête de zone (viewport) ne lit que les éléments qui la recoupent : son
+coût dépend de la zone affichée, pas de la taille de la carte. L'index R*Tree
+stocke des flottants 32 bits (arrondis vers l'extérieur) : ses résultats sont
+affinés sur les bbox exactes de `map_items`. Hors SQLite, les mêmes requêtes
+passent par l'index (component_id, min_x, max_x).
+
+Une carte encore en un seul document est découpée à la première requête de
+l'API par chunks (`ensure_chunked`) ou par `flask map-split`. Les routes
+historiques (document entier) restent servies : le document est réassemblé à la
+lecture et redécoupé à l'écriture.
+"""
+import copy
+import math
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import (
+    DDL, String, and_, bindparam, column, delete, event, func, insert, literal, select, table, true, type_coerce,
+    update,
+)
+from sqlalchemy.orm.attributes import set_committed_value
+from .database import db
+from .models import GameDesignComponentModel, MapItem, MapChunk
+
+DEFAULT_CHUNK_SIZE = 1024
+DEFAULT_REGION_LIMIT = 5000
+_BATCH = 500
+
+CHUNKED_KINDS = ("room", "sticker")
+_LIST_KEYS = {"room": "rooms", "sticker": "stickers"}
+_ITEM_COLUMNS = ("zone_id", "layer_index", "cx", "cy", "min_x", "min_y", "max_x", "max_y", "data")
+
+CREATE_RTREE_SQL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS map_items_rtree USING rtree(
+    id, min_key, max_key, min_x, max_x, min_y, max_y
+)
+"""
+
+_rtree = table("map_items_rtree", column("id"), column("min_key"), column("max_key"),
+               column("min_x"), column("max_x"), column("min_y"), column("max_y"))
+_items = MapItem.__table__
+_chunks = MapChunk.__table__
+_components = GameDesignComponentModel.__table__
+# JSON des éléments lu brut puis décodé par le fournisseur JSON de l'app (orjson s'il est là)
+_raw_data = type_coerce(_items.c.data, String)
+
+
+class MapError(ValueError):
+    pass
+
+
+class StaleChunk(Exception):
+    def __init__(self, current):
+        super().__init__("stale chunk revision")
+        self.current = current
+
+
+def _enabled(conn) -> bool:
+    return conn.dialect.name == "sqlite"
+
+
+def is_chunked(comp) -> bool:
+    return comp.chunk_size is not None
+
+
+# ---------- Éléments -> lignes ----------------------------------------------
+
+def _num(value, what):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise MapError(f"{what} must be a finite number")
+    return float(value)
+
+
+def bbox(kind, item):
+    """(min_x, min_y, max_x, max_y) d'une salle (rect + points relatifs) ou d'un sticker."""
+    x, y = _num(item.get("x"), f"{kind} {item.get('id')}: x"), _num(item.get("y"), f"{kind} {item.get('id')}: y")
+    if kind == "sticker":
+        return x, y, x, y
+    w = _num(item.get("w", 0), f"room {item.get('id')}: w")
+    h = _num(item.get("h", 0), f"room {item.get('id')}: h")
+    xs, ys = [x, x + w], [y, y + h]
+    points = item.get("points") or []
+    if not isinstance(points, list):
+        raise MapError(f"room {item.get('id')}: points must be a list")
+    for p in points:
+        if not isinstance(p, dict):
+            raise MapError(f"room {item.get('id')}: invalid point")
+        xs.append(x + _num(p.get("x"), f"room {item.get('id')}: point x"))
+        ys.append(y + _num(p.get("y"), f"room {item.get('id')}: point y"))
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _data(value):
+    return current_app.json.loads(value) if isinstance(value, str) else value
+
+
+def chunk_of(box, size):
+    return math.floor((box[0] + box[2]) / 2 / size), math.floor((box[1] + box[3]) / 2 / size)
+
+
+def _checked(kind, items):
+    """Les éléments, après contrôle de la liste et des ids (chaîne non vide, uniques)."""
+    if not isinstance(items, list):
+        raise MapError(f"{_LIST_KEYS[kind]} must be a list")
+    seen = set()
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get("id"), str) or not item["id"]:
+            raise MapError(f"each {kind} needs a string id")
+        if item["id"] in seen:
+            raise MapError(f"duplicate {kind} id {item['id']}")
+        seen.add(item["id"])
+    return items
+
+
+def _rows(component_id, kind, items, size):
+    rows = []
+    for item in _checked(kind, items):
+        box = bbox(kind, item)
+        cx, cy = chunk_of(box, size)
+        layer = item.get("layerIndex")
+        rows.append({
+            "component_id": component_id, "kind": kind, "item_id": item["id"],
+            "zone_id": item.get("zoneId") if isinstance(item.get("zoneId"), str) else None,
+            "layer_index": layer if isinstance(layer, int) and not isinstance(layer, bool) else None,
+            "cx": cx, "cy": cy,
+            "min_x": box[0], "min_y": box[1], "max_x": box[2], "max_y": box[3],
+            "data": item,
+        })
+    return rows
+
+
+# ---------- Index R*Tree et zones -------------------------------------------
+
+def _index(conn, comp, where):
+    """Ajoute à l'index R*Tree les éléments de la carte qui vérifient `where`."""
+    if not _enabled(conn):
+        return
+    conn.execute(insert(_rtree).from_select(
+        ["id", "min_key", "max_key", "min_x", "max_x", "min_y", "max_y"],
+        select(_items.c.id, literal(comp.map_key), literal(comp.map_key),
+               _items.c.min_x, _items.c.max_x, _items.c.min_y, _items.c.max_y)
+        .where(_items.c.component_id == comp.id, where)))
+
+
+def _delete_items(conn, component_id, where):
+    if _enabled(conn):
+        conn.execute(delete(_rtree).where(_rtree.c.id.in_(
+            select(_items.c.id).where(_items.c.component_id == component_id, where))))
+    conn.execute(delete(_items).where(_items.c.component_id == component_id, where))
+
+
+def _refresh_zones(conn, comp, zone_ids=None):
+    """Recalcule la bbox (union des salles) des zones données, ou de toutes."""
+    zone_filter = and_(_items.c.kind == "zone",
+                       _items.c.item_id.in_(zone_ids) if zone_ids is not None else true())
+    _delete_items(conn, comp.id, zone_filter)
+    rooms = select(
+        _items.c.component_id, literal("zone"), _items.c.zone_id,
+        func.min(_items.c.min_x), func.min(_items.c.min_y), func.max(_items.c.max_x), func.max(_items.c.max_y),
+    ).where(_items.c.component_id == comp.id, _items.c.kind == "room", _items.c.zone_id.is_not(None))
+    if zone_ids is not None:
+        rooms = rooms.where(_items.c.zone_id.in_(zone_ids))
+    conn.execute(insert(_items).from_select(
+        ["component_id", "kind", "item_id", "min_x", "min_y", "max_x", "max_y"],
+        rooms.group_by(_items.c.zone_id)))
+    _index(conn, comp, zone_filter)
+
+
+def _next_map_key(conn):
+    return (conn.execute(select(func.max(GameDesignComponentModel.map_key))).scalar() or 0) + 1
+
+
+def _bump_chunks(conn, component_id, keys, now):
+    """Révision + 1 des chunks donnés (créés à 1 s'ils n'existaient pas)."""
+    if not keys:
+        return
+    existing = {(r.cx, r.cy) for r in conn.execute(
+        select(_chunks.c.cx, _chunks.c.cy).where(_chunks.c.component_id == component_id))}
+    for cx, cy in keys & existing:
+        conn.execute(update(_chunks)
+                     .where(_chunks.c.component_id == component_id, _chunks.c.cx == cx, _chunks.c.cy == cy)
+                     .values(revision=_chunks.c.revision + 1, updated_at=now))
+    missing = keys - existing
+    if missing:
+        conn.execute(insert(_chunks), [{"component_id": component_id, "cx": cx, "cy": cy,
+                                        "revision": 1, "updated_at": now} for cx, cy in missing])
+
+
+# ---------- Découpage / réassemblage ----------------------------------------
+
+def split(comp, doc=None, chunk_size=None):
+    """(Re)découpe la carte à partir du document entier `doc` (défaut : comp.data). Sans commit.
+
+    Carte déjà découpée : seuls les éléments ajoutés, retirés ou modifiés sont
+    écrits, et seules les révisions de leurs chunks avancent (un client qui
+    sauvegarde un de ces chunks à partir d'une version antérieure reçoit un 409).
+    """
+    doc = comp.data if doc is None else doc
+    if not isinstance(doc, dict):
+        raise MapError("map data must be an object")
+    size = chunk_size or comp.chunk_size or current_app.config.get("MAP_CHUNK_SIZE", DEFAULT_CHUNK_SIZE)
+    conn = db.session.connection()
+    lists = {kind: _checked(kind, doc.get(_LIST_KEYS[kind]) or []) for kind in CHUNKED_KINDS}
+    if comp.map_key is None:
+        comp.map_key = _next_map_key(conn)
+
+    if not (comp.chunk_size == size and _save_changes(conn, comp, lists, size)):
+        _rewrite(conn, comp, [row for kind in CHUNKED_KINDS for row in _rows(comp.id, kind, lists[kind], size)])
+    comp.chunk_size = size
+    comp.data = {k: v for k, v in doc.items() if k not in _LIST_KEYS.values()}
+
+
+def _rewrite(conn, comp, rows):
+    """Remplace tous les éléments de la carte (premier découpage, changement de taille de chunk)."""
+    old_chunks = {(r.cx, r.cy) for r in conn.execute(
+        select(_items.c.cx, _items.c.cy).distinct()
+        .where(_items.c.component_id == comp.id, _items.c.cx.is_not(None)))}
+    _delete_items(conn, comp.id, true())
+    if rows:
+        conn.execute(insert(_items), rows)
+    _index(conn, comp, true())
+    _refresh_zones(conn, comp)
+    _bump_chunks(conn, comp.id, old_chunks | {(r["cx"], r["cy"]) for r in rows}, datetime.utcnow())
+
+
+def _save_changes(conn, comp, lists, size) -> bool:
+    """Écrit seulement les éléments ajoutés, retirés ou modifiés (comme timeline_index.save).
+
+    L'ordre du document est celui des ids : False (réécriture complète) si les
+    éléments conservés ont été réordonnés ou si un nouvel élément les précède.
+    """
+    current = {(r.kind, r.item_id): r for r in conn.execute(
+        select(_items.c.id, _items.c.kind, _items.c.item_id, _items.c.zone_id, _items.c.cx, _items.c.cy,
+               _raw_data.label("data"))
+        .where(_items.c.component_id == comp.id, _items.c.kind.in_(CHUNKED_KINDS)))}
+    added, modified = {}, {}
+    for kind, items in lists.items():
+        last, appended = 0, False
+        for item in items:
+            old = current.get((kind, item["id"]))
+            if old is None:
+                appended = True
+                added.setdefault(kind, []).append(item)
+            elif appended or old.id < last:
+                return False
+            else:
+                last = old.id
+                if _data(old.data) != item:
+                    modified.setdefault(kind, []).append(item)
+
+    wanted = {(kind, item["id"]) for kind, items in lists.items() for item in items}
+    gone = [r for key, r in current.items() if key not in wanted]
+    new = [row for kind, items in added.items() for row in _rows(comp.id, kind, items, size)]
+    changed = [(current[(row["kind"], row["item_id"])], row)
+               for kind, items in modified.items() for row in _rows(comp.id, kind, items, size)]
+    before = gone + [old for old, _row in changed]
+    after = new + [row for _old, row in changed]
+    zones = {r.zone_id for r in before if r.zone_id} | {r["zone_id"] for r in after if r["zone_id"]}
+    keys = {(r.cx, r.cy) for r in before} | {(r["cx"], r["cy"]) for r in after}
+
+    gone_ids = [r.id for r in gone]
+    for i in range(0, len(gone_ids), _BATCH):
+        _delete_items(conn, comp.id, _items.c.id.in_(gone_ids[i:i + _BATCH]))
+    if changed:
+        params = [{f"b_{k}": row[k] for k in _ITEM_COLUMNS} | {"b_id": old.id} for old, row in changed]
+        conn.execute(update(_items).where(_items.c.id == bindparam("b_id"))
+                     .values(**{k: bindparam(f"b_{k}") for k in _ITEM_COLUMNS}), params)
+        if _enabled(conn):
+            conn.execute(update(_rtree).where(_rtree.c.id == bindparam("b_id"))
+                         .values(**{k: bindparam(f"b_{k}") for k in ("min_x", "max_x", "min_y", "max_y")}), params)
+    if new:
+        first = conn.execute(select(func.max(_items.c.id))).scalar() or 0
+        conn.execute(insert(_items), new)
+        _index(conn, comp, _items.c.id > first)
+    if zones:
+        _refresh_zones(conn, comp, zones)
+    _bump_chunks(conn, comp.id, keys, datetime.utcnow())
+    return True
+
+
+def ensure_chunked(comp) -> bool:
+    """Découpe une carte encore stockée en un seul document ; True si elle l'a été ici."""
+    if is_chunked(comp):
+        return False
+    split(comp)
+    return True
+
+
+def assemble(comp) -> dict:
+    """Document entier (format historique) d'une carte découpée."""
+    doc = dict(comp.data or {})
+    if not is_chunked(comp):
+        return doc
+    for kind in CHUNKED_KINDS:
+        doc[_LIST_KEYS[kind]] = []
+    stmt = (select(_items.c.kind, _raw_data)
+            .where(_items.c.component_id == comp.id, _items.c.kind.in_(CHUNKED_KINDS))
+            .order_by(_items.c.id))
+    for kind, data in db.session.execute(stmt):
+        doc[_LIST_KEYS[kind]].append(_data(data))
+    return doc
+
+
+def component_dict(comp, doc=None) -> dict:
+    """to_dict() avec le document entier, que la carte soit découpée ou non.
+
+    `doc` : document qui vient d'être découpé par split(), renvoyé sans être relu.
+    """
+    out = comp.to_dict()
+    if is_chunked(comp):
+        out["data"] = assemble(comp) if doc is None else {
+            **out["data"], **{key: doc.get(key) or [] for key in _LIST_KEYS.values()}}
+    return out
+
+
+def drop(conn, component_id):
+    _delete_items(conn, component_id, true())
+    conn.execute(delete(_chunks).where(_chunks.c.component_id == component_id))
+
+
+def reindex(conn, component_id):
+    """Nouvelle map_key et index R*Tree reconstruit (lignes insérées hors ORM : import)."""
+    comp = db.session.get(GameDesignComponentModel, component_id)
+    comp.map_key = _next_map_key(conn)
+    db.session.flush()
+    if _enabled(conn):
+        conn.execute(delete(_rtree).where(_rtree.c.id.in_(
+            select(_items.c.id).where(_items.c.component_id == component_id))))
+    _index(conn, comp, true())
+
+
+# ---------- Lecture par zone / par chunk ------------------------------------
+
+def _overlaps(cols, x0, y0, x1, y1):
+    return and_(cols.max_x >= x0, cols.min_x <= x1, cols.max_y >= y0, cols.min_y <= y1)
+
+
+def bounds(comp):
+    """Emprise de la carte (union des zones et des éléments hors zone), ou None."""
+    row = db.session.execute(
+        select(func.min(_items.c.min_x), func.min(_items.c.min_y), func.max(_items.c.max_x), func.max(_items.c.max_y))
+        .where(_items.c.component_id == comp.id, _items.c.kind.in_(("zone", "sticker")) | _items.c.zone_id.is_(None))
+    ).one()
+    return None if row[0] is None else {"x0": row[0], "y0": row[1], "x1": row[2], "y1": row[3]}
+
+
+def region(comp, x0, y0, x1, y1, zone_id=None, layer_index=None, limit=None):
+    """Éléments de la carte qui recoupent le rectangle, bornés à `limit` (+ truncated)."""
+    limit = limit or current_app.config.get("MAP_REGION_LIMIT", DEFAULT_REGION_LIMIT)
+    conn = db.session.connection()
+    stmt = select(_items.c.kind, _items.c.item_id, _items.c.cx, _items.c.cy, _items.c.data,
+                  _items.c.min_x, _items.c.min_y, _items.c.max_x, _items.c.max_y)
+    if _enabled(conn):
+        stmt = (stmt.select_from(_rtree.join(_items, _items.c.id == _rtree.c.id))
+                .where(_rtree.c.min_key <= comp.map_key, _rtree.c.max_key >= comp.map_key,
+                       _overlaps(_rtree.c, x0, y0, x1, y1)))
+    stmt = stmt.where(_items.c.component_id == comp.id, _overlaps(_items.c, x0, y0, x1, y1))
+    if zone_id is not None:
+        stmt = stmt.where(((_items.c.kind == "zone") & (_items.c.item_id == zone_id)) | (_items.c.zone_id == zone_id))
+    if layer_index is not None:
+        stmt = stmt.where((_items.c.kind == "zone") | (_items.c.layer_index == layer_index))
+
+    out = {"rooms": [], "stickers": [], "zones": [], "truncated": False}
+    keys = set()
+    for i, r in enumerate(db.session.execute(stmt.limit(limit + 1))):
+        if i == limit:
+            out["truncated"] = True
+            break
+        if r.kind == "zone":
+            out["zones"].append({"id": r.item_id,
+                                 "bounds": {"x0": r.min_x, "y0": r.min_y, "x1": r.max_x, "y1": r.max_y}})
+        else:
+            out[_LIST_KEYS[r.kind]].append(r.data)
+            keys.add((r.cx, r.cy))
+
+    # révisions des chunks de la zone et de ceux des éléments renvoyés (à fournir pour sauvegarder)
+    size = comp.chunk_size
+    cxs = [math.floor(x0 / size), math.floor(x1 / size), *(k[0] for k in keys)]
+    cys = [math.floor(y0 / size), math.floor(y1 / size), *(k[1] for k in keys)]
+    out["chunks"] = [
+        {"cx": r.cx, "cy": r.cy, "revision": r.revision}
+        for r in db.session.execute(chunks_stmt(comp.id, min(cxs), min(cys), max(cxs), max(cys)))
+    ]
+    return out
+
+
+def chunks_stmt(component_id, cx0, cy0, cx1, cy1):
+    """Révisions des chunks du rectangle [cx0, cx1] x [cy0, cy1]."""
+    return (select(_chunks.c.cx, _chunks.c.cy, _chunks.c.revision)
+            .where(_chunks.c.component_id == component_id,
+                   _chunks.c.cx.between(cx0, cx1), _chunks.c.cy.between(cy0, cy1))
+            .order_by(_chunks.c.cx, _chunks.c.cy))
+
+
+def chunk_revision(comp, cx, cy) -> int:
+    return db.session.execute(
+        select(_chunks.c.revision)
+        .where(_chunks.c.component_id == comp.id, _chunks.c.cx == cx, _chunks.c.cy == cy)
+    ).scalar() or 0
+
+
+def read_chunk(comp, cx, cy) -> dict:
+    out = {"cx": cx, "cy": cy, "revision": chunk_revision(comp, cx, cy), "rooms": [], "stickers": []}
+    for kind, data in db.session.execute(chunk_items_stmt(comp.id, cx, cy)):
+        out[_LIST_KEYS[kind]].append(data)
+    return out
+
+
+def chunk_items_stmt(component_id, cx, cy):
+    return (select(_items.c.kind, _items.c.data)
+            .where(_items.c.component_id == component_id, _items.c.cx == cx, _items.c.cy == cy)
+            .order_by(_items.c.id))
+
+
+# ---------- Écriture par chunk ----------------------------------------------
+
+def save_chunk(comp, cx, cy, payload) -> int:
+    """Remplace le contenu du chunk (cx, cy) : payload = {baseRevision, rooms, stickers}. Sans commit.
+
+    Chaque élément doit appartenir au chunk (centre de sa bbox). Un élément
+    déjà présent dans un autre chunk (déplacé) y est retiré. Retourne la
+    nouvelle révision ; lève StaleChunk si baseRevision n'est plus à jour.
+    """
+    if not isinstance(payload, dict):
+        raise MapError("body must be an object: {baseRevision, rooms, stickers}")
+    base = payload.get("baseRevision")
+    if not isinstance(base, int) or isinstance(base, bool):
+        raise MapError("baseRevision (int) required")
+    ensure_chunked(comp)
+    conn = db.session.connection()
+    now = datetime.utcnow()
+
+    rows = []
+    for kind in CHUNKED_KINDS:
+        rows += _rows(comp.id, kind, payload.get(_LIST_KEYS[kind]) or [], comp.chunk_size)
+    for row in rows:
+        if (row["cx"], row["cy"]) != (cx, cy):
+            raise MapError(f"{row['kind']} {row['item_id']} belongs to chunk "
+                           f"{row['cx']},{row['cy']}, not {cx},{cy}")
+
+    # garde : UPDATE conditionnel sur la révision (deux sauvegardes simultanées -> une seule passe)
+    current = chunk_revision(comp, cx, cy)
+    if base != current:
+        raise StaleChunk(current)
+    if current:
+        done = conn.execute(update(_chunks)
+                            .where(_chunks.c.component_id == comp.id, _chunks.c.cx == cx,
+                                   _chunks.c.cy == cy, _chunks.c.revision == base)
+                            .values(revision=base + 1, updated_at=now)).rowcount
+        if not done:
+            raise StaleChunk(chunk_revision(comp, cx, cy))
+    else:
+        conn.execute(insert(_chunks).values(component_id=comp.id, cx=cx, cy=cy, revision=1, updated_at=now))
+
+    in_chunk = and_(_items.c.cx == cx, _items.c.cy == cy)
+    moved = {}
+    for kind in CHUNKED_KINDS:
+        ids = [r["item_id"] for r in rows if r["kind"] == kind]
+        if ids:
+            moved[kind] = and_(_items.c.kind == kind, _items.c.item_id.in_(ids), ~in_chunk)
+    replaced = in_chunk
+    for cond in moved.values():
+        replaced = replaced | cond
+
+    zones = {r["zone_id"] for r in rows if r["zone_id"]}
+    others = set()
+    for r in conn.execute(select(_items.c.zone_id, _items.c.cx, _items.c.cy)
+                          .where(_items.c.component_id == comp.id, replaced)):
+        if r.zone_id:
+            zones.add(r.zone_id)
+        if (r.cx, r.cy) != (cx, cy):
+            others.add((r.cx, r.cy))
+
+    _delete_items(conn, comp.id, replaced)
+    if rows:
+        conn.execute(insert(_items), rows)
+    _index(conn, comp, in_chunk)
+    if zones:
+        _refresh_zones(conn, comp, zones)
+    _bump_chunks(conn, comp.id, others, now)
+
+    # date du composant (routes historiques, ETag) posée hors ORM : la ligne versionnée
+    # (revision) n'est pas réécrite, deux chunks différents se sauvegardent en parallèle
+    conn.execute(update(_components).where(_components.c.id == comp.id).values(updated_at=now))
+    set_committed_value(comp, "updated_at", now)
+    return base + 1
+
+
+def update_meta(comp, meta):
+    """Remplace les métadonnées (zones, roomBank, caméra...) ; rooms / stickers ignorés. Sans commit."""
+    if not isinstance(meta, dict):
+        raise MapError("meta must be an object")
+    ensure_chunked(comp)
+    comp.data = {k: copy.deepcopy(v) for k, v in meta.items() if k not in _LIST_KEYS.values()}
+
+
+# ---------- Hooks -----------------------------------------------------------
+
+def _before_flush(session, flush_context, instances):
+    """Composant supprimé (route, cascade du projet) : ses lignes de carte avec lui."""
+    for obj in session.deleted:
+        if isinstance(obj, GameDesignComponentModel) and obj.chunk_size is not None:
+            drop(session.connection(), obj.id)
+
+
+def split_all() -> int:
+    n = 0
+    for comp in GameDesignComponentModel.query.filter_by(component_type="map-editor", chunk_size=None):
+        split(comp)
+        n += 1
+    db.session.commit()
+    return n
+
+
+_create_rtree_ddl = DDL(CREATE_RTREE_SQL).execute_if(dialect="sqlite")
+
+
+def init_app(app):
+    if not event.contains(db.session, "before_flush", _before_flush):
+        event.listen(db.session, "before_flush", _before_flush)
+    if not event.contains(db.metadata, "after_create", _create_rtree_ddl):
+        event.listen(db.metadata, "after_create", _create_rtree_ddl)
+
+    @app.cli.command("map-split")
+    def map_split_command():
+        """Découpe en chunks les cartes encore stockées en un seul document."""
+        print(f"{split_all()} carte(s) découpée(s)")
@@ -9,6 +9,11 @@ class Project(db.Model):
     name = db.Column(db.String(200), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
+    tree_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")  # incrémenté à chaque changement de l'arbre (cf. project_tree)
+
+    __table_args__ = (
+        db.Index('ix_projects_created_at_id', 'created_at', 'id'),
+    )
 
     collections = db.relationship('Collection', back_populates='project', cascade='all, delete-orphan')
     game_design_components = db.relationship('GameDesignComponentModel', back_populates='project', cascade='all, delete-orphan')
@@ -31,6 +36,10 @@ class Collection(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_collections_project_created_id', 'project_id', 'created_at', 'id'),
+    )
+
     project = db.relationship('Project', back_populates='collections')
     sagas = db.relationship('Saga', back_populates='collection', cascade='all, delete-orphan')
     characters = db.relationship('Character', back_populates='collection', cascade='all, delete-orphan')
@@ -60,6 +69,10 @@ class Saga(db.Model):
     collection = db.relationship('Collection', back_populates='sagas')
     tomes = db.relationship('Tome', back_populates='saga', cascade='all, delete-orphan')
 
+    __table_args__ = (
+        db.Index('ix_sagas_collection_created', 'collection_id', 'created_at'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -82,6 +95,10 @@ class Tome(db.Model):
     saga = db.relationship('Saga', back_populates='tomes')
     chapters = db.relationship('Chapter', back_populates='tome', cascade='all, delete-orphan')
 
+    __table_args__ = (
+        db.Index('ix_tomes_saga_created', 'saga_id', 'created_at'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -99,11 +116,19 @@ class Chapter(db.Model):
     tome_id = db.Column(db.String, db.ForeignKey('tomes.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
-    position = db.Column(db.Integer, nullable=True)
+    rank = db.Column(db.String(64), nullable=False)  # clé d'ordre dans le tome (cf. lexorank)
     notes = db.Column(db.Text, default="")
     annotations = db.Column(db.JSON, nullable=True, default=dict)
+    ops_seq = db.Column(db.Integer, nullable=False, default=0)  # dernière op intégrée au snapshot
 
     tome = db.relationship('Tome', back_populates='chapters')
+    stats = db.relationship('ChapterStats', back_populates='chapter', uselist=False, cascade='all, delete-orphan')
+    ops = db.relationship('ChapterOp', back_populates='chapter', cascade='all, delete-orphan')
+    revisions = db.relationship('ChapterRevision', back_populates='chapter', cascade='all, delete-orphan')
+
+    __table_args__ = (
+        db.Index('ix_chapters_tome_rank', 'tome_id', 'rank', 'created_at'),
+    )
 
     def to_dict(self):
         return {
@@ -111,13 +136,61 @@ class Chapter(db.Model):
             'title': self.title,
             'content': self.content,
             'tomeId': self.tome_id,
-            'position': self.position,
+            'rank': self.rank,
             "notes": self.notes or "",
             'annotations': self.annotations or {},
             'createdAt': self.created_at.isoformat(),
             'updatedAt': self.updated_at.isoformat() if self.updated_at else None
         }
     
+class ChapterOp(db.Model):
+    """Opérations texte en attente de compaction dans Chapter.content (cf. chapter_ops)."""
+    __tablename__ = 'chapter_ops'
+    chapter_id = db.Column(db.String, db.ForeignKey('chapters.id'), primary_key=True)
+    seq = db.Column(db.Integer, primary_key=True)
+    base_version = db.Column(db.String(40), nullable=False)
+    version = db.Column(db.String(40), nullable=False)
+    ops = db.Column(db.JSON, nullable=False)   # {content: [{at, delete, insert}], notes: [...]}
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    chapter = db.relationship('Chapter', back_populates='ops')
+
+class ChapterRevision(db.Model):
+    """Historique du texte : keyframe ou delta zlib (cf. chapter_revisions)."""
+    __tablename__ = 'chapter_revisions'
+    chapter_id = db.Column(db.String, db.ForeignKey('chapters.id'), primary_key=True)
+    number = db.Column(db.Integer, primary_key=True)
+    is_keyframe = db.Column(db.Boolean, nullable=False, default=False)
+    version = db.Column(db.String(40), nullable=False)
+    size = db.Column(db.Integer, nullable=False, default=0)   # caractères (content + notes)
+    data = db.deferred(db.Column(db.LargeBinary, nullable=False))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    chapter = db.relationship('Chapter', back_populates='revisions')
+
+class ChapterStats(db.Model):
+    """Statistiques dérivées de Chapter.content, recalculées à l'écriture (cf. text_stats)."""
+    __tablename__ = 'chapter_stats'
+    chapter_id = db.Column(db.String, db.ForeignKey('chapters.id'), primary_key=True)
+    content_hash = db.Column(db.String(64), nullable=False)
+    word_count = db.Column(db.Integer, nullable=False, default=0)
+    char_count = db.Column(db.Integer, nullable=False, default=0)
+    entities = db.Column(db.JSON, nullable=False, default=list)   # [{id, type, label, count}]
+    words = db.Column(db.JSON, nullable=False, default=dict)      # {mot: occurrences} hors mots-outils
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    chapter = db.relationship('Chapter', back_populates='stats')
+
+    def to_dict(self):
+        return {
+            'chapterId': self.chapter_id,
+            'wordCount': self.word_count,
+            'charCount': self.char_count,
+            'entities': self.entities or [],
+            'contentHash': self.content_hash,
+            'updatedAt': self.updated_at.isoformat() if self.updated_at else None,
+        }
+
 class Character(db.Model):
     __tablename__ = 'characters'
     id = db.Column(db.String, primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -131,6 +204,10 @@ class Character(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_characters_collection_name_id', 'collection_id', 'lastname', 'firstname', 'id'),
+    )
+
     collection = db.relationship('Collection', back_populates='characters')
     tags = db.relationship('Tag', secondary='character_tags', back_populates='characters')
 
@@ -156,14 +233,21 @@ class CharacterTemplate(db.Model):
     character_template = db.Column(db.JSON, nullable=False, default=dict)  # <— JSON portable
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
+    revision = db.Column(db.Integer, nullable=False, server_default="0")  # garde des PATCH (cf. json_patch)
 
     collection = db.relationship('Collection', back_populates='character_templates')
 
+    __table_args__ = (
+        db.Index('ix_character_templates_collection_id', 'collection_id'),
+    )
+    __mapper_args__ = {'version_id_col': revision}
+
     def to_dict(self):
         return {
             'id': self.id,
             'collectionId': self.collection_id,
             'characterTemplate': self.character_template or {},
+            'revision': self.revision,
             'createdAt': self.created_at.isoformat(),
             'updatedAt': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -178,6 +262,11 @@ class Tag(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     scope = db.Column(db.String(32), nullable=False, default='character')
 
+    __table_args__ = (
+        db.Index('ix_tags_collection_scope_name_id', 'collection_id', 'scope', 'name', 'id'),
+        db.Index('ix_tags_collection_name_id', 'collection_id', 'name', 'id'),
+    )
+
     characters = db.relationship('Character', secondary='character_tags', back_populates='tags')
     places = db.relationship('Place', secondary='place_tags', back_populates='tags')
     items = db.relationship('Item', secondary='item_tags', back_populates='tags')
@@ -192,6 +281,10 @@ class CharacterTag(db.Model):
     character_id = db.Column(db.String, db.ForeignKey('characters.id'), primary_key=True)
     tag_id       = db.Column(db.String, db.ForeignKey('tags.id'), primary_key=True)
 
+    __table_args__ = (
+        db.Index('ix_character_tags_tag_id', 'tag_id', 'character_id'),
+    )
+
 class Place(db.Model):
     __tablename__ = 'places'
     id = db.Column(db.String, primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -205,6 +298,10 @@ class Place(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_places_collection_name_id', 'collection_id', 'name', 'id'),
+    )
+
     collection = db.relationship('Collection', back_populates='places')
     tags = db.relationship('Tag', secondary='place_tags', back_populates='places')
 
@@ -227,6 +324,10 @@ class PlaceTag(db.Model):
     place_id = db.Column(db.String, db.ForeignKey('places.id'), primary_key=True)
     tag_id   = db.Column(db.String, db.ForeignKey('tags.id'), primary_key=True)
 
+    __table_args__ = (
+        db.Index('ix_place_tags_tag_id', 'tag_id', 'place_id'),
+    )
+
 class Item(db.Model):
     __tablename__ = 'items'
     id = db.Column(db.String, primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -240,6 +341,10 @@ class Item(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_items_collection_name_id', 'collection_id', 'name', 'id'),
+    )
+
     collection = db.relationship('Collection', back_populates='items')
     tags = db.relationship('Tag', secondary='item_tags', back_populates='items')
 
@@ -263,6 +368,10 @@ class ItemTag(db.Model):
     item_id = db.Column(db.String, db.ForeignKey('items.id'), primary_key=True)
     tag_id  = db.Column(db.String, db.ForeignKey('tags.id'), primary_key=True)
 
+    __table_args__ = (
+        db.Index('ix_item_tags_tag_id', 'tag_id', 'item_id'),
+    )
+
 class Event(db.Model):
     __tablename__ = 'events'
     id = db.Column(db.String, primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -278,6 +387,10 @@ class Event(db.Model):
     created_at    = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at    = db.Column(db.DateTime, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_events_collection_start_name_id', 'collection_id', 'start_date', 'name', 'id'),
+    )
+
     collection = db.relationship('Collection', back_populates='events')
     tags = db.relationship('Tag', secondary='event_tags', back_populates='events')
 
@@ -301,6 +414,10 @@ class EventTag(db.Model):
     event_id = db.Column(db.String, db.ForeignKey('events.id'), primary_key=True)
     tag_id   = db.Column(db.String, db.ForeignKey('tags.id'), primary_key=True)
 
+    __table_args__ = (
+        db.Index('ix_event_tags_tag_id', 'tag_id', 'event_id'),
+    )
+
 
 class CollectionTimeline(db.Model):
     __tablename__ = 'collection_timelines'
@@ -309,19 +426,59 @@ class CollectionTimeline(db.Model):
     data = db.Column(db.JSON, nullable=True, default=dict)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
+    revision = db.Column(db.Integer, nullable=False, server_default="0")
 
     collection = db.relationship('Collection', back_populates='timeline')
 
+    __mapper_args__ = {'version_id_col': revision}
+
     def to_dict(self):
         return {
             'id': self.id,
             'collectionId': self.collection_id,
             'data': self.data or {},
+            'revision': self.revision,
             'createdAt': self.created_at.isoformat() if self.created_at else None,
             'updatedAt': self.updated_at.isoformat() if self.updated_at else None,
         }
 
 
+class TimelineEntry(db.Model):
+    """Intervalle de la frise : un élément de la frise ('item') ou un événement ('event').
+
+    Bornes en jours ordinaux (date.toordinal) ; span_class = bit_length(fin - début)
+    borne la recherche par fenêtre (voir backend/timeline_index.py).
+    """
+    __tablename__ = 'timeline_entries'
+    id = db.Column(db.Integer, primary_key=True)
+    collection_id = db.Column(db.String, db.ForeignKey('collections.id'), nullable=False)
+    kind = db.Column(db.String(8), nullable=False)  # 'item' | 'event'
+    item_id = db.Column(db.String, nullable=True)   # id de l'élément dans la frise (kind 'item')
+    event_id = db.Column(db.String, nullable=True)  # événement placé / indexé
+    seq = db.Column(db.Integer, nullable=True)      # ordre de l'élément dans la frise
+    start_ord = db.Column(db.Integer, nullable=True)  # NULL : élément sans événement daté
+    end_ord = db.Column(db.Integer, nullable=True)
+    span_class = db.Column(db.Integer, nullable=True)
+    data = db.Column(db.JSON, nullable=True)        # élément de la frise tel qu'envoyé par le client
+
+    __table_args__ = (
+        db.UniqueConstraint('collection_id', 'item_id', name='uq_timeline_entries_collection_item'),
+        db.Index('ix_timeline_entries_window', 'collection_id', 'kind', 'span_class', 'start_ord'),
+        db.Index('ix_timeline_entries_collection_kind_seq', 'collection_id', 'kind', 'seq'),
+        db.Index('ix_timeline_entries_event', 'event_id'),
+    )
+
+
+class EventBucket(db.Model):
+    """Histogramme des événements d'une collection par niveau de zoom (cf. backend/event_histogram.py)."""
+    __tablename__ = 'event_buckets'
+    collection_id = db.Column(db.String, db.ForeignKey('collections.id'), primary_key=True)
+    level = db.Column(db.String(8), primary_key=True)   # 'day' | 'month' | 'year' | 'decade'
+    bucket = db.Column(db.Integer, primary_key=True)    # jour ordinal, année * 12 + mois - 1, année, année // 10
+    starts = db.Column(db.Integer, nullable=False, default=0)  # événements qui commencent dans le bucket
+    ends = db.Column(db.Integer, nullable=False, default=0)    # événements qui s'y terminent
+
+
 class GameDesignComponentModel(db.Model):
     __tablename__ = 'game_design_components'
     id = db.Column(db.String, primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -330,12 +487,19 @@ class GameDesignComponentModel(db.Model):
     data = db.Column(db.JSON, nullable=True, default=dict)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
+    revision = db.Column(db.Integer, nullable=False, server_default="0")
+    # map-editor découpé en chunks (cf. map_storage) : data ne garde que les métadonnées
+    chunk_size = db.Column(db.Integer, nullable=True)
+    map_key = db.Column(db.Integer, nullable=True)  # dimension de l'index R*Tree
 
     project = db.relationship('Project', back_populates='game_design_components')
 
     __table_args__ = (
         db.UniqueConstraint('project_id', 'component_type', name='uq_project_component'),
+        db.UniqueConstraint('map_key', name='uq_game_design_components_map_key'),
+        db.Index('ix_game_design_components_project_created', 'project_id', 'created_at'),
     )
+    __mapper_args__ = {'version_id_col': revision}
 
     def to_dict(self):
         return {
@@ -343,11 +507,48 @@ class GameDesignComponentModel(db.Model):
             'projectId': self.project_id,
             'componentType': self.component_type,
             'data': self.data or {},
+            'revision': self.revision,
             'createdAt': self.created_at.isoformat() if self.created_at else None,
             'updatedAt': self.updated_at.isoformat() if self.updated_at else None,
         }
 
 
+class MapItem(db.Model):
+    """Salle, sticker ou zone d'une carte découpée ; bbox indexée par map_items_rtree."""
+    __tablename__ = 'map_items'
+    id = db.Column(db.Integer, primary_key=True)  # rowid, partagé avec l'index R*Tree
+    component_id = db.Column(db.String, db.ForeignKey('game_design_components.id'), nullable=False)
+    kind = db.Column(db.String(16), nullable=False)  # 'room' | 'sticker' | 'zone'
+    item_id = db.Column(db.String, nullable=False)
+    zone_id = db.Column(db.String, nullable=True)
+    layer_index = db.Column(db.Integer, nullable=True)
+    cx = db.Column(db.Integer, nullable=True)  # chunk du centre de la bbox (NULL : zone)
+    cy = db.Column(db.Integer, nullable=True)
+    min_x = db.Column(db.Float, nullable=False)
+    min_y = db.Column(db.Float, nullable=False)
+    max_x = db.Column(db.Float, nullable=False)
+    max_y = db.Column(db.Float, nullable=False)
+    data = db.Column(db.JSON, nullable=True)
+
+    __table_args__ = (
+        db.UniqueConstraint('component_id', 'kind', 'item_id', name='uq_map_items_component_kind_item'),
+        db.Index('ix_map_items_component_chunk', 'component_id', 'cx', 'cy'),
+        db.Index('ix_map_items_component_zone', 'component_id', 'zone_id'),
+        # requêtes de zone hors SQLite (pas de R*Tree)
+        db.Index('ix_map_items_component_bbox', 'component_id', 'min_x', 'max_x'),
+    )
+
+
+class MapChunk(db.Model):
+    """Révision d'un chunk de carte (garde des sauvegardes par chunk)."""
+    __tablename__ = 'map_chunks'
+    component_id = db.Column(db.String, db.ForeignKey('game_design_components.id'), primary_key=True)
+    cx = db.Column(db.Integer, primary_key=True)
+    cy = db.Column(db.Integer, primary_key=True)
+    revision = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 # ─── Project Members ───
 
 class ProjectMember(db.Model):
@@ -362,6 +563,10 @@ class ProjectMember(db.Model):
     project = db.relationship('Project', back_populates='members')
     assignments = db.relationship('TicketAssignee', back_populates='member', cascade='all, delete-orphan')
 
+    __table_args__ = (
+        db.Index('ix_project_members_project_created', 'project_id', 'created_at'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -384,7 +589,7 @@ class TicketBoard(db.Model):
 
     project = db.relationship('Project', back_populates='ticket_board')
     columns = db.relationship('TicketColumn', back_populates='board', cascade='all, delete-orphan',
-                              order_by='TicketColumn.position')
+                              order_by='TicketColumn.rank')
 
     def to_dict(self):
         return {
@@ -402,12 +607,16 @@ class TicketColumn(db.Model):
     board_id = db.Column(db.String, db.ForeignKey('ticket_boards.id'), nullable=False)
     name = db.Column(db.String(100), nullable=False)
     color = db.Column(db.String(32), nullable=False, default='#6366f1')  # column accent color
-    position = db.Column(db.Integer, nullable=False, default=0)
+    rank = db.Column(db.String(64), nullable=False)  # order on the board (see lexorank)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     board = db.relationship('TicketBoard', back_populates='columns')
     tickets = db.relationship('Ticket', back_populates='column', cascade='all, delete-orphan',
-                              order_by='Ticket.position')
+                              order_by='Ticket.rank')
+
+    __table_args__ = (
+        db.Index('ix_ticket_columns_board_rank', 'board_id', 'rank'),
+    )
 
     def to_dict(self):
         return {
@@ -415,7 +624,7 @@ class TicketColumn(db.Model):
             'boardId': self.board_id,
             'name': self.name,
             'color': self.color,
-            'position': self.position,
+            'rank': self.rank,
             'tickets': [t.to_dict() for t in self.tickets],
             'createdAt': self.created_at.isoformat() if self.created_at else None,
         }
@@ -428,7 +637,7 @@ class Ticket(db.Model):
     title = db.Column(db.String(300), nullable=False)
     description = db.Column(db.Text, nullable=True, default='')
     priority = db.Column(db.String(20), nullable=False, default='medium')  # low, medium, high, critical
-    position = db.Column(db.Integer, nullable=False, default=0)
+    rank = db.Column(db.String(64), nullable=False)  # order in the column (see lexorank)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
 
@@ -438,6 +647,10 @@ class Ticket(db.Model):
                                 order_by='TicketChecklistItem.position')
     assignees = db.relationship('TicketAssignee', back_populates='ticket', cascade='all, delete-orphan')
 
+    __table_args__ = (
+        db.Index('ix_tickets_column_rank', 'column_id', 'rank'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -445,7 +658,7 @@ class Ticket(db.Model):
             'title': self.title,
             'description': self.description or '',
             'priority': self.priority,
-            'position': self.position,
+            'rank': self.rank,
             'tags': [t.to_dict() for t in self.tags],
             'checklist': [c.to_dict() for c in self.checklist],
             'assignees': [a.to_dict() for a in self.assignees],
@@ -463,6 +676,10 @@ class TicketTag(db.Model):
 
     ticket = db.relationship('Ticket', back_populates='tags')
 
+    __table_args__ = (
+        db.Index('ix_ticket_tags_ticket_id', 'ticket_id'),
+    )
+
     def to_dict(self):
         return {'id': self.id, 'ticketId': self.ticket_id, 'name': self.name, 'color': self.color}
 
@@ -477,6 +694,10 @@ class TicketChecklistItem(db.Model):
 
     ticket = db.relationship('Ticket', back_populates='checklist')
 
+    __table_args__ = (
+        db.Index('ix_ticket_checklist_items_ticket_position', 'ticket_id', 'position'),
+    )
+
     def to_dict(self):
         return {'id': self.id, 'ticketId': self.ticket_id, 'text': self.text, 'done': self.done, 'position': self.position}
 
@@ -489,5 +710,39 @@ class TicketAssignee(db.Model):
     ticket = db.relationship('Ticket', back_populates='assignees')
     member = db.relationship('ProjectMember', back_populates='assignments')
 
+    __table_args__ = (
+        db.Index('ix_ticket_assignees_member_id', 'member_id'),
+    )
+
+    def to_dict(self):
+        return {'ticketId': self.ticket_id, 'memberId': self.member_id, 'memberName': self.member.name, 'memberColor': self.member.color}
+
+class Job(db.Model):
+    """Tâche de fond (export PDF, analytics...) exécutée par le pool de process (cf. jobs)."""
+    __tablename__ = 'jobs'
+    id = db.Column(db.String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    kind = db.Column(db.String(50), nullable=False)
+    params = db.Column(db.JSON, nullable=False, default=dict)
+    dedupe_key = db.Column(db.String(200), nullable=True, index=True)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued|running|done|failed
+    progress = db.Column(db.Float, nullable=False, default=0.0)
+    result = db.Column(db.JSON, nullable=True)
+    result_path = db.Column(db.String, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
     def to_dict(self):
-        return {'ticketId': self.ticket_id, 'memberId': self.member_id, 'memberName': self.member.name, 'memberColor': self.member.color}
\ No newline at end of file
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'params': self.params or {},
+            'status': self.status,
+            'progress': self.progress,
+            'error': self.error,
+            'hasFile': bool(self.result_path),
+            'createdAt': self.created_at.isoformat() if self.created_at else None,
+            'startedAt': self.started_at.isoformat() if self.started_at else None,
+            'finishedAt': self.finished_at.isoformat() if self.finished_at else None,
+        }
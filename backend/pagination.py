@@ -0,0 +1,121 @@
+# backend/pagination.py
+"""Pagination par clé (keyset) des listes.
+
+Le curseur encode les valeurs de tri de la dernière ligne renvoyée (la clé
+primaire en dernier, pour départager) ; la page suivante filtre sur
+`(clés de tri) > (curseur)`, ce qu'un index composite couvrant le tri sert
+sans parcourir les pages précédentes (contrairement à OFFSET).
+
+Opt-in : sans `limit` ni `cursor`, les routes renvoient la liste complète
+(ancien format, un tableau JSON) ; avec, `{items, nextCursor}`.
+"""
+import base64
+import json
+from datetime import date, datetime
+from flask import request
+from sqlalchemy import tuple_
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+class InvalidPage(ValueError):
+    pass
+
+
+class Page:
+    def __init__(self, limit: int, after=None):
+        self.limit = limit
+        self.after = after      # valeurs de tri du curseur (types Python), ou None
+
+
+def _to_json(v):
+    return v.isoformat() if isinstance(v, (date, datetime)) else v
+
+
+def _from_json(column, v):
+    if v is None:
+        return None
+    try:
+        pytype = column.type.python_type
+    except NotImplementedError:
+        return v
+    if pytype is datetime:
+        return datetime.fromisoformat(v)
+    if pytype is date:
+        return date.fromisoformat(v)
+    return v
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps([_to_json(v) for v in values], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except ValueError:
+        raise InvalidPage("invalid cursor")
+    if not isinstance(values, list):
+        raise InvalidPage("invalid cursor")
+    return values
+
+
+def page_from_request(order_by):
+    """Page demandée (?limit=&cursor=), ou None si la route doit tout renvoyer.
+
+    `order_by` : colonnes du tri (PK en dernier), pour relire le curseur.
+    Lève InvalidPage si limit / cursor sont invalides.
+    """
+    limit, cursor = request.args.get("limit"), request.args.get("cursor")
+    if limit is None and not cursor:
+        return None
+    try:
+        limit = DEFAULT_LIMIT if limit is None else int(limit)
+    except ValueError:
+        raise InvalidPage("limit must be an integer")
+    after = None
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(order_by):
+            raise InvalidPage("invalid cursor")
+        try:
+            after = [_from_json(c, v) for c, v in zip(order_by, values)]
+        except (TypeError, ValueError):
+            raise InvalidPage("invalid cursor")
+    return Page(max(1, min(limit, MAX_LIMIT)), after)
+
+
+def keyset_query(q, order_by, page):
+    """Requête d'une page : tri `order_by`, filtre du curseur et une ligne de plus que `limit`.
+
+    Sans `page` (liste complète), seulement le tri.
+    """
+    q = q.order_by(*[c.asc() for c in order_by])
+    if page is None:
+        return q
+    if page.after is not None:
+        q = q.filter(tuple_(*order_by) > tuple_(*page.after))
+    return q.limit(page.limit + 1)
+
+
+def keyset(q, order_by, page):
+    """Applique le tri `order_by` (colonnes ascendantes, PK en dernier) et la page.
+
+    Retourne (lignes, nextCursor) ; nextCursor vaut None sur la dernière page
+    ou quand `page` est None (liste complète).
+    """
+    rows = keyset_query(q, order_by, page).all()
+    if page is None or len(rows) <= page.limit:
+        return rows, None
+    rows = rows[:page.limit]
+    return rows, encode_cursor([getattr(rows[-1], c.key) for c in order_by])
+
+
+def page_response(items, page, next_cursor):
+    """Corps JSON : tableau (sans pagination) ou {items, nextCursor}."""
+    if page is None:
+        return items
+    return {"items": items, "nextCursor": next_cursor}
@@ -0,0 +1,306 @@
+# backend/project_archive.py
+"""Sauvegarde / migration d'un projet entier : archive zip de fichiers NDJSON.
+
+Export : un fichier `<table>.ndjson` par table (une ligne JSON par ligne SQL,
+colonnes sous leur nom en base), puis `manifest.json` (format, projet, nombre
+de lignes). Le zip est produit au fil de la lecture (curseur par lots, flux
+sans seek) : la mémoire reste de l'ordre de CHUNK_SIZE, quelle que soit la
+taille des chapitres.
+
+Non exportés : l'historique des révisions et les statistiques de chapitres
+(recalculées à la demande) ; les ops de chapitre en attente le sont, le texte
+courant reste donc exact.
+
+Import : les tables sont relues dans le même ordre (parents avant enfants),
+insérées par lots (executemany) avec de nouveaux ids ; les clés étrangères
+sont remappées, celles vers `projects` pointent sur le projet cible. Une ligne
+dont le parent manque est ignorée (comptée dans `skipped`). Le tableau de
+tickets du projet cible, s'il existe, est réutilisé ; un composant de game
+design déjà présent (même type) n'est pas remplacé. L'index plein texte, celui
+des cartes découpées (R*Tree), les bornes des frises, les histogrammes
+d'événements et `tree_version` sont mis à jour dans la même transaction.
+"""
+import json
+import uuid
+import zipfile
+from datetime import date, datetime, timezone
+from flask import current_app
+from sqlalchemy import Date, DateTime, Integer, select
+from .database import db
+from .models import (
+    Collection, Saga, Tome, Chapter, ChapterOp, Character, CharacterTag, CharacterTemplate, Tag,
+    Place, PlaceTag, Item, ItemTag, Event, EventTag, CollectionTimeline, TimelineEntry,
+    GameDesignComponentModel, MapItem, MapChunk,
+    ProjectMember, TicketBoard, TicketColumn, Ticket, TicketTag, TicketChecklistItem, TicketAssignee,
+)
+from . import search, map_storage, timeline_index, event_histogram
+from .project_tree import bump_tree_version
+from .lexorank import key_for_index
+
+ARCHIVE_FORMAT = 1
+MANIFEST = "manifest.json"
+
+CHUNK_SIZE = 256 * 1024          # octets de zip accumulés avant de les envoyer
+BATCH_ROWS = 500                 # lignes par executemany
+BATCH_BYTES = 8 * 1024 * 1024    # ... ou moins, si les lignes sont grosses (chapitres)
+
+# (modèle, jointures jusqu'au modèle qui porte project_id), parents avant enfants
+_TABLES = (
+    (Collection, ()),
+    (Saga, (Collection,)),
+    (Tome, (Saga, Collection)),
+    (Chapter, (Tome, Saga, Collection)),
+    (ChapterOp, (Chapter, Tome, Saga, Collection)),
+    (Tag, (Collection,)),
+    (Character, (Collection,)),
+    (CharacterTag, (Character, Collection)),
+    (CharacterTemplate, (Collection,)),
+    (Place, (Collection,)),
+    (PlaceTag, (Place, Collection)),
+    (Item, (Collection,)),
+    (ItemTag, (Item, Collection)),
+    (Event, (Collection,)),
+    (EventTag, (Event, Collection)),
+    (CollectionTimeline, (Collection,)),
+    (TimelineEntry, (Collection,)),
+    (GameDesignComponentModel, ()),
+    (MapItem, (GameDesignComponentModel,)),
+    (MapChunk, (GameDesignComponentModel,)),
+    (ProjectMember, ()),
+    (TicketBoard, ()),
+    (TicketColumn, (TicketBoard,)),
+    (Ticket, (TicketColumn, TicketBoard)),
+    (TicketTag, (Ticket, TicketColumn, TicketBoard)),
+    (TicketChecklistItem, (Ticket, TicketColumn, TicketBoard)),
+    (TicketAssignee, (Ticket, TicketColumn, TicketBoard)),
+)
+
+
+class ArchiveError(ValueError):
+    pass
+
+
+def _fk_target(column):
+    fk = next(iter(column.foreign_keys), None)
+    return fk.column.table.name if fk is not None else None
+
+
+# ---------- Export ----------------------------------------------------------
+
+def _scope(model, chain, project_id):
+    table = model.__table__
+    stmt = select(*table.columns).select_from(model)
+    for parent in chain:
+        stmt = stmt.join(parent)
+    owner = chain[-1] if chain else model
+    stmt = stmt.where(owner.project_id == project_id)
+    if model is ChapterOp:
+        # seules les ops pas encore intégrées au snapshot du chapitre
+        stmt = stmt.where(ChapterOp.seq > Chapter.ops_seq)
+    elif model is TimelineEntry:
+        # éléments de la frise ; l'index des événements est reconstruit à l'import
+        stmt = stmt.where(TimelineEntry.kind == "item")
+    return stmt.order_by(*table.primary_key.columns)
+
+
+class _Sink:
+    """Fichier en écriture seule, sans seek : zipfile écrit alors des data descriptors."""
+
+    def __init__(self):
+        self._chunks = []
+        self.size = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self.size = 0
+        return data
+
+
+def export_archive(project):
+    """Générateur des octets du zip (à servir avec stream_with_context)."""
+    dumps = current_app.json.dumps
+    sink = _Sink()
+    counts = {}
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for model, chain in _TABLES:
+            name = model.__tablename__
+            n = 0
+            # taille inconnue à l'avance (flux) : zip64 d'emblée
+            with zf.open(f"{name}.ndjson", "w", force_zip64=True) as out:
+                stmt = _scope(model, chain, project.id).execution_options(yield_per=BATCH_ROWS)
+                for row in db.session.execute(stmt):
+                    out.write(dumps(dict(row._mapping)).encode("utf-8") + b"\n")
+                    n += 1
+                    if sink.size >= CHUNK_SIZE:
+                        yield sink.take()
+            counts[name] = n
+        zf.writestr(MANIFEST, dumps({
+            "format": ARCHIVE_FORMAT,
+            "exportedAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "project": {"id": project.id, "name": project.name},
+            "tables": counts,
+        }))
+    yield sink.take()
+
+
+# ---------- Import ----------------------------------------------------------
+
+class _Importer:
+    def __init__(self, conn, project_id):
+        self.conn = conn
+        self.project_id = project_id
+        # seules les tables référencées par une clé étrangère gardent leur table d'ids
+        self.ids = {_fk_target(c): {} for model, _chain in _TABLES for c in model.__table__.columns
+                    if _fk_target(c) not in (None, "projects")}
+        self.inserted = {}
+        self.skipped = {}
+        self.saga_collection = {}
+        self.tome_collection = {}
+        self.maps = []
+        self.collections = []
+        self.board_id = conn.execute(
+            select(TicketBoard.id).where(TicketBoard.project_id == project_id)).scalar()
+        self.component_types = set(conn.execute(
+            select(GameDesignComponentModel.component_type)
+            .where(GameDesignComponentModel.project_id == project_id)).scalars())
+        self._batch, self._keys, self._bytes = [], None, 0
+
+    def _convert(self, table, raw):
+        """Ligne de l'archive -> ligne à insérer (ids remappés), ou None si orpheline."""
+        row, old_id = {}, None
+        for column in table.columns:
+            if column.key not in raw:
+                if column.key == "rank":   # archive d'avant les rangs : position entière
+                    position = raw.get("position")
+                    row["rank"] = key_for_index(position if isinstance(position, int) and position > 0 else 0)
+                continue   # colonne absente (archive plus ancienne) : défaut du modèle
+            value = raw[column.key]
+            target = _fk_target(column)
+            if target == "projects":
+                value = self.project_id
+            elif target is not None and value is not None:
+                value = self.ids[target].get(value)
+                if value is None:
+                    return None, None
+            elif column.key == "id" and column.primary_key:
+                if isinstance(column.type, Integer):
+                    continue   # rowid (map_items) : attribué par la base
+                old_id, value = value, str(uuid.uuid4())
+            elif column.key == "map_key":
+                continue       # propre à la base : réattribué après import (index R*Tree)
+            elif isinstance(value, str) and isinstance(column.type, DateTime):
+                value = datetime.fromisoformat(value)
+            elif isinstance(value, str) and isinstance(column.type, Date):
+                value = date.fromisoformat(value)
+            row[column.key] = value
+        return row, old_id
+
+    def add(self, model, raw, size):
+        table = model.__table__
+        name = table.name
+        try:
+            row, old_id = self._convert(table, raw)
+        except (TypeError, ValueError) as e:
+            raise ArchiveError(f"{name}: invalid row ({e})")
+        if row is None:
+            self.skipped[name] = self.skipped.get(name, 0) + 1
+            return
+
+        if model is TicketBoard and self.board_id is not None:
+            self.ids[name][old_id] = self.board_id   # un seul tableau par projet : fusion
+            return
+        if model is GameDesignComponentModel:
+            if row.get("component_type") in self.component_types:
+                self.skipped[name] = self.skipped.get(name, 0) + 1
+                return
+            self.component_types.add(row.get("component_type"))
+            if row.get("chunk_size") is not None:
+                self.maps.append(row["id"])
+        if old_id is not None and name in self.ids:
+            self.ids[name][old_id] = row["id"]
+        if model is Collection:
+            self.collections.append(row["id"])
+        elif model is TimelineEntry:
+            # eventId hors clé étrangère (l'élément survit à son événement) : remappé ici
+            row["event_id"] = self.ids["events"].get(row.get("event_id"))
+            if isinstance(row.get("data"), dict) and "eventId" in row["data"]:
+                row["data"] = {**row["data"], "eventId": row["event_id"]}
+        elif model is Saga:
+            self.saga_collection[row["id"]] = row["collection_id"]
+        elif model is Tome:
+            self.tome_collection[row["id"]] = self.saga_collection.get(row["saga_id"])
+
+        keys = tuple(row)
+        if self._batch and (keys != self._keys or len(self._batch) >= BATCH_ROWS
+                            or self._bytes + size > BATCH_BYTES):
+            self.flush(model)
+        self._batch.append(row)
+        self._keys = keys
+        self._bytes += size
+
+    def flush(self, model):
+        if not self._batch:
+            return
+        self.conn.execute(model.__table__.insert(), self._batch)
+        if model is Chapter:
+            search.index_rows(self.conn, model, self._batch, lambda r: self.tome_collection.get(r["tome_id"]))
+        else:
+            search.index_rows(self.conn, model, self._batch, lambda r: r["collection_id"])
+        name = model.__tablename__
+        self.inserted[name] = self.inserted.get(name, 0) + len(self._batch)
+        self._batch, self._keys, self._bytes = [], None, 0
+
+
+def import_archive(fileobj, project_id) -> dict:
+    """Importe un zip (fichier seekable) dans le projet ; lève ArchiveError. Sans commit."""
+    try:
+        zf = zipfile.ZipFile(fileobj)
+    except zipfile.BadZipFile:
+        raise ArchiveError("not a zip archive")
+    with zf:
+        names = set(zf.namelist())
+        if MANIFEST not in names:
+            raise ArchiveError(f"{MANIFEST} missing")
+        try:
+            manifest = json.loads(zf.read(MANIFEST))
+        except ValueError:
+            raise ArchiveError(f"{MANIFEST} is not valid JSON")
+        version = manifest.get("format") if isinstance(manifest, dict) else None
+        if version != ARCHIVE_FORMAT:
+            raise ArchiveError(f"unsupported archive format: {version}")
+
+        loads = current_app.json.loads
+        importer = _Importer(db.session.connection(), project_id)
+        for model, _chain in _TABLES:
+            member = f"{model.__tablename__}.ndjson"
+            if member not in names:
+                continue
+            with zf.open(member) as lines:
+                for lineno, line in enumerate(lines, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        raw = loads(line)
+                    except ValueError:
+                        raise ArchiveError(f"{member}:{lineno}: invalid JSON")
+                    if not isinstance(raw, dict):
+                        raise ArchiveError(f"{member}:{lineno}: expected an object")
+                    importer.add(model, raw, len(line))
+            importer.flush(model)
+
+    for component_id in importer.maps:
+        map_storage.reindex(importer.conn, component_id)
+    for collection_id in importer.collections:
+        timeline_index.rebuild(importer.conn, collection_id, importer.ids["events"])
+        event_histogram.rebuild(importer.conn, collection_id)
+    bump_tree_version(importer.conn, {project_id})
+    return {"imported": importer.inserted, "skipped": importer.skipped}
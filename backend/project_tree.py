@@ -0,0 +1,201 @@
+# backend/project_tree.py
+"""Arborescence matérialisée des projets (collections ▸ sagas ▸ tomes ▸ chapitres).
+
+L'arbre est construit par une seule requête (jointures externes niveau par
+niveau, triées en SQL) et gardé en mémoire, déjà sérialisé en JSON, sous la
+clé (projet, Project.tree_version, profondeur, nœud racine) dans un LRU de
+PROJECT_TREE_CACHE_BUDGET octets.
+
+`tree_version` est incrémenté dans la transaction de toute écriture qui
+change l'arbre (création / suppression / renommage / déplacement d'une
+collection, saga, tome ou chapitre : hook after_flush de la session) ; une
+entrée du cache n'est donc jamais invalidée explicitement, elle cesse
+simplement d'être demandée. Le compteur étant en base, plusieurs process
+restent cohérents.
+
+Profondeur : 1 = collections ... 4 = chapitres. Les nœuds du dernier niveau
+inclus portent `childCount` : le front charge la suite à la demande
+(/tree/<level>/<id>).
+"""
+from collections import OrderedDict
+from threading import RLock
+from flask import current_app
+from sqlalchemy import bindparam, event, func, inspect, select, text
+from .database import db
+from .models import Collection, Saga, Tome, Chapter
+
+DEFAULT_CACHE_BUDGET = 8 * 1024 * 1024
+DEFAULT_DEPTH = 3
+
+# niveau -> (modèle, libellé, clé du parent, tri)
+_LEVELS = (
+    ("collection", Collection, Collection.name, Collection.project_id, (Collection.created_at, Collection.id)),
+    ("saga", Saga, Saga.name, Saga.collection_id, (Saga.created_at, Saga.id)),
+    ("tome", Tome, Tome.name, Tome.saga_id, (Tome.created_at, Tome.id)),
+    ("chapter", Chapter, Chapter.title, Chapter.tome_id,
+     (Chapter.rank, Chapter.created_at, Chapter.id)),
+)
+LEVEL_NAMES = tuple(level[0] for level in _LEVELS)
+MAX_DEPTH = len(_LEVELS)
+
+# attributs dont la modification change l'arbre
+_TRACKED = {
+    Collection: ("name", "project_id"),
+    Saga: ("name", "collection_id"),
+    Tome: ("name", "saga_id"),
+    Chapter: ("title", "rank", "tome_id"),
+}
+
+
+class NodeNotFound(LookupError):
+    pass
+
+
+# ---------- Construction ----------------------------------------------------
+
+def _node_project(level: str, node_id: str):
+    """Projet d'un nœud (None s'il n'existe pas)."""
+    index = LEVEL_NAMES.index(level)
+    q = db.session.query(Collection.project_id)
+    if index >= 1:
+        q = q.join(Saga, Saga.collection_id == Collection.id)
+    if index >= 2:
+        q = q.join(Tome, Tome.saga_id == Saga.id)
+    if index >= 3:
+        q = q.join(Chapter, Chapter.tome_id == Tome.id)
+    return q.filter(_LEVELS[index][1].id == node_id).scalar()
+
+
+def build_tree(parent_id: str, first: int, depth: int) -> list[dict]:
+    """Niveaux `first` .. `first + depth - 1` sous `parent_id`, en une requête."""
+    last = min(first + depth, MAX_DEPTH) - 1
+    levels = _LEVELS[first:last + 1]
+    columns, order = [], []
+    for _name, model, label, _parent, sort in levels:
+        columns += [model.id, label]
+        order += list(sort)
+    q = db.session.query(*columns).select_from(levels[0][1]).filter(levels[0][3] == parent_id)
+    for (_n, prev_model, *_rest), (_name, model, _label, parent, _sort) in zip(levels, levels[1:]):
+        q = q.outerjoin(model, parent == prev_model.id)
+
+    counted = last + 1 < MAX_DEPTH
+    if counted:
+        _n, child, _label, child_parent, _sort = _LEVELS[last + 1]
+        count = (select(func.count(child.id))
+                 .where(child_parent == levels[-1][1].id)
+                 .correlate(levels[-1][1])
+                 .scalar_subquery())
+        q = q.add_columns(count)
+
+    roots, seen = [], {}
+    for row in q.order_by(*order):
+        children = roots
+        for i, (name, *_rest) in enumerate(levels):
+            node_id, title = row[2 * i], row[2 * i + 1]
+            if node_id is None:
+                break
+            node = seen.get(node_id)
+            if node is None:
+                node = seen[node_id] = {"id": node_id, "title": title, "level": name, "children": []}
+                if name == "chapter":
+                    node["position"] = len(children) + 1   # place dans le tome (1..), rangs triés
+                elif counted and i == len(levels) - 1:
+                    node["childCount"] = row[-1] or 0
+                children.append(node)
+            children = node["children"]
+    return roots
+
+
+# ---------- Cache -----------------------------------------------------------
+
+_lock = RLock()
+_cache: "OrderedDict[tuple, str]" = OrderedDict()
+_cache_size = 0
+
+
+def tree_json(project_id: str, version: int, depth: int = DEFAULT_DEPTH, level: str = None,
+              node_id: str = None) -> str:
+    """JSON de l'arbre (ou du sous-arbre de `level`/`node_id`), depuis le cache si possible.
+
+    Lève NodeNotFound si le nœud n'appartient pas au projet.
+    """
+    global _cache_size
+    key = (project_id, version, depth, level, node_id)
+    with _lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            return cached
+
+    if level is None:
+        tree = build_tree(project_id, 0, depth)
+    else:
+        if _node_project(level, node_id) != project_id:
+            raise NodeNotFound(node_id)
+        tree = build_tree(node_id, LEVEL_NAMES.index(level) + 1, depth)
+    body = current_app.json.dumps(tree)
+
+    budget = current_app.config.get("PROJECT_TREE_CACHE_BUDGET", DEFAULT_CACHE_BUDGET)
+    with _lock:
+        if key not in _cache:
+            _cache[key] = body
+            _cache_size += len(body)
+            while _cache_size > budget and len(_cache) > 1:
+                _k, old = _cache.popitem(last=False)
+                _cache_size -= len(old)
+    return body
+
+
+# ---------- Compteur de version ---------------------------------------------
+
+def _changed(obj) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[a].history.has_changes() for a in _TRACKED[type(obj)])
+
+
+def _projects_of(conn, objs) -> set:
+    """Projets des objets modifiés, en remontant les clés étrangères niveau par niveau."""
+    projects = {o.project_id for o in objs if isinstance(o, Collection)}
+    parents = {
+        "collections": {o.collection_id for o in objs if isinstance(o, Saga)},
+        "sagas": {o.saga_id for o in objs if isinstance(o, Tome)},
+        "tomes": {o.tome_id for o in objs if isinstance(o, Chapter)},
+    }
+    queries = (
+        ("tomes", "SELECT c.project_id FROM tomes t JOIN sagas s ON s.id = t.saga_id "
+                  "JOIN collections c ON c.id = s.collection_id WHERE t.id IN :ids"),
+        ("sagas", "SELECT c.project_id FROM sagas s JOIN collections c ON c.id = s.collection_id "
+                  "WHERE s.id IN :ids"),
+        ("collections", "SELECT project_id FROM collections WHERE id IN :ids"),
+    )
+    for table, sql in queries:
+        ids = parents[table] - {None}
+        if ids:
+            stmt = text(sql).bindparams(bindparam("ids", expanding=True))
+            projects.update(pid for (pid,) in conn.execute(stmt, {"ids": list(ids)}))
+    return projects - {None}
+
+
+def bump_tree_version(conn, project_ids):
+    """À appeler par les écritures qui ne passent pas par l'ORM (import d'archive...)."""
+    if project_ids:
+        conn.execute(
+            text("UPDATE projects SET tree_version = tree_version + 1 WHERE id IN :ids")
+            .bindparams(bindparam("ids", expanding=True)),
+            {"ids": list(project_ids)},
+        )
+
+
+def _after_flush(session, flush_context):
+    objs = [o for o in session.new if type(o) in _TRACKED]
+    objs += [o for o in session.deleted if type(o) in _TRACKED]
+    objs += [o for o in session.dirty if type(o) in _TRACKED and _changed(o)]
+    if not objs:
+        return
+    conn = session.connection()
+    bump_tree_version(conn, _projects_of(conn, objs))
+
+
+def init_app(app):
+    if not event.contains(db.session, "after_flush", _after_flush):
+        event.listen(db.session, "after_flush", _after_flush)
@@ -0,0 +1,291 @@
+# backend/query_plans.py
+"""Vérification des plans de requête (SQLite) des requêtes principales des routes.
+
+Chaque vérification construit la requête « chaude » d'une route (filtre sur
+une clé étrangère + tri) avec la fonction même que la route appelle
+(`*_query` des blueprints, `*_stmt` des modules), sur des identifiants
+factices, et lance `EXPLAIN QUERY PLAN` dessus : un parcours complet d'une
+table (`SCAN <table>` sans index) ou un tri en B-tree temporaire sur une
+liste triée fait échouer la vérification. Une route qui change sa requête
+change donc aussi celle qui est vérifiée.
+
+    flask check-query-plans        # code de sortie 1 si une requête régresse
+
+Lancé aussi par la suite de tests (tests/test_query_plans.py).
+"""
+import re
+import sys
+from datetime import date, datetime
+from functools import partial
+import click
+from sqlalchemy import select
+from sqlalchemy.orm import with_parent
+from .database import db
+from .models import Project, ProjectMember, Saga, Tag, TicketColumn
+from .pagination import DEFAULT_LIMIT, Page, keyset_query
+from . import chapter_ops, chapter_revisions, event_histogram, jobs, lexorank, map_storage, timeline_index
+from .routes import (
+    analytics, characters, chronology, collections, events, game_design, items, members, places, projects,
+    sagas, tickets, tomes,
+)
+
+# valeurs factices : seul le plan compte, pas le résultat
+ID = "00000000-0000-0000-0000-000000000000"
+WHEN = datetime(2000, 1, 1)
+DAY = date(2000, 1, 1)
+
+_SCAN_RE = re.compile(r"^SCAN (\w+)")
+
+# nom -> (fonction qui construit la requête, tri servi par un index ?)
+CHECKS = {}
+
+
+def check(name: str, sorted: bool = True):
+    def register(fn):
+        CHECKS[name] = (fn, sorted)
+        return fn
+    return register
+
+
+def _page(order):
+    """Page suivante d'une liste paginée : curseur factice du type de chaque colonne du tri."""
+    dummies = {datetime: WHEN, date: DAY}
+    return Page(DEFAULT_LIMIT, [dummies.get(c.type.python_type, ID) for c in order])
+
+
+def _lazy_load(parent, relationship):
+    """Chargement d'une relation de `parent` (ce que l'ORM émet, p. ex. avant une suppression)."""
+    return select(relationship.property.mapper).where(with_parent(parent, relationship))
+
+
+# ---------- Arborescence ----------------------------------------------------
+
+@check("projects: page suivante (created_at, id)")
+def _projects_page():
+    return keyset_query(Project.query, projects.PROJECT_ORDER, _page(projects.PROJECT_ORDER))
+
+
+@check("collections d'un projet")
+def _project_collections():
+    order = collections.COLLECTION_ORDER
+    return keyset_query(collections.collections_query(ID), order, _page(order))
+
+
+@check("sagas d'une collection", sorted=False)
+def _collection_sagas():
+    return collections.sagas_query(ID)
+
+
+@check("tomes d'une saga")
+def _saga_tomes():
+    return sagas.tomes_query(ID)
+
+
+@check("chapitres d'un tome")
+def _tome_chapters():
+    return tomes.chapters_query(ID)
+
+
+@check("ops en attente d'un chapitre")
+def _chapter_pending_ops():
+    return chapter_ops.pending_query(ID, 0)
+
+
+@check("révisions d'un chapitre")
+def _chapter_revisions():
+    return chapter_revisions.revisions_query(ID)
+
+
+@check("stats des chapitres d'une collection", sorted=False)
+def _collection_stats():
+    return analytics.totals_query(Saga.collection_id == ID)
+
+
+# ---------- Rangs (chapitres, tickets, colonnes) ----------------------------
+
+for _scope in lexorank.SCOPES:
+    CHECKS[f"rangs {_scope} : voisins d'une place (déplacement)"] = (
+        partial(lexorank.neighbors_stmt, _scope, ID, 10, ID), True)
+    CHECKS[f"rangs {_scope} : dernier rang"] = (partial(lexorank.last_rank_stmt, _scope, ID), False)
+    CHECKS[f"rangs {_scope} : place d'un élément"] = (partial(lexorank.index_stmt, _scope, ID, "i"), False)
+
+
+# ---------- Fiches d'une collection -----------------------------------------
+
+@check("personnages d'une collection")
+def _collection_characters():
+    order = characters.CHARACTER_ORDER
+    return keyset_query(characters.cards_query(ID), order, _page(order))
+
+
+@check("template de personnage d'une collection", sorted=False)
+def _collection_template():
+    return characters.template_query(ID).limit(1)
+
+
+@check("tags d'une collection (par scope)")
+def _collection_tags():
+    order = characters.TAG_ORDER
+    return keyset_query(characters.tags_query(ID, "character"), order, _page(order))
+
+
+@check("lieux d'une collection")
+def _collection_places():
+    return keyset_query(places.cards_query(ID), places.PLACE_ORDER, _page(places.PLACE_ORDER))
+
+
+@check("objets d'une collection")
+def _collection_items():
+    return keyset_query(items.cards_query(ID), items.ITEM_ORDER, _page(items.ITEM_ORDER))
+
+
+@check("événements d'une collection")
+def _collection_events():
+    return keyset_query(events.cards_query(ID), events.EVENT_ORDER, _page(events.EVENT_ORDER))
+
+
+@check("chronologie d'une collection", sorted=False)
+def _collection_timeline():
+    return chronology.timeline_query(ID).limit(1)
+
+
+@check("éléments d'une chronologie (document entier)")
+def _timeline_items():
+    return timeline_index.items_stmt(ID)
+
+
+@check("fenêtre d'une chronologie (classes de durée 0..3)", sorted=False)
+def _timeline_window():
+    lo, hi = DAY.toordinal(), DAY.toordinal() + 400
+    return timeline_index.window_stmt((3, 3)).params(cid=ID, lo=lo, hi=hi, limit=DEFAULT_LIMIT)
+
+
+@check("bornes des lignes d'un événement (redatation)", sorted=False)
+def _timeline_event_rows():
+    return timeline_index.span_stmt(ID, DAY, DAY)
+
+
+@check("histogramme d'événements (buckets d'une fenêtre)", sorted=False)
+def _event_buckets_window():
+    return event_histogram.buckets_stmt(ID, "year", 1200, 1299)
+
+
+@check("histogramme d'événements (préfixe avant une date)", sorted=False)
+def _event_buckets_prefix():
+    return event_histogram.prefix_stmt().params(cid=ID, **event_histogram.prefix_params(DAY))
+
+
+for _rel in (Tag.characters, Tag.places, Tag.items, Tag.events):
+    CHECKS[f"fiches d'un tag : {_rel.key} (suppression)"] = (partial(_lazy_load, Tag(id=ID), _rel), False)
+
+
+# ---------- Game design / tickets -------------------------------------------
+
+@check("composants game design d'un projet")
+def _project_components():
+    return game_design.components_query(ID)
+
+
+@check("éléments d'un chunk de carte")
+def _map_chunk_items():
+    return map_storage.chunk_items_stmt(ID, 0, 0)
+
+
+@check("chunks d'une zone de carte")
+def _map_region_chunks():
+    return map_storage.chunks_stmt(ID, 0, 0, 4, 4)
+
+
+@check("membres d'un projet")
+def _project_members():
+    return members.members_query(ID)
+
+
+@check("board d'un projet", sorted=False)
+def _project_board():
+    return tickets.board_query(ID).limit(1)
+
+
+@check("colonnes d'un board")
+def _board_columns():
+    return tickets.columns_query(TicketColumn.board_id == ID)
+
+
+@check("tickets d'un board")
+def _board_tickets():
+    return tickets.tickets_query(TicketColumn.board_id == ID)
+
+
+@check("tags des tickets d'un board", sorted=False)
+def _board_ticket_tags():
+    return tickets.ticket_tags_query(tickets.ticket_ids_query(TicketColumn.board_id == ID))
+
+
+@check("checklists des tickets d'un board", sorted=False)
+def _board_ticket_checklists():
+    return tickets.checklists_query(tickets.ticket_ids_query(TicketColumn.board_id == ID))
+
+
+@check("assignés des tickets d'un board", sorted=False)
+def _board_ticket_assignees():
+    return tickets.assignees_query(tickets.ticket_ids_query(TicketColumn.board_id == ID))
+
+
+@check("assignations d'un membre (suppression)", sorted=False)
+def _member_assignments():
+    return _lazy_load(ProjectMember(id=ID), ProjectMember.assignments)
+
+
+@check("job actif pour une clé", sorted=False)
+def _active_job():
+    return jobs.active_query(ID).limit(1)
+
+
+# ---------- Exécution -------------------------------------------------------
+
+def explain(stmt) -> list[str]:
+    """Lignes `detail` de EXPLAIN QUERY PLAN pour une requête SQLAlchemy (Core ou Query ORM)."""
+    stmt = getattr(stmt, "statement", stmt)
+    sql = str(stmt.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True}))
+    rows = db.session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+    return [row[-1] for row in rows]
+
+
+def problems(plan: list[str], sorted: bool = True) -> list[str]:
+    """Parcours complets de tables (et tris temporaires si `sorted`) d'un plan."""
+    tables = set(db.metadata.tables)
+    out = []
+    for detail in plan:
+        m = _SCAN_RE.match(detail)
+        if m and m.group(1) in tables and " INDEX " not in f"{detail} ":
+            out.append(detail)
+        elif sorted and "USE TEMP B-TREE FOR ORDER BY" in detail:
+            out.append(detail)
+    return out
+
+
+def run_checks(verbose: bool = False) -> int:
+    """Vérifie toutes les requêtes de CHECKS ; retourne le nombre d'échecs."""
+    failures = 0
+    for name, (build, is_sorted) in CHECKS.items():
+        plan = explain(build())
+        bad = problems(plan, is_sorted)
+        failures += bool(bad)
+        print(f"{'FAIL' if bad else 'ok  '}  {name}")
+        for detail in (plan if verbose or bad else ()):
+            print(f"        {'!' if detail in bad else ' '} {detail}")
+    return failures
+
+
+def init_app(app):
+    @app.cli.command("check-query-plans")
+    @click.option("--verbose", "-v", is_flag=True, help="Affiche tous les plans.")
+    def check_query_plans_command(verbose):
+        """Échoue si une requête principale des routes parcourt toute une table."""
+        if db.engine.dialect.name != "sqlite":
+            print("check-query-plans : SQLite uniquement")
+            return
+        failures = run_checks(verbose)
+        print(f"{len(CHECKS) - failures}/{len(CHECKS)} requêtes indexées")
+        if failures:
+            sys.exit(1)
@@ -0,0 +1,59 @@
+# backend/routes/analytics.py
+from flask import Blueprint, request, jsonify
+from sqlalchemy import func
+from ..database import db
+from ..models import Collection, Saga, Tome, Chapter, ChapterStats
+from ..analytics import backfill_stats, collection_analytics as build_collection_analytics
+
+analytics_bp = Blueprint("analytics", __name__, url_prefix="/api")
+
+def totals_query(scope_filter):
+    """(chapitres, mots, caractères) des chapitres du périmètre (tome, saga ou collection)."""
+    return (
+        db.session.query(
+            func.count(ChapterStats.chapter_id),
+            func.coalesce(func.sum(ChapterStats.word_count), 0),
+            func.coalesce(func.sum(ChapterStats.char_count), 0),
+        )
+        .join(Chapter, ChapterStats.chapter_id == Chapter.id)
+        .join(Tome, Chapter.tome_id == Tome.id)
+        .join(Saga, Tome.saga_id == Saga.id)
+        .filter(scope_filter)
+    )
+
+def _aggregate(scope_filter):
+    backfill_stats(scope_filter)   # chapitres antérieurs à chapter_stats (une fois)
+    chapters, words, chars = totals_query(scope_filter).one()
+    return {"chapters": chapters, "wordCount": words, "charCount": chars}
+
+@analytics_bp.get("/collections/<collection_id>/analytics")
+def collection_analytics(collection_id):
+    """Stats de tous les chapitres d'une collection (cf. analytics.collection_analytics).
+
+    Pour une très grosse collection, préférer POST /collections/<id>/analytics/jobs.
+    ?words=N : nombre de mots du vocabulaire renvoyés (global et par tome, max 200).
+    """
+    Collection.query.get_or_404(collection_id)
+    try:
+        words_limit = max(1, min(int(request.args.get("words", 100)), 200))
+    except ValueError:
+        return {"error": "words must be an integer"}, 400
+
+    return jsonify(build_collection_analytics(collection_id, words_limit)), 200
+
+# ---------- Agrégats (une somme sur chapter_stats, sans parsing) ------------
+
+@analytics_bp.get("/tomes/<tome_id>/stats")
+def tome_stats(tome_id):
+    Tome.query.get_or_404(tome_id)
+    return jsonify({"tomeId": tome_id, **_aggregate(Tome.id == tome_id)}), 200
+
+@analytics_bp.get("/sagas/<saga_id>/stats")
+def saga_stats(saga_id):
+    Saga.query.get_or_404(saga_id)
+    return jsonify({"sagaId": saga_id, **_aggregate(Saga.id == saga_id)}), 200
+
+@analytics_bp.get("/collections/<collection_id>/stats")
+def collection_stats(collection_id):
+    Collection.query.get_or_404(collection_id)
+    return jsonify({"collectionId": collection_id, **_aggregate(Saga.collection_id == collection_id)}), 200
@@ -0,0 +1,46 @@
+# backend/routes/archive.py
+import shutil
+import tempfile
+from urllib.parse import quote
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from sqlalchemy.exc import IntegrityError
+from ..database import db
+from ..models import Project
+from ..project_archive import ArchiveError, export_archive, import_archive
+
+archive_bp = Blueprint("archive", __name__, url_prefix="/api/projects")
+
+@archive_bp.get("/<project_id>/archive")
+def download_archive(project_id):
+    """Stream the whole project as a zip of NDJSON files (one per table)."""
+    project = Project.query.get_or_404(project_id)
+    filename = f"{project.name or 'projet'}.zip"
+    return Response(
+        stream_with_context(export_archive(project)),
+        mimetype="application/zip",
+        headers={"Content-Disposition": f"attachment; filename=\"project.zip\"; filename*=UTF-8''{quote(filename)}"},
+    )
+
+@archive_bp.post("/<project_id>/archive")
+def upload_archive(project_id):
+    """Import an archive into this project (multipart field `archive`, or the raw zip as body)."""
+    Project.query.get_or_404(project_id)
+    upload = request.files.get("archive")
+    with tempfile.TemporaryFile() as tmp:
+        if upload is not None:
+            fileobj = upload.stream
+        else:
+            # le zip se lit en accès aléatoire : corps copié sur disque, par blocs
+            shutil.copyfileobj(request.stream, tmp, 1024 * 1024)
+            tmp.seek(0)
+            fileobj = tmp
+        try:
+            summary = import_archive(fileobj, project_id)
+            db.session.commit()
+        except ArchiveError as e:
+            db.session.rollback()
+            return jsonify({"error": str(e)}), 400
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({"error": "Archive conflicts with existing data"}), 409
+    return jsonify(summary), 200
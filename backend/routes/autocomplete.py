@@ -1,93 +1,22 @@
 # backend/routes/autocomplete.py
 from flask import Blueprint, jsonify, request
-from sqlalchemy import or_
-from ..models import Collection, Character, Place, Item, Event
-from ..database import db
+from ..models import Collection
+from .. import autocomplete_index
 
 autocomplete_bp = Blueprint("autocomplete", __name__, url_prefix="/api")
 
-def _like(s: str) -> str:
-    return f"%{s}%"
-
 @autocomplete_bp.get("/collections/<collection_id>/autocomplete")
 def autocomplete(collection_id):
-    Collection.query.get_or_404(collection_id)
+    """Suggestions par préfixe (sans accents) sur personnages, lieux, objets et événements.
+
+    Servi par l'index mémoire (autocomplete_index) : seule la première requête
+    d'une collection touche la base.
+    """
     q = (request.args.get("q") or "").strip()
-    if len(q) < 3:
+    if not q:
         return jsonify([]), 200
+    if not autocomplete_index.is_loaded(collection_id):
+        Collection.query.get_or_404(collection_id)
 
     limit = min(int(request.args.get("limit", 10)), 50)
-
-    # Characters
-    chars = (
-        db.session.query(Character)
-        .filter(Character.collection_id == collection_id)
-        .filter(or_(Character.firstname.ilike(_like(q)), Character.lastname.ilike(_like(q))))
-        .order_by(Character.lastname.asc(), Character.firstname.asc())
-        .limit(limit)
-        .all()
-    )
-    char_rows = [{
-        "id": c.id,
-        "type": "character",
-        "label": f"{c.firstname} {c.lastname}".strip(),
-        "hint": None
-    } for c in chars]
-
-    # Places
-    places = (
-        db.session.query(Place)
-        .filter(Place.collection_id == collection_id)
-        .filter(or_(Place.name.ilike(_like(q)), Place.location.ilike(_like(q))))
-        .order_by(Place.name.asc())
-        .limit(limit)
-        .all()
-    )
-    place_rows = [{
-        "id": p.id,
-        "type": "place",
-        "label": p.name,
-        "hint": p.location
-    } for p in places]
-
-    # Items
-    items = (
-        db.session.query(Item)
-        .filter(Item.collection_id == collection_id)
-        .filter(or_(Item.name.ilike(_like(q)), Item.category.ilike(_like(q))))
-        .order_by(Item.name.asc())
-        .limit(limit)
-        .all()
-    )
-    item_rows = [{
-        "id": it.id,
-        "type": "item",
-        "label": it.name,
-        "hint": it.category
-    } for it in items]
-
-    events = (
-        db.session.query(Event)
-        .filter(Event.collection_id == collection_id)
-        .filter(or_(Event.name.ilike(_like(q)), Event.description.ilike(_like(q))))
-        .order_by(Event.start_date.asc(), Event.name.asc())
-        .limit(limit)
-        .all()
-    )
-    def _fmt_date(e: Event) -> str:
-        s = e.start_date.isoformat()
-        return f"{s} → {e.end_date.isoformat()}" if e.end_date else s
-
-    event_rows = [{
-        "id": e.id,
-        "type": "event",
-        "label": e.name,
-        "hint": _fmt_date(e),
-    } for e in events]
-
-    # Fusion simple + tri par label
-    rows = char_rows + place_rows + item_rows + event_rows
-    rows.sort(key=lambda r: r["label"].lower())
-
-    # coupe au total si nécessaire
-    return jsonify(rows[:limit]), 200
+    return jsonify(autocomplete_index.lookup(collection_id, q, limit)), 200
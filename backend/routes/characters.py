@@ -1,10 +1,20 @@
 from flask import Blueprint, request, jsonify, abort
 from sqlalchemy import and_, or_, func
+from sqlalchemy.orm import load_only, selectinload
+from sqlalchemy.orm.exc import StaleDataError
 from ..database import db
 from ..models import Character, CharacterTemplate, Collection, Tag, CharacterTag
+from ..search import fts_ids
+from ..pagination import InvalidPage, keyset, page_from_request, page_response
+from .. import autocomplete_index
+from ..conditional import make_etag, not_modified, with_validators
+from ..json_patch import PatchError, PatchTestFailed, StaleRevision, patch_column
 
 characters_bp = Blueprint("characters", __name__, url_prefix="/api")
 
+CHARACTER_ORDER = (Character.lastname, Character.firstname, Character.id)
+TAG_ORDER = (Tag.name, Tag.id)
+
 # ---------- Helpers ---------------------------------------------------------
 
 def _parse_iso_date(s: str):
@@ -41,14 +51,29 @@ def _validate_template(payload):
 
 # ---------- Templates -------------------------------------------------------
 
+def template_query(collection_id):
+    return CharacterTemplate.query.filter_by(collection_id=collection_id)
+
 @characters_bp.get("/collections/<collection_id>/characters/template")
 def get_character_template(collection_id):
     Collection.query.get_or_404(collection_id)
-    tpl = CharacterTemplate.query.filter_by(collection_id=collection_id).first()
+    stamp = (db.session.query(CharacterTemplate.id, CharacterTemplate.updated_at, CharacterTemplate.created_at)
+             .filter_by(collection_id=collection_id)
+             .first())
+    if stamp is None:
+        etag, modified = make_etag("template", collection_id, _default_template()), None
+    else:
+        etag, modified = make_etag("template", *stamp), stamp.updated_at or stamp.created_at
+    cached = not_modified(etag, modified)
+    if cached is not None:
+        return cached
+
+    tpl = template_query(collection_id).first()
     if tpl:
-        return jsonify({"characterTemplate": tpl.character_template}), 200
+        return with_validators(jsonify({"characterTemplate": tpl.character_template, "revision": tpl.revision}),
+                               etag, modified)
     # pas d'écriture DB ici : on renvoie un défaut "virtuel"
-    return jsonify({"characterTemplate": _default_template()}), 200
+    return with_validators(jsonify({"characterTemplate": _default_template(), "revision": 0}), etag)
 
 @characters_bp.put("/collections/<collection_id>/characters/template")
 def put_character_template(collection_id):
@@ -57,7 +82,7 @@ def put_character_template(collection_id):
     template = body.get("characterTemplate")
     _validate_template(template)
 
-    tpl = CharacterTemplate.query.filter_by(collection_id=collection_id).first()
+    tpl = template_query(collection_id).first()
     if not tpl:
         tpl = CharacterTemplate(collection_id=collection_id, character_template=template)
         db.session.add(tpl)
@@ -66,17 +91,54 @@ def put_character_template(collection_id):
     db.session.commit()
     return jsonify(tpl.to_dict()), 200
 
+@characters_bp.patch("/collections/<collection_id>/characters/template")
+def patch_character_template(collection_id):
+    """JSON Patch (RFC 6902) on the template: { baseRevision, patch: [...] } (default template at revision 0)."""
+    Collection.query.get_or_404(collection_id)
+
+    tpl = template_query(collection_id).first()
+    if not tpl:
+        tpl = CharacterTemplate(collection_id=collection_id, character_template=None)
+        db.session.add(tpl)
+    try:
+        patch_column(tpl, "character_template", request.get_json(silent=True), default=_default_template())
+        _validate_template(tpl.character_template)
+        db.session.commit()
+    except StaleRevision as e:
+        db.session.rollback()
+        return {"error": "stale base revision", "revision": e.current}, 409
+    except PatchTestFailed as e:
+        db.session.rollback()
+        return {"error": str(e)}, 409
+    except PatchError as e:
+        db.session.rollback()
+        return {"error": str(e)}, 400
+    except StaleDataError:
+        db.session.rollback()
+        current = db.session.query(CharacterTemplate.revision).filter_by(collection_id=collection_id).scalar()
+        return {"error": "stale base revision", "revision": current}, 409
+    return jsonify({"id": tpl.id, "revision": tpl.revision,
+                    "updatedAt": tpl.updated_at.isoformat() if tpl.updated_at else None}), 200
+
 # ---------- Tags ------------------------------------------------------------
 
+def tags_query(collection_id, scope=None):
+    """Tags de la collection, d'un seul scope si `scope` en est un."""
+    q = Tag.query.filter_by(collection_id=collection_id)
+    if scope in ("character", "place", "item", "event"):
+        q = q.filter(Tag.scope == scope)
+    return q
+
 @characters_bp.get("/collections/<collection_id>/tags")
 def list_tags(collection_id):
     Collection.query.get_or_404(collection_id)
+    try:
+        page = page_from_request(TAG_ORDER)
+    except InvalidPage as e:
+        return {"error": str(e)}, 400
     scope = (request.args.get("scope") or "").strip()
-    q = Tag.query.filter_by(collection_id=collection_id)
-    if scope in ("character", "place", "item", "event"):
-        q = q.filter(Tag.scope == scope)
-    tags = q.order_by(Tag.name.asc()).all()
-    return jsonify([t.to_dict() for t in tags]), 200
+    tags, next_cursor = keyset(tags_query(collection_id, scope), TAG_ORDER, page)
+    return jsonify(page_response([t.to_dict() for t in tags], page, next_cursor)), 200
 
 @characters_bp.post("/collections/<collection_id>/tags")
 def create_tag(collection_id):
@@ -129,16 +191,31 @@ def delete_tag(tag_id):
 
 # ---------- Characters ------------------------------------------------------
 
+def cards_query(collection_id):
+    """Personnages de la collection : colonnes "carte" seulement + tags chargés en une requête (pas de N+1)."""
+    return (Character.query
+            .options(load_only(Character.id, Character.firstname, Character.lastname, Character.avatar_url),
+                     selectinload(Character.tags))
+            .filter(Character.collection_id == collection_id))
+
 @characters_bp.get("/collections/<collection_id>/characters")
 def list_characters(collection_id):
-    """Liste (cartes) avec filtres ?tags=...&query=...&match=all|any"""
+    """Liste (cartes) avec filtres ?tags=...&query=...&match=all|any, paginée par ?limit=&cursor="""
     Collection.query.get_or_404(collection_id)
-    q = Character.query.filter(Character.collection_id == collection_id)
+    try:
+        page = page_from_request(CHARACTER_ORDER)
+    except InvalidPage as e:
+        return {"error": str(e)}, 400
+    q = cards_query(collection_id)
 
     search = (request.args.get("query") or "").strip()
     if search:
-        like = f"%{search}%"
-        q = q.filter(or_(Character.firstname.ilike(like), Character.lastname.ilike(like)))
+        ids = fts_ids("character", collection_id, search, ("title",))
+        if ids is not None:
+            q = q.filter(Character.id.in_(ids))
+        else:
+            like = f"%{search}%"
+            q = q.filter(or_(Character.firstname.ilike(like), Character.lastname.ilike(like)))
 
     tag_ids = [t for t in (request.args.get("tags") or "").split(",") if t]
     match = (request.args.get("match") or "any").lower()  # any (OR) par défaut
@@ -152,11 +229,11 @@ def list_characters(collection_id):
             # au moins un tag (OR)
             q = q.filter(Character.tags.any(Tag.id.in_(tag_ids)))
 
-    q = q.order_by(Character.lastname.asc(), Character.firstname.asc())
+    rows, next_cursor = keyset(q, CHARACTER_ORDER, page)
 
     # on renvoie un payload "carte"
     res = []
-    for c in q.all():
+    for c in rows:
         res.append({
             "id": c.id,
             "firstname": c.firstname,
@@ -164,7 +241,7 @@ def list_characters(collection_id):
             "avatarUrl": c.avatar_url,
             "tags": [t.to_dict() for t in c.tags],
         })
-    return jsonify(res), 200
+    return jsonify(page_response(res, page, next_cursor)), 200
 
 @characters_bp.post("/collections/<collection_id>/characters")
 def create_character(collection_id):
@@ -194,6 +271,7 @@ def create_character(collection_id):
         c.tags = tags
 
     db.session.commit()
+    autocomplete_index.refresh(c)
     return jsonify(c.to_dict()), 201
 
 @characters_bp.get("/characters/<character_id>")
@@ -235,6 +313,7 @@ def update_character(character_id):
         c.tags = tags
 
     db.session.commit()
+    autocomplete_index.refresh(c)
     return jsonify(c.to_dict()), 200
 
 @characters_bp.put("/characters/<character_id>/tags")
@@ -256,4 +335,5 @@ def delete_character(character_id):
     c = Character.query.get_or_404(character_id)
     db.session.delete(c)
     db.session.commit()
+    autocomplete_index.discard(c.collection_id, "character", c.id)
     return "", 204
@@ -1,11 +1,22 @@
-from flask import Blueprint, request, jsonify
+from datetime import date
+from flask import Blueprint, current_app, request, jsonify
+from sqlalchemy.orm.exc import StaleDataError
 
 from ..database import db
 from ..models import Collection, CollectionTimeline
+from ..conditional import make_etag, not_modified, with_validators
+from ..json_patch import PatchError, PatchTestFailed, StaleRevision, patch_column
+from .. import event_histogram, timeline_index
+from ..event_histogram import HistogramError
+from ..timeline_index import TimelineError
 
 chronology_bp = Blueprint('chronology', __name__, url_prefix='/api')
 
 
+def timeline_query(collection_id):
+    return CollectionTimeline.query.filter_by(collection_id=collection_id)
+
+
 def _default_timeline_payload():
     return {
         "version": 1,
@@ -21,17 +32,29 @@ def _default_timeline_payload():
 def get_collection_timeline(collection_id):
     Collection.query.get_or_404(collection_id)
 
-    tl = CollectionTimeline.query.filter_by(collection_id=collection_id).first()
+    stamp = (db.session.query(CollectionTimeline.id, CollectionTimeline.updated_at, CollectionTimeline.created_at)
+             .filter_by(collection_id=collection_id)
+             .first())
+    if stamp is None:
+        etag, modified = make_etag("timeline", collection_id, _default_timeline_payload()), None
+    else:
+        etag, modified = make_etag("timeline", *stamp), stamp.updated_at or stamp.created_at
+    cached = not_modified(etag, modified)
+    if cached is not None:
+        return cached
+
+    tl = timeline_query(collection_id).first()
     if not tl:
-        return jsonify({
+        return with_validators(jsonify({
             "collectionId": collection_id,
             "data": _default_timeline_payload(),
-        }), 200
+            "revision": 0,
+        }), etag)
 
     payload = tl.to_dict()
-    if not payload.get('data'):
-        payload['data'] = _default_timeline_payload()
-    return jsonify(payload), 200
+    doc = timeline_index.assemble(tl)
+    payload['data'] = doc if tl.data or doc.get('items') else _default_timeline_payload()
+    return with_validators(jsonify(payload), etag, modified)
 
 
 @chronology_bp.put('/collections/<collection_id>/timeline')
@@ -43,12 +66,143 @@ def put_collection_timeline(collection_id):
     if not isinstance(data, dict):
         return {"error": "timeline data must be an object"}, 400
 
-    tl = CollectionTimeline.query.filter_by(collection_id=collection_id).first()
+    tl = timeline_query(collection_id).first()
     if not tl:
-        tl = CollectionTimeline(collection_id=collection_id, data=data)
+        tl = CollectionTimeline(collection_id=collection_id)
         db.session.add(tl)
-    else:
-        tl.data = data
+    try:
+        timeline_index.save(tl, data)
+    except TimelineError as e:
+        db.session.rollback()
+        return {"error": str(e)}, 400
 
     db.session.commit()
-    return jsonify(tl.to_dict()), 200
+    payload = tl.to_dict()
+    payload['data'] = data
+    return jsonify(payload), 200
+
+
+@chronology_bp.patch('/collections/<collection_id>/timeline')
+def patch_collection_timeline(collection_id):
+    """JSON Patch (RFC 6902) on the timeline data: { baseRevision, patch: [...] }.
+
+    Without a stored timeline, the patch applies to the default payload (baseRevision 0).
+    """
+    Collection.query.get_or_404(collection_id)
+
+    tl = timeline_query(collection_id).first()
+    if not tl:
+        tl = CollectionTimeline(collection_id=collection_id, data=None)
+        db.session.add(tl)
+    else:
+        doc = timeline_index.assemble(tl)   # le patch porte sur le document entier
+        tl.data = doc if tl.data or doc.get('items') else None
+    try:
+        patch_column(tl, 'data', request.get_json(silent=True), default=_default_timeline_payload())
+        if not isinstance(tl.data, dict):
+            raise PatchError("timeline data must be an object")
+        timeline_index.save(tl, tl.data)
+        db.session.commit()
+    except StaleRevision as e:
+        db.session.rollback()
+        return {"error": "stale base revision", "revision": e.current}, 409
+    except PatchTestFailed as e:
+        db.session.rollback()
+        return {"error": str(e)}, 409
+    except (PatchError, TimelineError) as e:
+        db.session.rollback()
+        return {"error": str(e)}, 400
+    except StaleDataError:
+        db.session.rollback()
+        current = db.session.query(CollectionTimeline.revision).filter_by(collection_id=collection_id).scalar()
+        return {"error": "stale base revision", "revision": current}, 409
+    return jsonify({"id": tl.id, "revision": tl.revision,
+                    "updatedAt": tl.updated_at.isoformat() if tl.updated_at else None}), 200
+
+
+def _window_bound(raw, end=False):
+    """'YYYY-MM-DD' ou année seule ('1200' : du 1er janvier / jusqu'au 31 décembre)."""
+    s = (raw or "").strip()
+    if s.isdigit() and len(s) <= 4:
+        year = int(s)
+        if not 1 <= year <= 9999:
+            raise ValueError("year must be between 1 and 9999")
+        return date(year, 12, 31) if end else date(year, 1, 1)
+    try:
+        return date.fromisoformat(s[:10])
+    except ValueError:
+        raise ValueError("expected YYYY-MM-DD or a year")
+
+
+def _window_from_request():
+    """(début, fin) de ?from=&to= ; lève ValueError (message pour le 400)."""
+    if not request.args.get('from') or not request.args.get('to'):
+        raise ValueError("from and to required")
+    try:
+        start = _window_bound(request.args['from'])
+        end = _window_bound(request.args['to'], end=True)
+    except ValueError as e:
+        raise ValueError(f"invalid window: {e}")
+    if start > end:
+        raise ValueError("from must not be after to")
+    return start, end
+
+
+@chronology_bp.get('/collections/<collection_id>/timeline/items')
+def get_timeline_window(collection_id):
+    """Éléments de la frise et événements qui recoupent ?from=&to= (dates ou années, bornes incluses).
+
+    Triés par date de début ; au plus ?limit= lignes (plafond TIMELINE_WINDOW_LIMIT),
+    `truncated` si la fenêtre en contient davantage.
+    """
+    Collection.query.get_or_404(collection_id)
+    try:
+        start, end = _window_from_request()
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    limit = request.args.get('limit', type=int)
+    if limit is not None and limit < 1:
+        return {"error": "limit must be positive"}, 400
+
+    out = timeline_index.window(collection_id, start, end, limit)
+    return jsonify({"collectionId": collection_id, "from": start.isoformat(), "to": end.isoformat(), **out}), 200
+
+
+def _capped(arg, key, default):
+    cap = current_app.config.get(key, default)
+    value = request.args.get(arg, type=int)
+    return cap if value is None else min(value, cap)
+
+
+@chronology_bp.get('/collections/<collection_id>/timeline/density')
+def get_timeline_density(collection_id):
+    """Vue zoomable de la fenêtre ?from=&to= : événements un par un, ou histogramme.
+
+    Sans ?level=, les événements (et éléments de la frise) sont renvoyés tels
+    quels si la fenêtre en contient au plus ?maxEvents= (plafond
+    TIMELINE_CLUSTER_THRESHOLD) ; sinon, buckets du niveau le plus fin qui tient
+    en ?maxBuckets= (plafond TIMELINE_MAX_BUCKETS). ?level=day|month|year|decade
+    force l'histogramme à ce niveau.
+    """
+    Collection.query.get_or_404(collection_id)
+    try:
+        start, end = _window_from_request()
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    max_events = _capped('maxEvents', "TIMELINE_CLUSTER_THRESHOLD", event_histogram.DEFAULT_EVENT_THRESHOLD)
+    max_buckets = _capped('maxBuckets', "TIMELINE_MAX_BUCKETS", event_histogram.DEFAULT_MAX_BUCKETS)
+    if max_events < 0 or max_buckets < 1:
+        return {"error": "maxEvents and maxBuckets must be positive"}, 400
+    level = request.args.get('level')
+
+    out = {"collectionId": collection_id, "from": start.isoformat(), "to": end.isoformat(),
+           "total": event_histogram.count(collection_id, start, end)}
+    if level is None and out["total"] <= max_events:
+        return jsonify({**out, "mode": "events", **timeline_index.window(collection_id, start, end)}), 200
+
+    level = level or event_histogram.pick_level(start, end, max_buckets)
+    try:
+        buckets = event_histogram.histogram(collection_id, level, start, end)
+    except HistogramError as e:
+        return {"error": str(e)}, 400
+    return jsonify({**out, "mode": "buckets", "level": level, "buckets": buckets}), 200
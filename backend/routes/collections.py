@@ -1,9 +1,23 @@
 from flask import Blueprint, request, jsonify
 from ..models import Project, Collection, Saga
 from ..database import db
+from .. import autocomplete_index
+from ..entity_batch import BatchError, run_batch
+from ..pagination import InvalidPage, keyset, page_from_request, page_response
 
 collections_bp = Blueprint('collections', __name__, url_prefix='/api')
 
+COLLECTION_ORDER = (Collection.created_at, Collection.id)
+
+
+def collections_query(project_id):
+    return Collection.query.filter_by(project_id=project_id)
+
+
+def sagas_query(collection_id):
+    return Saga.query.filter_by(collection_id=collection_id)
+
+
 @collections_bp.post('/projects/<project_id>/collections')
 def create_collection(project_id):
     name = (request.json or {}).get('name', '').strip()
@@ -24,7 +38,7 @@ def get_collection(cid):
 
 @collections_bp.get('/collections/<project_id>/sagas')
 def get_collections_sagas(project_id):
-    sagas = Saga.query.filter_by(collection_id=project_id).all()
+    sagas = sagas_query(project_id).all()
     return jsonify([s.to_dict() for s in sagas]), 200
 
 @collections_bp.put('/collections/<cid>')
@@ -42,9 +56,26 @@ def delete_collection(cid):
     col = Collection.query.get_or_404(cid)
     db.session.delete(col)
     db.session.commit()
+    autocomplete_index.drop(cid)
     return '', 204
 
 @collections_bp.get('/projects/<project_id>/collections')
 def list_collections_for_project(project_id):
-    cols = Collection.query.filter_by(project_id=project_id).order_by(Collection.created_at.asc()).all()
-    return jsonify([c.to_dict() for c in cols]), 200
\ No newline at end of file
+    try:
+        page = page_from_request(COLLECTION_ORDER)
+    except InvalidPage as e:
+        return {'error': str(e)}, 400
+    cols, next_cursor = keyset(collections_query(project_id), COLLECTION_ORDER, page)
+    return jsonify(page_response([c.to_dict() for c in cols], page, next_cursor)), 200
+@collections_bp.post('/collections/<cid>/batch')
+def batch_collection_entities(cid):
+    """Apply create / update / delete / tag operations on characters, places, items and events in one transaction."""
+    Collection.query.get_or_404(cid)
+    body = request.get_json(silent=True)
+    try:
+        if not isinstance(body, dict):
+            raise BatchError('JSON object body required')
+        results = run_batch(cid, body.get('operations'))
+    except BatchError as e:
+        return jsonify({'error': str(e), 'results': e.results}), 400
+    return jsonify({'results': results}), 200
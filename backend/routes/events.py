@@ -1,12 +1,18 @@
 # backend/routes/events.py
 from flask import Blueprint, request, jsonify
 from sqlalchemy import or_
+from sqlalchemy.orm import load_only, selectinload
 from datetime import date  # <-- import
 from ..database import db
 from ..models import Collection, Event, Tag
+from ..search import fts_ids
+from ..pagination import InvalidPage, keyset, page_from_request, page_response
+from .. import autocomplete_index
 
 events_bp = Blueprint("events", __name__, url_prefix="/api")
 
+EVENT_ORDER = (Event.start_date, Event.name, Event.id)
+
 def _like(s: str) -> str:
     return f"%{s}%"
 
@@ -32,15 +38,38 @@ def _parse_date(val):
         raise ValueError("Invalid date, expected YYYY-MM-DD")
 
 # LIST
+def cards_query(collection_id, with_description=False):
+    """Événements de la collection : colonnes "carte" (+ description) et tags en une requête."""
+    columns = [Event.id, Event.name, Event.start_date, Event.end_date, Event.images]
+    if with_description:
+        columns.append(Event.description)
+    return (Event.query
+            .options(load_only(*columns), selectinload(Event.tags))
+            .filter(Event.collection_id == collection_id))
+
 @events_bp.get("/collections/<collection_id>/events")
 def list_events(collection_id):
+    """Cartes d'événements. La description HTML n'est renvoyée qu'avec ?fields=description.
+
+    Paginée par ?limit=&cursor= (tri : date de début, nom).
+    """
     Collection.query.get_or_404(collection_id)
-    q = Event.query.filter(Event.collection_id == collection_id)
+    try:
+        page = page_from_request(EVENT_ORDER)
+    except InvalidPage as e:
+        return {"error": str(e)}, 400
+    fields = set((request.args.get("fields") or "").split(","))
+    with_description = "description" in fields
+    q = cards_query(collection_id, with_description)
 
     search = (request.args.get("query") or "").strip()
     if search:
-        q = q.filter(or_(Event.name.ilike(_like(search)),
-                         Event.description.ilike(_like(search))))
+        ids = fts_ids("event", collection_id, search, ("title", "body"))
+        if ids is not None:
+            q = q.filter(Event.id.in_(ids))
+        else:
+            q = q.filter(or_(Event.name.ilike(_like(search)),
+                             Event.description.ilike(_like(search))))
 
     # filtres de chevauchement
     date_from_raw = request.args.get("from")
@@ -67,19 +96,23 @@ def list_events(collection_id):
         else:
             q = q.filter(Event.tags.any(Tag.id.in_(tag_ids)))
 
-    q = q.order_by(Event.start_date.asc(), Event.name.asc())
+    rows, next_cursor = keyset(q, EVENT_ORDER, page)
 
-    res = [{
-        "id": ev.id,
-        "name": ev.name,
-        "startDate": ev.start_date.isoformat(),
-        "endDate": ev.end_date.isoformat() if ev.end_date else None,
-        "description": ev.description or "",
-        "coverUrl": (ev.images or [None])[0],
-        "tags": [t.to_dict() for t in ev.tags],
-    } for ev in q.all()]
+    res = []
+    for ev in rows:
+        card = {
+            "id": ev.id,
+            "name": ev.name,
+            "startDate": ev.start_date.isoformat(),
+            "endDate": ev.end_date.isoformat() if ev.end_date else None,
+            "coverUrl": (ev.images or [None])[0],
+            "tags": [t.to_dict() for t in ev.tags],
+        }
+        if with_description:
+            card["description"] = ev.description or ""
+        res.append(card)
 
-    return jsonify(res), 200
+    return jsonify(page_response(res, page, next_cursor)), 200
 
 # CREATE
 @events_bp.post("/collections/<collection_id>/events")
@@ -118,6 +151,7 @@ def create_event(collection_id):
         ev.tags = tags
 
     db.session.commit()
+    autocomplete_index.refresh(ev)
     return jsonify(ev.to_dict()), 201
 
 # READ
@@ -169,6 +203,7 @@ def update_event(event_id):
         ev.tags = tags
 
     db.session.commit()
+    autocomplete_index.refresh(ev)
     return jsonify(ev.to_dict()), 200
 
 # SET TAGS
@@ -194,4 +229,5 @@ def delete_event(event_id):
     ev = Event.query.get_or_404(event_id)
     db.session.delete(ev)
     db.session.commit()
+    autocomplete_index.discard(ev.collection_id, "event", ev.id)
     return "", 204
@@ -1,18 +1,28 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, abort
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
 from ..database import db
 from ..models import GameDesignComponentModel
+from ..conditional import make_etag, not_modified, with_validators
+from ..json_patch import PatchError, PatchTestFailed, StaleRevision, patch_column
+from .. import map_storage
+from ..map_storage import MapError, StaleChunk
 
 game_design_bp = Blueprint('game_design', __name__, url_prefix='/api/projects/<project_id>/game-design')
 
 VALID_TYPES = {'map-editor', 'task-board'}
 
 
+def components_query(project_id):
+    return (GameDesignComponentModel.query.filter_by(project_id=project_id)
+            .order_by(GameDesignComponentModel.created_at))
+
+
 @game_design_bp.route('', methods=['GET'])
 def list_components(project_id):
     """List all game-design components enabled for this project."""
-    comps = GameDesignComponentModel.query.filter_by(project_id=project_id).order_by(GameDesignComponentModel.created_at).all()
-    return jsonify([c.to_dict() for c in comps]), 200
+    comps = components_query(project_id).all()
+    return jsonify([map_storage.component_dict(c) for c in comps]), 200
 
 
 @game_design_bp.route('', methods=['POST'])
@@ -35,9 +45,19 @@ def add_component(project_id):
 
 @game_design_bp.route('/<comp_id>', methods=['GET'])
 def get_component(project_id, comp_id):
-    """Get a single component (with its data)."""
+    """Get a single component (with its data). 304 if the client already has this version."""
+    stamp = (db.session.query(GameDesignComponentModel.updated_at, GameDesignComponentModel.created_at)
+             .filter_by(id=comp_id, project_id=project_id)
+             .first())
+    if stamp is None:
+        abort(404)
+    modified = stamp.updated_at or stamp.created_at
+    etag = make_etag("game-design", comp_id, modified)
+    cached = not_modified(etag, modified)
+    if cached is not None:
+        return cached
     comp = GameDesignComponentModel.query.filter_by(id=comp_id, project_id=project_id).first_or_404()
-    return jsonify(comp.to_dict()), 200
+    return with_validators(jsonify(map_storage.component_dict(comp)), etag, modified)
 
 
 @game_design_bp.route('/<comp_id>', methods=['PUT'])
@@ -46,9 +66,47 @@ def update_component(project_id, comp_id):
     comp = GameDesignComponentModel.query.filter_by(id=comp_id, project_id=project_id).first_or_404()
     body = request.get_json() or {}
     if 'data' in body:
-        comp.data = body['data']
+        if map_storage.is_chunked(comp):
+            try:
+                map_storage.split(comp, body['data'])
+            except MapError as e:
+                db.session.rollback()
+                return jsonify({'error': str(e)}), 400
+        else:
+            comp.data = body['data']
     db.session.commit()
-    return jsonify(comp.to_dict()), 200
+    return jsonify(map_storage.component_dict(comp, body.get('data'))), 200
+
+
+@game_design_bp.route('/<comp_id>', methods=['PATCH'])
+def patch_component(project_id, comp_id):
+    """Apply a JSON Patch (RFC 6902) to the component data: { baseRevision, patch: [...] }.
+
+    409 if baseRevision is not the current revision (returned) or if a `test` op fails.
+    """
+    comp = GameDesignComponentModel.query.filter_by(id=comp_id, project_id=project_id).first_or_404()
+    chunked = map_storage.is_chunked(comp)
+    try:
+        if chunked:
+            # le patch vise le document entier : réassemblé, patché puis redécoupé
+            comp.data = map_storage.assemble(comp)
+        patch_column(comp, 'data', request.get_json(silent=True))
+        if chunked:
+            map_storage.split(comp)
+        db.session.commit()
+    except StaleRevision as e:
+        return jsonify({'error': 'stale base revision', 'revision': e.current}), 409
+    except PatchTestFailed as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 409
+    except (PatchError, MapError) as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except StaleDataError:
+        db.session.rollback()
+        return jsonify({'error': 'stale base revision', 'revision': comp.revision}), 409
+    return jsonify({'id': comp.id, 'revision': comp.revision,
+                    'updatedAt': comp.updated_at.isoformat() if comp.updated_at else None}), 200
 
 
 @game_design_bp.route('/<comp_id>', methods=['DELETE'])
@@ -58,3 +116,118 @@ def delete_component(project_id, comp_id):
     db.session.delete(comp)
     db.session.commit()
     return '', 204
+
+
+# ─── Carte découpée (map-editor) : métadonnées, zone affichée, chunks ───
+
+def _map_component(project_id, comp_id):
+    comp = GameDesignComponentModel.query.filter_by(id=comp_id, project_id=project_id).first_or_404()
+    if comp.component_type != 'map-editor':
+        abort(404)
+    if map_storage.ensure_chunked(comp):
+        db.session.commit()
+    return comp
+
+
+def _float_arg(name):
+    raw = request.args.get(name)
+    try:
+        return float(raw)
+    except (TypeError, ValueError):
+        raise MapError(f'{name} (number) required')
+
+
+@game_design_bp.route('/<comp_id>/map', methods=['GET'])
+def get_map(project_id, comp_id):
+    """Map metadata (zones, roomBank, camera...), chunk size and overall bounds, without rooms / stickers."""
+    try:
+        comp = _map_component(project_id, comp_id)
+    except MapError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    return jsonify({
+        'id': comp.id,
+        'revision': comp.revision,
+        'chunkSize': comp.chunk_size,
+        'meta': comp.data or {},
+        'bounds': map_storage.bounds(comp),
+        'updatedAt': comp.updated_at.isoformat() if comp.updated_at else None,
+    }), 200
+
+
+@game_design_bp.route('/<comp_id>/map', methods=['PUT'])
+def update_map_meta(project_id, comp_id):
+    """Replace the map metadata: { baseRevision, meta }. 409 if baseRevision is stale."""
+    body = request.get_json(silent=True) or {}
+    try:
+        comp = _map_component(project_id, comp_id)
+        if body.get('baseRevision') != comp.revision:
+            return jsonify({'error': 'stale base revision', 'revision': comp.revision}), 409
+        map_storage.update_meta(comp, body.get('meta'))
+        db.session.commit()
+    except MapError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except StaleDataError:
+        db.session.rollback()
+        return jsonify({'error': 'stale base revision', 'revision': comp.revision}), 409
+    return jsonify({'id': comp.id, 'revision': comp.revision,
+                    'updatedAt': comp.updated_at.isoformat() if comp.updated_at else None}), 200
+
+
+@game_design_bp.route('/<comp_id>/map/region', methods=['GET'])
+def get_map_region(project_id, comp_id):
+    """Rooms, stickers and zones intersecting the viewport ?x0=&y0=&x1=&y1= (optional zoneId, layerIndex).
+
+    Also returns the revisions of the chunks involved (needed to save them).
+    """
+    try:
+        x0, y0, x1, y1 = (_float_arg(k) for k in ('x0', 'y0', 'x1', 'y1'))
+        if x0 > x1 or y0 > y1:
+            raise MapError('x0 <= x1 and y0 <= y1 required')
+        layer = request.args.get('layerIndex')
+        if layer is not None and not layer.lstrip('-').isdigit():
+            raise MapError('layerIndex must be an integer')
+        comp = _map_component(project_id, comp_id)
+    except MapError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    out = map_storage.region(comp, x0, y0, x1, y1,
+                             zone_id=request.args.get('zoneId') or None,
+                             layer_index=int(layer) if layer is not None else None)
+    return jsonify({'chunkSize': comp.chunk_size, **out}), 200
+
+
+@game_design_bp.route('/<comp_id>/map/chunks/<int(signed=True):cx>/<int(signed=True):cy>', methods=['GET'])
+def get_map_chunk(project_id, comp_id, cx, cy):
+    """Rooms and stickers of one chunk, with its revision."""
+    try:
+        comp = _map_component(project_id, comp_id)
+    except MapError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    return jsonify(map_storage.read_chunk(comp, cx, cy)), 200
+
+
+@game_design_bp.route('/<comp_id>/map/chunks/<int(signed=True):cx>/<int(signed=True):cy>', methods=['PUT'])
+def save_map_chunk(project_id, comp_id, cx, cy):
+    """Replace the content of one chunk: { baseRevision, rooms, stickers }.
+
+    Every item must belong to this chunk (center of its bounding box); an item
+    moved from another chunk is removed there. 409 if baseRevision is stale.
+    """
+    try:
+        comp = _map_component(project_id, comp_id)
+        revision = map_storage.save_chunk(comp, cx, cy, request.get_json(silent=True))
+        db.session.commit()
+    except StaleChunk as e:
+        db.session.rollback()
+        return jsonify({'error': 'stale chunk revision', 'revision': e.current}), 409
+    except MapError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except StaleDataError:
+        db.session.rollback()
+        return jsonify({'error': 'stale chunk revision', 'revision': map_storage.chunk_revision(comp, cx, cy)}), 409
+    return jsonify({'cx': cx, 'cy': cy, 'revision': revision, 'componentRevision': comp.revision,
+                    'updatedAt': comp.updated_at.isoformat() if comp.updated_at else None}), 200
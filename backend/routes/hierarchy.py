@@ -1,32 +1,51 @@
-from flask import Blueprint, jsonify, abort
+from flask import Blueprint, Response, request
 from ..models import Project
-from ..database import db
+from ..conditional import make_etag, not_modified, with_validators
+from ..project_tree import DEFAULT_DEPTH, LEVEL_NAMES, MAX_DEPTH, NodeNotFound, tree_json
 
 hierarchy_bp = Blueprint("hierarchy", __name__, url_prefix="/api/projects")
 
+
+def _depth(default):
+    depth = request.args.get("depth", default, type=int)
+    if not 1 <= depth <= MAX_DEPTH:
+        return None
+    return depth
+
+
+def _tree_response(project, depth, level=None, node_id=None):
+    # tree_version change à chaque écriture de l'arbre : il suffit comme tampon de version
+    etag = make_etag("tree", project.id, project.tree_version, depth, level, node_id)
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    try:
+        body = tree_json(project.id, project.tree_version, depth, level, node_id)
+    except NodeNotFound:
+        return {"error": "Node not found"}, 404
+    return with_validators(Response(body, mimetype="application/json"), etag)
+
+
 @hierarchy_bp.route("/<project_id>/tree", methods=["GET"])
 def get_project_tree(project_id):
-    """Return collections ▸ sagas ▸ tomes as a nested tree."""
+    """Return collections ▸ sagas ▸ tomes (▸ chapters with ?depth=4) as a nested tree.
+
+    Nodes of the deepest level carry `childCount`; load them with /tree/<level>/<id>.
+    """
     project = Project.query.get_or_404(project_id)
+    depth = _depth(DEFAULT_DEPTH)
+    if depth is None:
+        return {"error": f"depth must be between 1 and {MAX_DEPTH}"}, 400
+    return _tree_response(project, depth)
 
-    def tome_to_dict(t):
-        return {"id": t.id, "title": t.name, "level": "tome", "children": []}
-
-    def saga_to_dict(s):
-        return {
-            "id": s.id,
-            "title": s.name,
-            "level": "saga",
-            "children": [tome_to_dict(t) for t in sorted(s.tomes, key=lambda t: t.created_at)],
-        }
-
-    def collection_to_dict(c):
-        return {
-            "id": c.id,
-            "title": c.name,
-            "level": "collection",
-            "children": [saga_to_dict(s) for s in sorted(c.sagas, key=lambda s: s.created_at)],
-        }
-
-    tree = [collection_to_dict(c) for c in sorted(project.collections, key=lambda c: c.created_at)]
-    return jsonify(tree), 200
\ No newline at end of file
+
+@hierarchy_bp.route("/<project_id>/tree/<level>/<node_id>", methods=["GET"])
+def get_project_subtree(project_id, level, node_id):
+    """Children of one collection / saga / tome (lazy loading), `depth` levels deep (default 1)."""
+    project = Project.query.get_or_404(project_id)
+    if level not in LEVEL_NAMES[:-1]:
+        return {"error": f"level must be one of {', '.join(LEVEL_NAMES[:-1])}"}, 400
+    depth = _depth(1)
+    if depth is None:
+        return {"error": f"depth must be between 1 and {MAX_DEPTH}"}, 400
+    return _tree_response(project, depth, level, node_id)
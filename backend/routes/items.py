@@ -1,20 +1,39 @@
 from flask import Blueprint, request, jsonify, abort
 from sqlalchemy import or_
+from sqlalchemy.orm import load_only, selectinload
 from ..database import db
 from ..models import Item, Collection, Tag
+from ..search import fts_ids
+from ..pagination import InvalidPage, keyset, page_from_request, page_response
+from .. import autocomplete_index
 
 items_bp = Blueprint("items", __name__, url_prefix="/api")
 
+ITEM_ORDER = (Item.name, Item.id)
+
 # ----------- LISTE (cartes) -------------------------------------------------
+def cards_query(collection_id):
+    return (Item.query
+            .options(load_only(Item.id, Item.name, Item.images), selectinload(Item.tags))
+            .filter(Item.collection_id == collection_id))
+
 @items_bp.get("/collections/<collection_id>/items")
 def list_items(collection_id):
     Collection.query.get_or_404(collection_id)
-    q = Item.query.filter(Item.collection_id == collection_id)
+    try:
+        page = page_from_request(ITEM_ORDER)
+    except InvalidPage as e:
+        return {"error": str(e)}, 400
+    q = cards_query(collection_id)
 
     search = (request.args.get("query") or "").strip()
     if search:
-        like = f"%{search}%"
-        q = q.filter(or_(Item.name.ilike(like), Item.description.ilike(like)))
+        ids = fts_ids("item", collection_id, search, ("title", "body"))
+        if ids is not None:
+            q = q.filter(Item.id.in_(ids))
+        else:
+            like = f"%{search}%"
+            q = q.filter(or_(Item.name.ilike(like), Item.description.ilike(like)))
 
     tag_ids = [t for t in (request.args.get("tags") or "").split(",") if t]
     match = (request.args.get("match") or "any").lower()
@@ -26,17 +45,17 @@ def list_items(collection_id):
         else:
             q = q.filter(Item.tags.any(Tag.id.in_(tag_ids)))
 
-    q = q.order_by(Item.name.asc())
+    rows, next_cursor = keyset(q, ITEM_ORDER, page)
 
     res = []
-    for it in q.all():
+    for it in rows:
         res.append({
             "id": it.id,
             "name": it.name,
             "coverUrl": (it.images or [None])[0],
             "tags": [t.to_dict() for t in it.tags],
         })
-    return jsonify(res), 200
+    return jsonify(page_response(res, page, next_cursor)), 200
 
 # ----------- CREATE ---------------------------------------------------------
 @items_bp.post("/collections/<collection_id>/items")
@@ -64,6 +83,7 @@ def create_item(collection_id):
         it.tags = tags
 
     db.session.commit()
+    autocomplete_index.refresh(it)
     return jsonify(it.to_dict()), 201
 
 # ----------- READ -----------------------------------------------------------
@@ -99,6 +119,7 @@ def update_item(item_id):
         it.tags = tags
 
     db.session.commit()
+    autocomplete_index.refresh(it)
     return jsonify(it.to_dict()), 200
 
 # ----------- SET TAGS -------------------------------------------------------
@@ -124,4 +145,5 @@ def delete_item(item_id):
     it = Item.query.get_or_404(item_id)
     db.session.delete(it)
     db.session.commit()
+    autocomplete_index.discard(it.collection_id, "item", it.id)
     return "", 204
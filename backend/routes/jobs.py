@@ -0,0 +1,56 @@
+# backend/routes/jobs.py
+import os
+from flask import Blueprint, request, jsonify, send_file
+from ..models import Collection, Job, Tome
+from ..jobs import enqueue, finished_job
+from ..tome_export import cached_tome_pdf, pdf_cache_key
+
+jobs_bp = Blueprint("jobs", __name__, url_prefix="/api")
+
+def _job_response(job: Job, code: int):
+    return jsonify(job.to_dict()), code, {"Location": f"/api/jobs/{job.id}"}
+
+def enqueue_tome_pdf(tome: Tome, key: str = None) -> Job:
+    """Job d'export PDF ; terminé d'emblée si le PDF des versions actuelles est en cache."""
+    key = key or pdf_cache_key(tome)
+    params = {"tomeId": tome.id}
+    path = cached_tome_pdf(tome, key)
+    if path:
+        return finished_job("tome_pdf", params, {"filename": f"{tome.name or 'tome'}.pdf"}, path)
+    return enqueue("tome_pdf", params, dedupe_key=f"tome_pdf:{tome.id}:{key}")
+
+@jobs_bp.post("/tomes/<tome_id>/export/pdf/jobs")
+def create_tome_pdf_job(tome_id):
+    tome = Tome.query.get_or_404(tome_id)
+    return _job_response(enqueue_tome_pdf(tome), 202)
+
+@jobs_bp.post("/collections/<collection_id>/analytics/jobs")
+def create_analytics_job(collection_id):
+    Collection.query.get_or_404(collection_id)
+    try:
+        words_limit = max(1, min(int(request.args.get("words", 100)), 200))
+    except ValueError:
+        return {"error": "words must be an integer"}, 400
+    job = enqueue("collection_analytics", {"collectionId": collection_id, "words": words_limit},
+                  dedupe_key=f"collection_analytics:{collection_id}:{words_limit}")
+    return _job_response(job, 202)
+
+@jobs_bp.get("/jobs/<job_id>")
+def get_job(job_id):
+    """Statut / progression ; `result` (JSON) une fois terminé."""
+    job = Job.query.get_or_404(job_id)
+    data = job.to_dict()
+    if job.status in ("done", "failed"):
+        data["result"] = job.result
+    return jsonify(data), 200
+
+@jobs_bp.get("/jobs/<job_id>/download")
+def download_job(job_id):
+    job = Job.query.get_or_404(job_id)
+    if job.status != "done":
+        return {"error": f"job is {job.status}", "status": job.status}, 409
+    if not job.result_path or not os.path.exists(job.result_path):
+        # PDF remplacé par un export plus récent du même tome
+        return {"error": "result no longer available"}, 410
+    filename = (job.result or {}).get("filename") or os.path.basename(job.result_path)
+    return send_file(job.result_path, as_attachment=True, download_name=filename)
@@ -5,9 +5,13 @@ from ..models import ProjectMember
 members_bp = Blueprint('members', __name__, url_prefix='/api/projects/<project_id>/members')
 
 
+def members_query(project_id):
+    return ProjectMember.query.filter_by(project_id=project_id).order_by(ProjectMember.created_at)
+
+
 @members_bp.route('', methods=['GET'])
 def list_members(project_id):
-    members = ProjectMember.query.filter_by(project_id=project_id).order_by(ProjectMember.created_at).all()
+    members = members_query(project_id).all()
     return jsonify([m.to_dict() for m in members]), 200
 
 
@@ -1,21 +1,41 @@
 # api/places.py
 from flask import Blueprint, request, jsonify
 from sqlalchemy import or_
+from sqlalchemy.orm import load_only, selectinload
 from ..database import db
 from ..models import Collection, Place, Tag, PlaceTag
+from ..search import fts_ids
+from ..pagination import InvalidPage, keyset, page_from_request, page_response
+from .. import autocomplete_index
 
 places_bp = Blueprint("places", __name__, url_prefix="/api")
 
+PLACE_ORDER = (Place.name, Place.id)
+
 # ---------- List (cartes) ---------------------------------------------------
+def cards_query(collection_id):
+    return (Place.query
+            .options(load_only(Place.id, Place.name, Place.location, Place.images),
+                     selectinload(Place.tags))
+            .filter(Place.collection_id == collection_id))
+
 @places_bp.get("/collections/<collection_id>/places")
 def list_places(collection_id):
     Collection.query.get_or_404(collection_id)
-    q = Place.query.filter(Place.collection_id == collection_id)
+    try:
+        page = page_from_request(PLACE_ORDER)
+    except InvalidPage as e:
+        return {"error": str(e)}, 400
+    q = cards_query(collection_id)
 
     search = (request.args.get("query") or "").strip()
     if search:
-        like = f"%{search}%"
-        q = q.filter(or_(Place.name.ilike(like), Place.location.ilike(like)))
+        ids = fts_ids("place", collection_id, search, ("title", "subtitle"))
+        if ids is not None:
+            q = q.filter(Place.id.in_(ids))
+        else:
+            like = f"%{search}%"
+            q = q.filter(or_(Place.name.ilike(like), Place.location.ilike(like)))
 
     tag_ids = [t for t in (request.args.get("tags") or "").split(",") if t]
     match = (request.args.get("match") or "any").lower()
@@ -27,10 +47,10 @@ def list_places(collection_id):
         else:
             q = q.filter(Place.tags.any(Tag.id.in_(tag_ids)))
 
-    q = q.order_by(Place.name.asc())
+    rows, next_cursor = keyset(q, PLACE_ORDER, page)
 
     res = []
-    for p in q.all():
+    for p in rows:
         cover = (p.images or [None])[0]
         res.append({
             "id": p.id,
@@ -39,7 +59,7 @@ def list_places(collection_id):
             "coverUrl": cover,
             "tags": [t.to_dict() for t in p.tags],
         })
-    return jsonify(res), 200
+    return jsonify(page_response(res, page, next_cursor)), 200
 
 # ---------- Create ----------------------------------------------------------
 @places_bp.post("/collections/<collection_id>/places")
@@ -67,6 +87,7 @@ def create_place(collection_id):
         p.tags = tags
 
     db.session.commit()
+    autocomplete_index.refresh(p)
     return jsonify(p.to_dict()), 201
 
 # ---------- Read ------------------------------------------------------------
@@ -105,6 +126,7 @@ def update_place(place_id):
         p.tags = tags.all()
 
     db.session.commit()
+    autocomplete_index.refresh(p)
     return jsonify(p.to_dict()), 200
 
 # ---------- Set tags only ---------------------------------------------------
@@ -128,4 +150,5 @@ def delete_place(place_id):
     p = Place.query.get_or_404(place_id)
     db.session.delete(p)
     db.session.commit()
+    autocomplete_index.discard(p.collection_id, "place", p.id)
     return "", 204
\ No newline at end of file
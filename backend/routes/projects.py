@@ -2,14 +2,21 @@ from flask import Blueprint, request, jsonify
 from sqlalchemy.exc import IntegrityError
 from ..database import db
 from ..models import Project
+from ..pagination import InvalidPage, keyset, page_from_request, page_response
 
 projects_bp = Blueprint('projects', __name__, url_prefix='/api/projects')
 
+PROJECT_ORDER = (Project.created_at, Project.id)
+
 @projects_bp.route('', methods=['GET'])
 def list_projects():
-    """List all projects"""
-    projects = Project.query.order_by(Project.created_at).all()
-    return jsonify([p.to_dict() for p in projects]), 200
+    """List all projects (keyset pagination with ?limit=&cursor=)"""
+    try:
+        page = page_from_request(PROJECT_ORDER)
+    except InvalidPage as e:
+        return jsonify({'error': str(e)}), 400
+    projects, next_cursor = keyset(Project.query, PROJECT_ORDER, page)
+    return jsonify(page_response([p.to_dict() for p in projects], page, next_cursor)), 200
 
 @projects_bp.route('', methods=['POST'])
 def create_project():
@@ -14,6 +14,11 @@ from .chronology import chronology_bp
 from .game_design import game_design_bp
 from .members import members_bp
 from .tickets import tickets_bp
+from .analytics import analytics_bp
+from .search import search_bp
+from .revisions import revisions_bp
+from .jobs import jobs_bp
+from .archive import archive_bp
 
 def register_routes(app: Flask):
     """Attach all Blueprint routes to the Flask app"""
@@ -31,4 +36,9 @@ def register_routes(app: Flask):
     app.register_blueprint(chronology_bp)
     app.register_blueprint(game_design_bp)
     app.register_blueprint(members_bp)
-    app.register_blueprint(tickets_bp)
\ No newline at end of file
+    app.register_blueprint(tickets_bp)
+    app.register_blueprint(analytics_bp)
+    app.register_blueprint(search_bp)
+    app.register_blueprint(revisions_bp)
+    app.register_blueprint(jobs_bp)
+    app.register_blueprint(archive_bp)
\ No newline at end of file
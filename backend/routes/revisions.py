@@ -0,0 +1,60 @@
+# backend/routes/revisions.py
+from datetime import datetime, timedelta, timezone
+from flask import Blueprint, request, jsonify
+from ..database import db
+from ..models import Chapter, ChapterRevision
+from ..chapter_revisions import list_revisions, load_revision, prune_revisions
+
+revisions_bp = Blueprint("revisions", __name__, url_prefix="/api")
+
+@revisions_bp.get("/chapters/<chapter_id>/revisions")
+def get_revisions(chapter_id):
+    c = Chapter.query.get_or_404(chapter_id)
+    revisions = list_revisions(chapter_id)
+    return jsonify({
+        "chapterId": chapter_id,
+        "revisions": revisions,
+        "storedBytes": sum(r["storedBytes"] or 0 for r in revisions),
+        "contentSize": len(c.content or "") + len(c.notes or ""),
+    }), 200
+
+@revisions_bp.get("/chapters/<chapter_id>/revisions/<int:number>")
+def get_revision(chapter_id, number):
+    Chapter.query.get_or_404(chapter_id)
+    doc = load_revision(chapter_id, number)
+    if doc is None:
+        return {"error": "revision not found"}, 404
+    version, created = (
+        db.session.query(ChapterRevision.version, ChapterRevision.created_at)
+        .filter_by(chapter_id=chapter_id, number=number)
+        .one()
+    )
+    return jsonify({
+        "chapterId": chapter_id,
+        "number": number,
+        "version": version,
+        "createdAt": created.isoformat() if created else None,
+        "content": doc["content"],
+        "notes": doc["notes"],
+    }), 200
+
+@revisions_bp.delete("/chapters/<chapter_id>/revisions")
+def delete_revisions(chapter_id):
+    """Purge par âge : ?olderThanDays=N ou ?before=<ISO>. La dernière révision est gardée."""
+    Chapter.query.get_or_404(chapter_id)
+    before = request.args.get("before")
+    days = request.args.get("olderThanDays")
+    try:
+        if before:
+            cutoff = datetime.fromisoformat(before)
+            if cutoff.tzinfo is not None:   # created_at est en UTC naïf
+                cutoff = cutoff.astimezone(timezone.utc).replace(tzinfo=None)
+        elif days is not None:
+            cutoff = datetime.utcnow() - timedelta(days=int(days))
+        else:
+            return {"error": "olderThanDays or before required"}, 400
+    except ValueError:
+        return {"error": "invalid olderThanDays / before"}, 400
+    deleted = prune_revisions(chapter_id, cutoff)
+    db.session.commit()
+    return jsonify({"chapterId": chapter_id, "deleted": deleted}), 200
@@ -4,6 +4,11 @@ from ..database import db
 
 sagas_bp = Blueprint('sagas', __name__, url_prefix='/api')
 
+
+def tomes_query(saga_id):
+    return Tome.query.filter_by(saga_id=saga_id).order_by(Tome.created_at)
+
+
 @sagas_bp.post('/collections/<collection_id>/sagas')
 def create_saga(collection_id):
     name = (request.json or {}).get('name', '').strip()
@@ -24,7 +29,7 @@ def get_saga(saga_id):
 
 @sagas_bp.get('/sagas/<saga_id>/tomes')
 def list_saga_tomes(saga_id):
-    tomes = Tome.query.filter_by(saga_id=saga_id).order_by(Tome.created_at).all()
+    tomes = tomes_query(saga_id).all()
     return jsonify([t.to_dict() for t in tomes]), 200
 
 @sagas_bp.put('/sagas/<cid>')
@@ -0,0 +1,27 @@
+# backend/routes/search.py
+from flask import Blueprint, request, jsonify
+from ..models import Collection
+from ..search import KINDS, search
+
+search_bp = Blueprint("search", __name__, url_prefix="/api")
+
+@search_bp.get("/collections/<collection_id>/search")
+def search_collection(collection_id):
+    """Recherche plein texte classée : ?q=...&types=chapter,character&limit=20&offset=0"""
+    Collection.query.get_or_404(collection_id)
+    q = (request.args.get("q") or "").strip()
+    types = [t for t in (request.args.get("types") or "").split(",") if t in KINDS] or list(KINDS)
+    try:
+        limit = max(1, min(int(request.args.get("limit", 20)), 100))
+        offset = max(0, int(request.args.get("offset", 0)))
+    except ValueError:
+        return {"error": "limit and offset must be integers"}, 400
+
+    total, results = search(collection_id, q, types, limit, offset)
+    return jsonify({
+        "query": q,
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "results": results,
+    }), 200
@@ -1,5 +1,7 @@
 from flask import Blueprint, request, jsonify
+from sqlalchemy import select
 from ..database import db
+from .. import lexorank
 from ..models import (
     TicketBoard, TicketColumn, Ticket, TicketTag,
     TicketChecklistItem, TicketAssignee, ProjectMember,
@@ -10,14 +12,18 @@ tickets_bp = Blueprint('tickets', __name__, url_prefix='/api/projects/<project_i
 # ─── Helpers ───
 
 DEFAULT_COLUMNS = [
-    {'name': 'À faire', 'color': '#6366f1', 'position': 0},
-    {'name': 'En cours', 'color': '#f59e0b', 'position': 1},
-    {'name': 'Terminé', 'color': '#10b981', 'position': 2},
+    {'name': 'À faire', 'color': '#6366f1', 'rank': lexorank.key_for_index(0)},
+    {'name': 'En cours', 'color': '#f59e0b', 'rank': lexorank.key_for_index(1)},
+    {'name': 'Terminé', 'color': '#10b981', 'rank': lexorank.key_for_index(2)},
 ]
 
 
+def board_query(project_id):
+    return TicketBoard.query.filter_by(project_id=project_id)
+
+
 def _get_or_create_board(project_id):
-    board = TicketBoard.query.filter_by(project_id=project_id).first()
+    board = board_query(project_id).first()
     if not board:
         board = TicketBoard(project_id=project_id)
         db.session.add(board)
@@ -29,12 +35,156 @@ def _get_or_create_board(project_id):
     return board
 
 
+def _iso(dt):
+    return dt.isoformat() if dt else None
+
+
+def ticket_ids_query(*criteria):
+    return select(Ticket.id).join(TicketColumn, Ticket.column_id == TicketColumn.id).where(*criteria)
+
+
+def tickets_query(*criteria):
+    """Tickets matching `criteria`, column by column, in rank order."""
+    return (select(Ticket.id, Ticket.column_id, Ticket.title, Ticket.description, Ticket.priority,
+                   Ticket.rank, Ticket.created_at, Ticket.updated_at)
+            .join(TicketColumn, Ticket.column_id == TicketColumn.id)
+            .where(*criteria)
+            .order_by(TicketColumn.rank, Ticket.rank))
+
+
+def ticket_tags_query(ids):
+    return (select(TicketTag.id, TicketTag.ticket_id, TicketTag.name, TicketTag.color)
+            .where(TicketTag.ticket_id.in_(ids)))
+
+
+def checklists_query(ids):
+    return (select(TicketChecklistItem.id, TicketChecklistItem.ticket_id, TicketChecklistItem.text,
+                   TicketChecklistItem.done, TicketChecklistItem.position)
+            .where(TicketChecklistItem.ticket_id.in_(ids))
+            .order_by(TicketChecklistItem.position))
+
+
+def assignees_query(ids):
+    return (select(TicketAssignee.ticket_id, TicketAssignee.member_id, ProjectMember.name, ProjectMember.color)
+            .join(ProjectMember, TicketAssignee.member_id == ProjectMember.id)
+            .where(TicketAssignee.ticket_id.in_(ids)))
+
+
+def _tickets_payload(*criteria):
+    """Serialize the tickets matching `criteria` (on Ticket / TicketColumn) in 4 queries.
+
+    Same shape as Ticket.to_dict(), built from plain rows: no lazy loads,
+    no per-object ORM attribute access. `position` (0..) is the index in the
+    column, counted from the ordered rows: `criteria` must select whole columns
+    (see _ticket_payload for a single ticket).
+    """
+    ids = ticket_ids_query(*criteria)
+    rows = db.session.execute(tickets_query(*criteria)).all()
+    tickets, out, counts = {}, [], {}
+    for tid, col_id, title, desc, priority, rank, created, updated in rows:
+        pos = counts[col_id] = counts.get(col_id, -1) + 1
+        t = {
+            'id': tid,
+            'columnId': col_id,
+            'title': title,
+            'description': desc or '',
+            'priority': priority,
+            'position': pos,
+            'rank': rank,
+            'tags': [],
+            'checklist': [],
+            'assignees': [],
+            'createdAt': _iso(created),
+            'updatedAt': _iso(updated),
+        }
+        tickets[tid] = t
+        out.append(t)
+    if not out:
+        return out
+
+    for tag_id, tid, name, color in db.session.execute(ticket_tags_query(ids)):
+        tickets[tid]['tags'].append({'id': tag_id, 'ticketId': tid, 'name': name, 'color': color})
+
+    for item_id, tid, text, done, pos in db.session.execute(checklists_query(ids)):
+        tickets[tid]['checklist'].append({'id': item_id, 'ticketId': tid, 'text': text, 'done': done, 'position': pos})
+
+    for tid, member_id, name, color in db.session.execute(assignees_query(ids)):
+        tickets[tid]['assignees'].append({'ticketId': tid, 'memberId': member_id, 'memberName': name, 'memberColor': color})
+    return out
+
+
+def _ticket_payload(ticket_id):
+    payload = _tickets_payload(Ticket.id == ticket_id)[0]
+    payload['position'] = lexorank.index_of('tickets', db.session.get(Ticket, ticket_id))
+    return payload
+
+
+def columns_query(*criteria):
+    return (select(TicketColumn.id, TicketColumn.board_id, TicketColumn.name, TicketColumn.color,
+                   TicketColumn.rank, TicketColumn.created_at)
+            .where(*criteria)
+            .order_by(TicketColumn.rank))
+
+
+def _columns_payload(*criteria):
+    """Serialize columns (with their tickets) like TicketColumn.to_dict(), in a fixed number of queries.
+
+    `position` (0..) is counted from the ordered rows (see _column_payload for a single column).
+    """
+    cols = db.session.execute(columns_query(*criteria)).all()
+    by_col = {}
+    for t in _tickets_payload(*criteria):
+        by_col.setdefault(t['columnId'], []).append(t)
+    return [{
+        'id': cid,
+        'boardId': board_id,
+        'name': name,
+        'color': color,
+        'position': pos,
+        'rank': rank,
+        'tickets': by_col.get(cid, []),
+        'createdAt': _iso(created),
+    } for pos, (cid, board_id, name, color, rank, created) in enumerate(cols)]
+
+
+def _column_payload(col):
+    payload = _columns_payload(TicketColumn.id == col.id)[0]
+    payload['position'] = lexorank.index_of('columns', col)
+    return payload
+
+
+def _int_position(data):
+    pos = data.get('position')
+    if isinstance(pos, bool) or not isinstance(pos, int):
+        return None
+    return pos
+
+
+def _board_payload(board):
+    """Whole board graph (same shape as TicketBoard.to_dict()) in 5 queries."""
+    return {
+        'id': board.id,
+        'projectId': board.project_id,
+        'columns': _columns_payload(TicketColumn.board_id == board.id),
+        'createdAt': _iso(board.created_at),
+    }
+
+
+def _project_members(project_id, member_ids):
+    """Ids of `member_ids` that belong to the project (one query)."""
+    if not member_ids:
+        return []
+    found = {mid for (mid,) in db.session.query(ProjectMember.id)
+             .filter(ProjectMember.project_id == project_id, ProjectMember.id.in_(member_ids))}
+    return [mid for mid in dict.fromkeys(member_ids) if mid in found]
+
+
 # ─── Board ───
 
 @tickets_bp.route('', methods=['GET'])
 def get_board(project_id):
     board = _get_or_create_board(project_id)
-    return jsonify(board.to_dict()), 200
+    return jsonify(_board_payload(board)), 200
 
 
 # ─── Columns ───
@@ -46,16 +196,15 @@ def add_column(project_id):
     name = data.get('name', '').strip()
     if not name:
         return jsonify({'error': 'Column name is required'}), 400
-    max_pos = db.session.query(db.func.coalesce(db.func.max(TicketColumn.position), -1)).filter_by(board_id=board.id).scalar()
     col = TicketColumn(
         board_id=board.id,
         name=name,
         color=data.get('color', '#6366f1'),
-        position=max_pos + 1,
+        rank=lexorank.rank_after_last('columns', board.id),
     )
     db.session.add(col)
     db.session.commit()
-    return jsonify(col.to_dict()), 201
+    return jsonify(_column_payload(col)), 201
 
 
 @tickets_bp.route('/columns/<col_id>', methods=['PUT'])
@@ -66,10 +215,13 @@ def update_column(project_id, col_id):
         col.name = data['name'].strip()
     if 'color' in data:
         col.color = data['color']
-    if 'position' in data:
-        col.position = int(data['position'])
+    pos = _int_position(data)
+    if pos is not None and pos != lexorank.index_of('columns', col):
+        col.rank = lexorank.rank_at('columns', col.board_id, pos, exclude_id=col.id)
     db.session.commit()
-    return jsonify(col.to_dict()), 200
+    if pos is not None:
+        lexorank.schedule_rebalance('columns', col.board_id, col.rank)
+    return jsonify(_column_payload(col)), 200
 
 
 @tickets_bp.route('/columns/<col_id>', methods=['DELETE'])
@@ -82,16 +234,15 @@ def delete_column(project_id, col_id):
 
 @tickets_bp.route('/columns/reorder', methods=['PUT'])
 def reorder_columns(project_id):
-    """Expects { order: [col_id, col_id, ...] }"""
+    """Expects { order: [col_id, col_id, ...] }. Only the columns that actually moved are rewritten."""
     board = _get_or_create_board(project_id)
     data = request.get_json() or {}
     order = data.get('order', [])
-    cols = {c.id: c for c in TicketColumn.query.filter_by(board_id=board.id).all()}
-    for i, cid in enumerate(order):
-        if cid in cols:
-            cols[cid].position = i
+    if not isinstance(order, list):
+        return jsonify({'error': 'order must be a list of column ids'}), 400
+    lexorank.reorder('columns', board.id, [cid for cid in order if isinstance(cid, str)])
     db.session.commit()
-    return jsonify(board.to_dict()), 200
+    return jsonify(_board_payload(board)), 200
 
 
 # ─── Tickets ───
@@ -103,13 +254,12 @@ def create_ticket(project_id, col_id):
     title = data.get('title', '').strip()
     if not title:
         return jsonify({'error': 'Ticket title is required'}), 400
-    max_pos = db.session.query(db.func.coalesce(db.func.max(Ticket.position), -1)).filter_by(column_id=col_id).scalar()
     ticket = Ticket(
         column_id=col_id,
         title=title,
         description=data.get('description', ''),
         priority=data.get('priority', 'medium'),
-        position=max_pos + 1,
+        rank=lexorank.rank_after_last('tickets', col_id),
     )
     db.session.add(ticket)
     db.session.flush()
@@ -125,19 +275,17 @@ def create_ticket(project_id, col_id):
         db.session.add(ci)
 
     # Assignees
-    for mid in data.get('assigneeIds', []):
-        member = ProjectMember.query.filter_by(id=mid, project_id=project_id).first()
-        if member:
-            db.session.add(TicketAssignee(ticket_id=ticket.id, member_id=mid))
+    for mid in _project_members(project_id, data.get('assigneeIds', [])):
+        db.session.add(TicketAssignee(ticket_id=ticket.id, member_id=mid))
 
     db.session.commit()
-    return jsonify(ticket.to_dict()), 201
+    return jsonify(_ticket_payload(ticket.id)), 201
 
 
 @tickets_bp.route('/tickets/<ticket_id>', methods=['GET'])
 def get_ticket(project_id, ticket_id):
-    ticket = Ticket.query.get_or_404(ticket_id)
-    return jsonify(ticket.to_dict()), 200
+    Ticket.query.get_or_404(ticket_id)
+    return jsonify(_ticket_payload(ticket_id)), 200
 
 
 @tickets_bp.route('/tickets/<ticket_id>', methods=['PUT'])
@@ -151,10 +299,7 @@ def update_ticket(project_id, ticket_id):
         ticket.description = data['description']
     if 'priority' in data:
         ticket.priority = data['priority']
-    if 'columnId' in data:
-        ticket.column_id = data['columnId']
-    if 'position' in data:
-        ticket.position = int(data['position'])
+    moved = _place_ticket(ticket, data.get('columnId', ticket.column_id), _int_position(data))
 
     # Replace tags  
     if 'tags' in data:
@@ -176,13 +321,13 @@ def update_ticket(project_id, ticket_id):
     # Replace assignees
     if 'assigneeIds' in data:
         TicketAssignee.query.filter_by(ticket_id=ticket.id).delete()
-        for mid in data['assigneeIds']:
-            member = ProjectMember.query.filter_by(id=mid, project_id=project_id).first()
-            if member:
-                db.session.add(TicketAssignee(ticket_id=ticket.id, member_id=mid))
+        for mid in _project_members(project_id, data['assigneeIds']):
+            db.session.add(TicketAssignee(ticket_id=ticket.id, member_id=mid))
 
     db.session.commit()
-    return jsonify(ticket.to_dict()), 200
+    if moved:
+        lexorank.schedule_rebalance('tickets', ticket.column_id, ticket.rank)
+    return jsonify(_ticket_payload(ticket.id)), 200
 
 
 @tickets_bp.route('/tickets/<ticket_id>', methods=['DELETE'])
@@ -193,45 +338,33 @@ def delete_ticket(project_id, ticket_id):
     return '', 204
 
 
+def _place_ticket(ticket, col_id, pos):
+    """Give the ticket a rank for index `pos` (0..) in column `col_id`; only this row is written.
+
+    `pos` None: end of the new column, or unchanged within the same column.
+    Returns True if the ticket moved.
+    """
+    if col_id == ticket.column_id:
+        if pos is None or pos == lexorank.index_of('tickets', ticket):
+            return False
+        ticket.rank = lexorank.rank_at('tickets', col_id, pos, exclude_id=ticket.id)
+    elif pos is None:
+        ticket.rank = lexorank.rank_after_last('tickets', col_id)
+    else:
+        ticket.rank = lexorank.rank_at('tickets', col_id, pos, exclude_id=ticket.id)
+    ticket.column_id = col_id
+    return True
+
+
 @tickets_bp.route('/tickets/<ticket_id>/move', methods=['PUT'])
 def move_ticket(project_id, ticket_id):
     """Move ticket to a different column and/or position. { columnId, position }"""
     ticket = Ticket.query.get_or_404(ticket_id)
     data = request.get_json() or {}
     new_col_id = data.get('columnId', ticket.column_id)
-    new_pos = data.get('position', ticket.position)
-
-    # Shift positions in target column
-    if new_col_id != ticket.column_id:
-        # Remove from old column: shift down
-        Ticket.query.filter(
-            Ticket.column_id == ticket.column_id,
-            Ticket.position > ticket.position
-        ).update({Ticket.position: Ticket.position - 1})
-        # Insert into new column: shift up
-        Ticket.query.filter(
-            Ticket.column_id == new_col_id,
-            Ticket.position >= new_pos
-        ).update({Ticket.position: Ticket.position + 1})
-        ticket.column_id = new_col_id
-        ticket.position = new_pos
-    else:
-        old_pos = ticket.position
-        if new_pos > old_pos:
-            Ticket.query.filter(
-                Ticket.column_id == ticket.column_id,
-                Ticket.id != ticket.id,
-                Ticket.position > old_pos,
-                Ticket.position <= new_pos
-            ).update({Ticket.position: Ticket.position - 1})
-        elif new_pos < old_pos:
-            Ticket.query.filter(
-                Ticket.column_id == ticket.column_id,
-                Ticket.id != ticket.id,
-                Ticket.position >= new_pos,
-                Ticket.position < old_pos
-            ).update({Ticket.position: Ticket.position + 1})
-        ticket.position = new_pos
-
-    db.session.commit()
-    return jsonify(ticket.to_dict()), 200
+    if new_col_id != ticket.column_id and db.session.get(TicketColumn, new_col_id) is None:
+        return jsonify({'error': 'Unknown column'}), 400
+    if _place_ticket(ticket, new_col_id, _int_position(data)):
+        db.session.commit()
+        lexorank.schedule_rebalance('tickets', ticket.column_id, ticket.rank)
+    return jsonify(_ticket_payload(ticket.id)), 200
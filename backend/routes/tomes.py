@@ -1,8 +1,17 @@
-from flask import Blueprint, request, jsonify, Response
+from flask import Blueprint, request, jsonify, send_file, abort
 from ..models import Saga, Tome, Chapter
 from ..database import db
-from markupsafe import escape
+from ..text_stats import refresh_chapter_stats
+from ..chapter_ops import (
+    InvalidOps, StaleVersion, append_ops, chapter_payload, chapter_stamp, compact, materialize,
+)
+from ..chapter_revisions import record_revision
+from ..tome_export import cached_tome_pdf, pdf_cache_key
+from ..conditional import make_etag, not_modified, with_validators
+from .jobs import enqueue_tome_pdf
+from .. import lexorank
 from sqlalchemy import asc
+from sqlalchemy.exc import IntegrityError
 
 
 tomes_bp = Blueprint('tomes', __name__, url_prefix='/api')
@@ -22,18 +31,9 @@ def create_tome(saga_id):
 def get_tome(cid):
     tome = Tome.query.get_or_404(cid)
 
-    q = Chapter.query.filter_by(tome_id=cid)
-    # si tu as un champ position, trie dessus, sinon created_at
-    if hasattr(Chapter, 'position'):
-        q = q.order_by(asc(Chapter.position), asc(Chapter.created_at))
-    else:
-        q = q.order_by(asc(Chapter.created_at))
-
-    chapters = [{'id': c.id, 'title': c.title, 'position': getattr(c, 'position', None)} for c in q.all()]
-
     return jsonify({
         **tome.to_dict(),
-        'chapters': chapters
+        'chapters': _ordered_chapters(cid)
     }), 200
 
 @tomes_bp.put('/tomes/<cid>')
@@ -59,12 +59,8 @@ def delete_tome(cid):
 @tomes_bp.get('/tomes/<tome_id>/chapters')
 def list_chapters_for_tome(tome_id):
     Tome.query.get_or_404(tome_id)  # vérifie l'existence du tome
-    chapters = (Chapter.query
-                .filter_by(tome_id=tome_id)
-                .order_by(Chapter.created_at.asc())
-                .all())
-    # renvoyer une liste "légère" (sans le content) pour le sélecteur
-    return jsonify([{'id': c.id, 'title': c.title} for c in chapters]), 200
+    # renvoyer une liste "légère" (sans le content) pour le sélecteur, dans l'ordre de lecture
+    return jsonify([{'id': cid, 'title': title} for cid, title, _rank in chapters_query(tome_id)]), 200
 
 @tomes_bp.post('/tomes/<tome_id>/chapters')
 def create_chapter(tome_id):
@@ -73,16 +69,30 @@ def create_chapter(tome_id):
     title = (data.get("title") or "Nouveau chapitre").strip()
     content = data.get("content") or ""
 
-    last = Chapter.query.filter_by(tome_id=tome_id).order_by(Chapter.position.desc()).first()
-    pos = (last.position + 1) if last else 1
-
-    c = Chapter(title=title, content=content, tome_id=tome_id, position=pos)
+    c = Chapter(title=title, content=content, tome_id=tome_id,
+                rank=lexorank.rank_after_last('chapters', tome_id))
     db.session.add(c)
+    db.session.flush()
+    refresh_chapter_stats(c)
+    record_revision(c)
     db.session.commit()
-    return jsonify(c.to_dict()), 201
+    return jsonify(chapter_payload(c)), 201
+
+def chapters_query(tome_id):
+    """(id, titre, rang) des chapitres du tome, dans l'ordre (sans le content)."""
+    return (db.session.query(Chapter.id, Chapter.title, Chapter.rank)
+            .filter(Chapter.tome_id == tome_id)
+            .order_by(asc(Chapter.rank), asc(Chapter.created_at)))
+
+def _ordered_chapters(tome_id):
+    """Chapitres du tome dans l'ordre, positions 1.. calculées."""
+    return [{'id': cid, 'title': title, 'position': i, 'rank': rank}
+            for i, (cid, title, rank) in enumerate(chapters_query(tome_id), 1)]
+
 
 @tomes_bp.put('/chapters/<chapter_id>/move')
 def move_chapter(chapter_id):
+    """Déplace le chapitre à la position `toPosition` (1..) : seule sa clé d'ordre est réécrite."""
     c = Chapter.query.get_or_404(chapter_id)
     payload = request.get_json() or {}
     to_pos = payload.get('toPosition')
@@ -90,57 +100,83 @@ def move_chapter(chapter_id):
         return {'error': 'toPosition (int) required'}, 400
 
     # bornes
-    siblings_q = Chapter.query.filter_by(tome_id=c.tome_id)
-    max_pos = siblings_q.count()
+    max_pos = Chapter.query.filter_by(tome_id=c.tome_id).count()
     to_pos = max(1, min(to_pos, max_pos))
-    from_pos = c.position
-
-    if to_pos == from_pos:
-        ordered = siblings_q.order_by(Chapter.position.asc(), Chapter.created_at.asc()).all()
-        return jsonify([{'id': ch.id, 'title': ch.title, 'position': ch.position} for ch in ordered]), 200
-
-    # déplacer et décaler les autres
-    if to_pos > from_pos:
-        (Chapter.query
-         .filter(Chapter.tome_id == c.tome_id,
-                 Chapter.position > from_pos,
-                 Chapter.position <= to_pos)
-         .update({Chapter.position: Chapter.position - 1}, synchronize_session=False))
-    else:
-        (Chapter.query
-         .filter(Chapter.tome_id == c.tome_id,
-                 Chapter.position >= to_pos,
-                 Chapter.position < from_pos)
-         .update({Chapter.position: Chapter.position + 1}, synchronize_session=False))
-
-    c.position = to_pos
-    db.session.commit()
+
+    if to_pos != lexorank.index_of('chapters', c) + 1:
+        c.rank = lexorank.rank_at('chapters', c.tome_id, to_pos - 1, exclude_id=c.id)
+        db.session.commit()
+        lexorank.schedule_rebalance('chapters', c.tome_id, c.rank)
 
     # renvoyer la liste ordonnée mise à jour (pratique pour le front)
-    ordered = siblings_q.order_by(Chapter.position.asc(), Chapter.created_at.asc()).all()
-    return jsonify([{'id': ch.id, 'title': ch.title, 'position': ch.position} for ch in ordered]), 200
+    return jsonify(_ordered_chapters(c.tome_id)), 200
 
 @tomes_bp.get('/chapters/<chapter_id>')
 def get_chapter(chapter_id):
+    stamp = chapter_stamp(chapter_id)
+    if stamp is None:
+        abort(404)
+    # ETag seul : deux sauvegardes dans la même seconde ont la même date HTTP,
+    # un If-Modified-Since renverrait 304 sur l'ancien texte
+    etag = make_etag("chapter", chapter_id, *stamp)
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
     c = Chapter.query.get_or_404(chapter_id)
-    return jsonify(c.to_dict()), 200
+    return with_validators(jsonify(chapter_payload(c, position=stamp[2])), etag)
 
 @tomes_bp.put('/chapters/<chapter_id>')
 def update_chapter(chapter_id):
     c = Chapter.query.get_or_404(chapter_id)
     payload = request.get_json() or {}
+    # intègre d'abord les ops en attente : le PUT repart du texte courant
+    state = materialize(c)
+    if state[3] != (c.ops_seq or 0):
+        compact(c, state)
     if 'title' in payload:
         c.title = (payload['title'] or '').strip()
         if not c.title:
             return {'error': 'Title required'}, 400
     if 'content' in payload:
         c.content = payload['content'] or ''
+        refresh_chapter_stats(c)
     if "notes" in payload:
         c.notes = payload["notes"] or ""
     if "annotations" in payload:
         c.annotations = payload.get("annotations", {}) or {}
+    record_revision(c)
     db.session.commit()
-    return jsonify(c.to_dict()), 200
+    return jsonify(chapter_payload(c)), 200
+
+@tomes_bp.patch('/chapters/<chapter_id>/ops')
+def patch_chapter_ops(chapter_id):
+    """Sauvegarde incrémentale.
+
+    Body : { baseVersion, content: [{at, delete, insert}], notes: [...], annotations? }
+    409 si baseVersion n'est plus la version courante (renvoie la version courante).
+    """
+    c = Chapter.query.get_or_404(chapter_id)
+    payload = request.get_json() or {}
+    base = payload.get('baseVersion')
+    if not isinstance(base, str) or not base:
+        return {'error': 'baseVersion required'}, 400
+    try:
+        version, seq, compacted = append_ops(c, base, payload)
+        if compacted:
+            record_revision(c)
+        if 'annotations' in payload:
+            c.annotations = payload.get('annotations') or {}
+        db.session.commit()
+    except StaleVersion as e:
+        return {'error': 'stale base version', 'version': e.current}, 409
+    except InvalidOps as e:
+        db.session.rollback()
+        return {'error': str(e)}, 400
+    except IntegrityError:
+        # PATCH concurrent sur la même baseVersion : même (chapter_id, seq), un seul passe
+        db.session.rollback()
+        return {'error': 'stale base version', 'version': materialize(c)[2]}, 409
+    return jsonify({'id': c.id, 'version': version, 'seq': seq, 'compacted': compacted}), 200
 
 @tomes_bp.delete('/chapters/<chapter_id>')
 def delete_chapter(chapter_id):
@@ -149,95 +185,14 @@ def delete_chapter(chapter_id):
     db.session.commit()
     return '', 204
 
-def _cleanup_html(html: str) -> str:
-    """Retire les marqueurs internes (liens d'app, data-*) pour un export propre."""
-    try:
-        from bs4 import BeautifulSoup  # pip install beautifulsoup4 (facultatif)
-        soup = BeautifulSoup(html or "", "html.parser")
-        # unwrap des liens internes
-        for a in soup.find_all("a", attrs={"data-app-link": True}):
-            a.unwrap()
-        # retire quelques data-* (adapte si besoin)
-        for el in soup.find_all(attrs={"data-entity": True}):
-            del el["data-entity"]
-        return str(soup)
-    except Exception:
-        return html or ""
-
-def _build_tome_html(tome: Tome, chapters: list[Chapter]) -> str:
-    title = f"{tome.name}"
-    toc_items, content_items = [], []
-    for i, ch in enumerate(chapters, start=1):
-        anchor = f"ch-{i}"
-        toc_items.append(f'<li><a href="#{anchor}">{escape(ch.title)}</a></li>')
-        content_items.append(f"""
-          <section class="chapter{' first' if i == 1 else ''}">
-            <h1 id="{anchor}">{escape(ch.title)}</h1>
-            <div class="chapter-content">
-              {_cleanup_html(ch.content)}
-            </div>
-          </section>
-        """)
-
-    return f"""<!doctype html>
-<html lang="fr">
-<head>
-<meta charset="utf-8"/>
-<title>{escape(title)}</title>
-<meta name="viewport" content="width=device-width, initial-scale=1"/>
-<style>
-  @page {{ margin: 20mm; }}
-  body {{
-    font-family: system-ui, -apple-system, Segoe UI, Roboto, Arial, sans-serif;
-    line-height: 1.6; color: #111;
-  }}
-  .container {{ max-width: 800px; margin: 0 auto; padding: 24px; }}
-  header h1 {{ font-size: 2rem; margin: 0 0 8px; }}
-  .toc {{ margin: 16px 0 32px; }}
-  .toc h2 {{ font-size: 1.1rem; margin: 0 0 8px; }}
-  .toc ul {{ margin: 0; padding-left: 20px; }}
-  .chapter h1 {{ font-size: 1.6rem; margin: 24px 0 12px; }}
-  .chapter:not(.first) {{ page-break-before: always; }}
-  .chapter-content img {{ max-width: 100%; height: auto; }}
-</style>
-</head>
-<body>
-  <div class="container">
-    <header><h1>{escape(title)}</h1></header>
-    <nav class="toc">
-      <h2>Sommaire</h2>
-      <ul>{''.join(toc_items)}</ul>
-    </nav>
-    {''.join(content_items)}
-  </div>
-</body>
-</html>"""
-
 @tomes_bp.get('/tomes/<tome_id>/export/pdf')
 def export_tome_pdf(tome_id):
+    """PDF en cache servi directement ; sinon 202 + job de rendu (cf. /api/jobs/<id>)."""
     tome = Tome.query.get_or_404(tome_id)
-
-    q = Chapter.query.filter_by(tome_id=tome.id)
-    if hasattr(Chapter, 'position'):
-        q = q.order_by(Chapter.position.asc(), Chapter.created_at.asc())
-    else:
-        q = q.order_by(Chapter.created_at.asc())
-    chapters = q.all()
-
-    html = _build_tome_html(tome, chapters)
-
-    # --- WeasyPrint (recommandé) ---
-    try:
-        from weasyprint import HTML  # pip install weasyprint (lib Cairo/Pango requises)
-        pdf_bytes = HTML(string=html, base_url=request.url_root).write_pdf()
-        headers = {"Content-Disposition": f'attachment; filename="{tome.name or "tome"}.pdf"'}
-        return Response(pdf_bytes, mimetype="application/pdf", headers=headers)
-    except Exception as e:
-        # --- Fallback wkhtmltopdf (si installé) ---
-        try:
-            import pdfkit  # pip install pdfkit  (+ wkhtmltopdf côté OS)
-            pdf_bytes = pdfkit.from_string(html, False, options={"enable-local-file-access": ""})
-            headers = {"Content-Disposition": f'attachment; filename="{tome.name or "tome"}.pdf"'}
-            return Response(pdf_bytes, mimetype="application/pdf", headers=headers)
-        except Exception as e2:
-            return {"error": "PDF export failed", "weasyprint": str(e), "wkhtmltopdf": str(e2)}, 500
\ No newline at end of file
+    key = pdf_cache_key(tome)
+    path = cached_tome_pdf(tome, key)
+    if path:
+        return send_file(path, mimetype="application/pdf", as_attachment=True,
+                         download_name=f"{tome.name or 'tome'}.pdf")
+    job = enqueue_tome_pdf(tome, key)
+    return jsonify(job.to_dict()), 202, {"Location": f"/api/jobs/{job.id}"}
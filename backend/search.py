@@ -0,0 +1,295 @@
+# backend/search.py
+"""Index plein texte (SQLite FTS5) des chapitres et de la base de connaissances.
+
+Une seule table virtuelle `search_index` : une ligne par chapitre / personnage /
+lieu / objet / événement, tenue à jour dans la même transaction que l'écriture
+(hook `after_flush` de la session). Hors SQLite, l'index est désactivé et les
+routes retombent sur des ILIKE.
+
+Les colonnes UNINDEXED d'une table FTS5 ne sont pas indexées : un DELETE sur
+(kind, ref_id) parcourt tout l'index. `search_refs` associe (kind, ref_id) au
+rowid de la ligne FTS ; mises à jour et suppressions passent par ce rowid.
+"""
+import json
+import re
+from types import SimpleNamespace
+from sqlalchemy import DDL, event, inspect, text
+from .database import db
+from .models import Collection, Saga, Tome, Chapter, Character, Place, Item, Event
+from .text_stats import parse_chapter_html
+
+CREATE_INDEX_SQL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+    kind UNINDEXED, ref_id UNINDEXED, collection_id UNINDEXED,
+    title, subtitle, body,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+
+CREATE_REFS_SQL = """
+CREATE TABLE IF NOT EXISTS search_refs (
+    id INTEGER PRIMARY KEY,
+    kind VARCHAR NOT NULL,
+    ref_id VARCHAR NOT NULL,
+    collection_id VARCHAR,
+    CONSTRAINT uq_search_refs_kind_ref UNIQUE (kind, ref_id)
+)
+"""
+CREATE_REFS_INDEX_SQL = "CREATE INDEX IF NOT EXISTS ix_search_refs_collection ON search_refs (collection_id)"
+
+KINDS = ("chapter", "character", "place", "item", "event")
+
+# bm25 : le titre pèse plus que le sous-titre, lui-même plus que le corps
+_RANK = "bm25(search_index, 0, 0, 0, 10.0, 4.0, 1.0)"
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def _strip(html):
+    return parse_chapter_html(html)[0] if html else ""
+
+
+def _custom_fields_text(content):
+    """Valeurs texte des champs custom (JSON `content`), HTML retiré."""
+    if not content:
+        return ""
+    out = []
+    def walk(v):
+        if isinstance(v, str):
+            out.append(_strip(v) if "<" in v else v)
+        elif isinstance(v, dict):
+            for x in v.values():
+                walk(x)
+        elif isinstance(v, list):
+            for x in v:
+                walk(x)
+    walk(content if isinstance(content, (dict, list)) else json.loads(content))
+    return " ".join(s for s in out if s)
+
+
+# ---------- Documents indexés ----------------------------------------------
+
+def _doc_character(c):
+    return f"{c.firstname} {c.lastname}".strip(), "", _custom_fields_text(c.content)
+
+def _doc_place(p):
+    return p.name, p.location or "", f"{_strip(p.description)} {_custom_fields_text(p.content)}".strip()
+
+def _doc_item(it):
+    return it.name, it.category or "", f"{_strip(it.description)} {_custom_fields_text(it.content)}".strip()
+
+def _doc_event(ev):
+    return ev.name, "", f"{_strip(ev.description)} {_custom_fields_text(ev.content)}".strip()
+
+def _doc_chapter(ch):
+    return ch.title, "", _strip(ch.content)
+
+# modèle -> (kind, builder, attributs qui déclenchent une réindexation)
+_INDEXED = {
+    Chapter:   ("chapter",   _doc_chapter,   ("title", "content", "tome_id")),
+    Character: ("character", _doc_character, ("firstname", "lastname", "content")),
+    Place:     ("place",     _doc_place,     ("name", "location", "description", "content")),
+    Item:      ("item",      _doc_item,      ("name", "category", "description", "content")),
+    Event:     ("event",     _doc_event,     ("name", "description", "content")),
+}
+
+
+def _enabled(conn) -> bool:
+    return conn.dialect.name == "sqlite"
+
+
+def _collection_of(conn, obj):
+    if not isinstance(obj, Chapter):
+        return obj.collection_id
+    return conn.execute(
+        text("SELECT s.collection_id FROM tomes t JOIN sagas s ON s.id = t.saga_id WHERE t.id = :tid"),
+        {"tid": obj.tome_id},
+    ).scalar()
+
+
+def _rowid(conn, kind, ref_id):
+    return conn.execute(text("SELECT id FROM search_refs WHERE kind = :k AND ref_id = :id"),
+                        {"k": kind, "id": ref_id}).scalar()
+
+
+def _delete_rows(conn, kind, ref_id):
+    rowid = _rowid(conn, kind, ref_id)
+    if rowid is not None:
+        conn.execute(text("DELETE FROM search_index WHERE rowid = :r"), {"r": rowid})
+        conn.execute(text("DELETE FROM search_refs WHERE id = :r"), {"r": rowid})
+
+
+def _delete_collection(conn, collection_id):
+    conn.execute(text("DELETE FROM search_index WHERE rowid IN "
+                      "(SELECT id FROM search_refs WHERE collection_id = :cid)"), {"cid": collection_id})
+    conn.execute(text("DELETE FROM search_refs WHERE collection_id = :cid"), {"cid": collection_id})
+
+
+_INSERT_ROW = text(
+    "INSERT INTO search_index (rowid, kind, ref_id, collection_id, title, subtitle, body) "
+    "VALUES (:r, :k, :id, :cid, :t, :s, :b)"
+)
+
+
+def _index_row(conn, kind, ref_id, collection_id, doc):
+    title, subtitle, body = doc
+    rowid = _rowid(conn, kind, ref_id)
+    if rowid is None:
+        rowid = conn.execute(text("INSERT INTO search_refs (kind, ref_id, collection_id) VALUES (:k, :id, :cid)"),
+                             {"k": kind, "id": ref_id, "cid": collection_id}).lastrowid
+    else:
+        conn.execute(text("DELETE FROM search_index WHERE rowid = :r"), {"r": rowid})
+        conn.execute(text("UPDATE search_refs SET collection_id = :cid WHERE id = :r"),
+                     {"r": rowid, "cid": collection_id})
+    conn.execute(_INSERT_ROW, {"r": rowid, "k": kind, "id": ref_id, "cid": collection_id,
+                               "t": title or "", "s": subtitle or "", "b": body or ""})
+
+
+def index_rows(conn, model, rows, collection_of):
+    """Indexe des lignes insérées hors ORM (import d'archive) : dicts colonne -> valeur,
+    ids neufs (pas de suppression préalable). `collection_of(row)` donne la collection."""
+    spec = _INDEXED.get(model)
+    if spec is None or not rows or not _enabled(conn):
+        return
+    kind, build, _attrs = spec
+    columns = [c.key for c in model.__table__.columns]
+    params = []
+    for row in rows:
+        title, subtitle, body = build(SimpleNamespace(**{c: row.get(c) for c in columns}))
+        params.append({"k": kind, "id": row["id"], "cid": collection_of(row),
+                       "t": title or "", "s": subtitle or "", "b": body or ""})
+    conn.execute(text("INSERT INTO search_refs (kind, ref_id, collection_id) VALUES (:k, :id, :cid)"),
+                 [{"k": p["k"], "id": p["id"], "cid": p["cid"]} for p in params])
+    conn.execute(
+        text("INSERT INTO search_index (rowid, kind, ref_id, collection_id, title, subtitle, body) "
+             "VALUES ((SELECT id FROM search_refs WHERE kind = :k AND ref_id = :id), :k, :id, :cid, :t, :s, :b)"),
+        params,
+    )
+
+
+def _needs_reindex(obj, attrs) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[a].history.has_changes() for a in attrs)
+
+
+def _after_flush(session, flush_context):
+    conn = session.connection()
+    if not _enabled(conn):
+        return
+    for obj in list(session.new) + list(session.dirty):
+        spec = _INDEXED.get(type(obj))
+        if spec is None:
+            continue
+        kind, build, attrs = spec
+        if obj in session.dirty and not _needs_reindex(obj, attrs):
+            continue
+        _index_row(conn, kind, obj.id, _collection_of(conn, obj), build(obj))
+    for obj in session.deleted:
+        if isinstance(obj, Collection):
+            _delete_collection(conn, obj.id)
+            continue
+        spec = _INDEXED.get(type(obj))
+        if spec is not None:
+            _delete_rows(conn, spec[0], obj.id)
+
+
+def index_chapter(chapter, content):
+    """Réindexe un chapitre sur son texte courant (ops en attente comprises, cf. chapter_ops). Sans commit."""
+    conn = db.session.connection()
+    if _enabled(conn):
+        _index_row(conn, "chapter", chapter.id, _collection_of(conn, chapter), (chapter.title, "", _strip(content)))
+
+
+# ---------- Requêtes --------------------------------------------------------
+
+def fts_query(q: str, columns=None):
+    """Texte utilisateur -> requête MATCH FTS5 (préfixes, tous les mots requis)."""
+    words = _WORD_RE.findall(q or "")
+    if not words:
+        return None
+    expr = " ".join(f'"{w}"*' for w in words)
+    if columns:
+        return "{%s} : (%s)" % (" ".join(columns), expr)
+    return expr
+
+
+def fts_ids(kind: str, collection_id: str, q: str, columns=None):
+    """Sous-requête des ids correspondant à `q`, ou None si l'index n'est pas utilisable."""
+    match = fts_query(q, columns)
+    if match is None or not _enabled(db.session.connection()):
+        return None
+    return (
+        text("SELECT ref_id FROM search_index "
+             "WHERE search_index MATCH :match AND kind = :kind AND collection_id = :cid")
+        .bindparams(match=match, kind=kind, cid=collection_id)
+        .columns(ref_id=db.String)
+    )
+
+
+def search(collection_id: str, q: str, kinds=KINDS, limit: int = 20, offset: int = 0):
+    """Recherche classée (bm25) avec extraits. Retourne (total, [résultats])."""
+    match = fts_query(q)
+    if match is None:
+        return 0, []
+    kinds = [k for k in kinds if k in KINDS] or list(KINDS)
+    params = {"match": match, "cid": collection_id, "limit": limit, "offset": offset}
+    params.update({f"k{i}": k for i, k in enumerate(kinds)})
+    kind_in = ", ".join(f":k{i}" for i in range(len(kinds)))
+    where = f"search_index MATCH :match AND collection_id = :cid AND kind IN ({kind_in})"
+
+    total = db.session.execute(text(f"SELECT count(*) FROM search_index WHERE {where}"), params).scalar()
+    rows = db.session.execute(text(
+        f"SELECT kind, ref_id, title, subtitle, "
+        f"snippet(search_index, -1, '<mark>', '</mark>', '…', 16), {_RANK} AS rank "
+        f"FROM search_index WHERE {where} ORDER BY rank LIMIT :limit OFFSET :offset"
+    ), params).all()
+    return total, [{
+        "type": kind,
+        "id": ref_id,
+        "title": title,
+        "subtitle": subtitle or None,
+        "snippet": snippet,
+        "rank": rank,
+    } for kind, ref_id, title, subtitle, snippet, rank in rows]
+
+
+# ---------- Maintenance -----------------------------------------------------
+
+def reindex_all():
+    """Reconstruit entièrement l'index (après migration ou import)."""
+    conn = db.session.connection()
+    if not _enabled(conn):
+        return 0
+    for sql in (CREATE_INDEX_SQL, CREATE_REFS_SQL, CREATE_REFS_INDEX_SQL):
+        conn.execute(text(sql))
+    conn.execute(text("DELETE FROM search_index"))
+    conn.execute(text("DELETE FROM search_refs"))
+    n = 0
+    tome_collection = dict(
+        db.session.query(Tome.id, Saga.collection_id).join(Saga, Tome.saga_id == Saga.id).all()
+    )
+    for model, (kind, build, _attrs) in _INDEXED.items():
+        for obj in model.query.yield_per(200):
+            cid = tome_collection.get(obj.tome_id) if model is Chapter else obj.collection_id
+            _index_row(conn, kind, obj.id, cid, build(obj))
+            n += 1
+    db.session.commit()
+    return n
+
+
+_create_index_ddl = [DDL(sql).execute_if(dialect="sqlite")
+                     for sql in (CREATE_INDEX_SQL, CREATE_REFS_SQL, CREATE_REFS_INDEX_SQL)]
+
+
+def init_app(app):
+    if not event.contains(db.session, "after_flush", _after_flush):
+        event.listen(db.session, "after_flush", _after_flush)
+    # db.create_all() crée aussi la table virtuelle (les migrations le font de leur côté)
+    for ddl in _create_index_ddl:
+        if not event.contains(db.metadata, "after_create", ddl):
+            event.listen(db.metadata, "after_create", ddl)
+
+    @app.cli.command("search-reindex")
+    def search_reindex_command():
+        """Reconstruit l'index plein texte."""
+        print(f"{reindex_all()} documents indexés")
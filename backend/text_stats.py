@@ -0,0 +1,166 @@
+# backend/text_stats.py
+"""Statistiques texte des chapitres (mots, mentions d'entités, vocabulaire).
+
+Parsing HTML via la stdlib (html.parser) : pas de dépendance à BeautifulSoup,
+et une seule passe par chapitre.
+"""
+import hashlib
+import re
+from collections import Counter
+from html.parser import HTMLParser
+from .database import db
+from .models import ChapterStats
+
+ENTITY_TYPES = ("character", "place", "item", "event")
+
+# Même découpage que le front : lettres/chiffres + apostrophes
+_TOKEN_RE = re.compile(r"(?:[^\W_]|[’'])+")
+
+# Balises "bloc" : on insère un séparateur pour ne pas coller les mots
+_BLOCK_TAGS = {
+    "p", "div", "br", "li", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6",
+    "blockquote", "pre", "tr", "td", "th", "table", "section", "article", "hr",
+}
+
+STOPWORDS_FR = frozenset("""
+a à â afin ai aie aient ainsi ait alors après assez au aucun aucune aujourd aujourd’hui aupres auquel aura aurai
+auraient aurais aurait auras aurez auriez aurions aurons auront aussi autre autres aux auxquelles auxquels avaient
+avais avait avant avec avez aviez avions avoir avons ayant ayez ayons
+car ce ceci cela celle celles celui cependant certain certaine certaines certains ces cet cette ceux chacun chaque
+chez ci comme comment contre d dans de des du dedans dehors depuis devant doit doivent donc dont dos droite début
+désormais
+elle elles en encore ensuite entre envers environ est et etaient etais etait etant ete etes etre eux
+fait faite faites fois font furent fut
+grande grandes grand grands haut hors ici il ils je jusqu juste
+l la le les leur leurs là lequel lesquels lesquelles lors lui
+ma mais mal me meme mes mien mienne miennes miens moi moins mon
+ne ni nommés nos notre nous nouveaux on ont ou où
+par parce parole pas pendant personne peu peut peuvent peux plus plusieurs plutôt pour pourquoi
+pourra pourrais pourrait pourrez pourrions pourront près puis puisque
+qu quand que quel quelle quelles quels qui quoi
+sa sans se sera serai seraient serais serait seras serez seriez serions serons seront ses seulement
+si sien sienne siennes siens soi soit sommes son sont sous souvent sur
+ta tandis tel telle telles tels tes toi ton tous tout toute toutes trois trop très tu
+un une unes uns voici voilà vos votre vous y
+""".split())
+
+
+class _ChapterParser(HTMLParser):
+    """Extrait le texte brut et les <span class="wv-entity"> d'un chapitre."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.entities = []      # [(type, id, label)]
+        self._stack = []        # pile des spans ouverts : entité courante ou None
+        self._label = None      # buffer du label de l'entité en cours
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _BLOCK_TAGS:
+            self.parts.append(" ")
+        if tag != "span":
+            return
+        a = dict(attrs)
+        classes = (a.get("class") or "").split()
+        etype, eid = a.get("data-entity-type"), a.get("data-entity-id")
+        if "wv-entity" in classes and etype and eid and self._label is None:
+            self._stack.append((etype, eid))
+            self._label = []
+        else:
+            self._stack.append(None)
+
+    def handle_endtag(self, tag):
+        if tag in _BLOCK_TAGS:
+            self.parts.append(" ")
+        if tag != "span" or not self._stack:
+            return
+        ent = self._stack.pop()
+        if ent is not None:
+            self.entities.append((ent[0], ent[1], "".join(self._label).strip()))
+            self._label = None
+
+    def handle_data(self, data):
+        self.parts.append(data)
+        if self._label is not None:
+            self._label.append(data)
+
+
+def parse_chapter_html(html: str):
+    """Retourne (texte brut, [(type, id, label)]) pour un contenu HTML."""
+    p = _ChapterParser()
+    p.feed(html or "")
+    p.close()
+    text = re.sub(r"\s+", " ", "".join(p.parts)).strip()
+    return text, p.entities
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def word_frequencies(tokens) -> Counter:
+    """Fréquences hors mots-outils (>= 3 lettres), comme la page Analytics."""
+    return Counter(t for t in tokens if len(t) >= 3 and t not in STOPWORDS_FR)
+
+
+def entity_histogram(entities) -> list[dict]:
+    """[(type, id, label)] -> [{id, type, label, count}] trié par fréquence."""
+    counts, labels = Counter(), {}
+    for etype, eid, label in entities:
+        counts[(etype, eid)] += 1
+        labels.setdefault((etype, eid), label or eid)
+    rows = [{"id": eid, "type": etype, "label": labels[(etype, eid)], "count": n}
+            for (etype, eid), n in counts.items()]
+    rows.sort(key=lambda r: (-r["count"], r["label"]))
+    return rows
+
+
+def content_hash(html: str) -> str:
+    return hashlib.sha1((html or "").encode("utf-8")).hexdigest()
+
+
+def chapter_stats(html: str) -> dict:
+    """Calcule toutes les statistiques d'un chapitre en une passe."""
+    text, entities = parse_chapter_html(html)
+    tokens = tokenize(text)
+    return {
+        "contentHash": content_hash(html),
+        "wordCount": len(tokens),
+        "charCount": len(text),
+        "entities": entity_histogram(entities),
+        "words": word_frequencies(tokens),
+    }
+
+
+def top_words(counter: Counter, limit: int) -> list[dict]:
+    return [{"label": w, "value": n} for w, n in counter.most_common(limit)]
+
+
+# ---------- Cache persistant (table chapter_stats) --------------------------
+
+def store_chapter_stats(chapter_id: str, html: str, stats: ChapterStats = None) -> ChapterStats:
+    """(Re)calcule les stats d'un contenu et les place dans la session (sans commit)."""
+    computed = chapter_stats(html)
+    if stats is None:
+        stats = ChapterStats(chapter_id=chapter_id)
+        db.session.add(stats)
+    stats.content_hash = computed["contentHash"]
+    stats.word_count = computed["wordCount"]
+    stats.char_count = computed["charCount"]
+    stats.entities = computed["entities"]
+    stats.words = dict(computed["words"])
+    return stats
+
+
+def refresh_chapter_stats(chapter, html: str = None) -> ChapterStats:
+    """Met à jour chapter.stats si le contenu a changé (comparaison par hash).
+
+    `html` : texte courant quand il diffère du snapshot chapter.content (ops en attente).
+    """
+    html = chapter.content if html is None else html
+    current = chapter.stats
+    if current is not None and current.content_hash == content_hash(html):
+        return current
+    stats = store_chapter_stats(chapter.id, html, current)
+    chapter.stats = stats
+    return stats
@@ -0,0 +1,334 @@
+# backend/timeline_index.py
+"""Frise chronologique normalisée, indexée par intervalles.
+
+`CollectionTimeline.data` gardait tous les éléments de la frise dans un seul
+tableau JSON : savoir ce qui se passe entre l'an X et l'an Y demandait de tout
+charger et de tout parcourir côté client. Désormais :
+
+- `timeline_entries` (kind 'item') : une ligne par élément de la frise (JSON de
+  l'élément, ordre `seq`), bornée par les dates de son événement ;
+- `timeline_entries` (kind 'event') : une ligne par événement de la collection
+  (bornes seules), tenue à jour à chaque flush qui crée, redate ou supprime un
+  `Event` ;
+- `CollectionTimeline.data` : les métadonnées seules (version, options).
+
+Les bornes sont des jours ordinaux (date.toordinal, fin incluse, fin absente =
+début). Un intervalle [début, fin] recoupe la fenêtre [a, b] si début <= b et
+fin >= a ; avec un index B-tree sur le début seul, la première condition ne
+borne pas la recherche. D'où `span_class` = bit_length(fin - début) : dans une
+classe c, la durée est < 2^c, donc début >= a - 2^c + 1. La fenêtre se lit en
+une plage d'index (collection, kind, classe, début) par classe présente (au
+plus 23 pour 9999 ans) ; chaque plage ne lit au pire qu'environ deux fois les
+lignes utiles de sa classe, quelle que soit la taille de la frise.
+
+Les routes historiques (document entier) restent servies : le document est
+réassemblé à la lecture et les éléments modifiés réécrits à la sauvegarde.
+"""
+import uuid
+from datetime import date
+from flask import current_app
+from sqlalchemy import Integer, bindparam, delete, event, func, insert, inspect, select, union_all, update
+from sqlalchemy.orm import load_only, selectinload
+from sqlalchemy.orm.attributes import flag_modified
+from .database import db
+from .models import Collection, CollectionTimeline, Event, TimelineEntry
+
+DEFAULT_WINDOW_LIMIT = 2000
+KINDS = ("item", "event")
+_BATCH = 500
+
+_entries = TimelineEntry.__table__
+_events = Event.__table__
+_timelines = CollectionTimeline.__table__
+
+
+class TimelineError(ValueError):
+    pass
+
+
+def ordinals(start, end):
+    """(début, fin, classe de durée) en jours ordinaux ; fin absente ou antérieure au début -> début."""
+    if start is None:
+        return None, None, None
+    lo = start.toordinal()
+    hi = max(end.toordinal(), lo) if end is not None else lo
+    return lo, hi, (hi - lo).bit_length()
+
+
+def _spans(conn, collection_id, event_ids=None):
+    """id d'événement -> (début, fin, classe), pour les ids donnés (défaut : toute la collection)."""
+    stmt = select(_events.c.id, _events.c.start_date, _events.c.end_date).where(
+        _events.c.collection_id == collection_id)
+    if event_ids is None:
+        return {r.id: ordinals(r.start_date, r.end_date) for r in conn.execute(stmt)}
+    ids, out = list(event_ids), {}
+    for i in range(0, len(ids), _BATCH):
+        for r in conn.execute(stmt.where(_events.c.id.in_(ids[i:i + _BATCH]))):
+            out[r.id] = ordinals(r.start_date, r.end_date)
+    return out
+
+
+def _event_of(item):
+    event_id = item.get("eventId")
+    return event_id if isinstance(event_id, str) and event_id else None
+
+
+def _item_rows(conn, collection_id, items):
+    if not isinstance(items, list):
+        raise TimelineError("items must be a list")
+    seen = set()
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get("id"), str) or not item["id"]:
+            raise TimelineError("each timeline item needs a string id")
+        if item["id"] in seen:
+            raise TimelineError(f"duplicate timeline item id {item['id']}")
+        seen.add(item["id"])
+    spans = _spans(conn, collection_id, {e for e in map(_event_of, items) if e})
+    rows = []
+    for seq, item in enumerate(items):
+        start, end, span_class = spans.get(_event_of(item), (None, None, None))
+        rows.append({"collection_id": collection_id, "kind": "item", "item_id": item["id"],
+                     "event_id": _event_of(item), "seq": seq, "start_ord": start, "end_ord": end,
+                     "span_class": span_class, "data": item})
+    return rows
+
+
+# ---------- Document entier <-> lignes --------------------------------------
+
+def assemble(tl) -> dict:
+    """Document de la frise (format historique, `items` compris)."""
+    doc = dict(tl.data or {})
+    if "items" in doc:
+        return doc   # pas encore normalisée (archive d'avant les lignes) : rebuild() s'en charge
+    doc["items"] = list(db.session.execute(items_stmt(tl.collection_id)).scalars())
+    return doc
+
+
+def items_stmt(collection_id):
+    """Éléments de la frise de la collection, dans l'ordre du document."""
+    return (select(_entries.c.data)
+            .where(_entries.c.collection_id == collection_id, _entries.c.kind == "item")
+            .order_by(_entries.c.seq))
+
+
+def save(tl, doc):
+    """Remplace le document de la frise. Sans commit.
+
+    Seules les lignes des éléments ajoutés, retirés, modifiés ou déplacés sont
+    écrites ; `data` ne garde que les métadonnées.
+    """
+    if not isinstance(doc, dict):
+        raise TimelineError("timeline data must be an object")
+    conn = db.session.connection()
+    rows = _item_rows(conn, tl.collection_id, doc.get("items") or [])
+    current = {r.item_id: r for r in conn.execute(
+        select(_entries.c.id, _entries.c.item_id, _entries.c.event_id, _entries.c.seq,
+               _entries.c.start_ord, _entries.c.end_ord, _entries.c.data)
+        .where(_entries.c.collection_id == tl.collection_id, _entries.c.kind == "item"))}
+
+    wanted = {r["item_id"] for r in rows}
+    gone = [r.id for item_id, r in current.items() if item_id not in wanted]
+    for i in range(0, len(gone), _BATCH):
+        conn.execute(delete(_entries).where(_entries.c.id.in_(gone[i:i + _BATCH])))
+    changed, new = [], []
+    for row in rows:
+        old = current.get(row["item_id"])
+        if old is None:
+            new.append(row)
+        elif (old.seq, old.event_id, old.start_ord, old.end_ord, old.data) != (
+                row["seq"], row["event_id"], row["start_ord"], row["end_ord"], row["data"]):
+            changed.append({f"b_{k}": v for k, v in row.items()} | {"b_id": old.id})
+    if changed:
+        conn.execute(update(_entries).where(_entries.c.id == bindparam("b_id")).values(
+            **{k: bindparam(f"b_{k}") for k in ("event_id", "seq", "start_ord", "end_ord", "span_class", "data")}),
+            changed)
+    if new:
+        conn.execute(insert(_entries), new)
+
+    tl.data = {k: v for k, v in doc.items() if k != "items"}
+    flag_modified(tl, "data")   # éléments seuls modifiés : nouvelle révision quand même (ETag)
+
+
+def rebuild(conn, collection_id, event_ids=None):
+    """Reconstruit les bornes de la frise et l'index des événements d'une collection.
+
+    Lignes insérées hors ORM (import d'archive) ou réparation. Une frise encore
+    en un seul document est découpée ; `event_ids` (ancien id -> nouveau)
+    remappe alors les eventId de ses éléments. Sans commit.
+    """
+    spans = _spans(conn, collection_id)
+    conn.execute(delete(_entries).where(_entries.c.collection_id == collection_id, _entries.c.kind == "event"))
+    if spans:
+        conn.execute(insert(_entries), [
+            {"collection_id": collection_id, "kind": "event", "event_id": event_id,
+             "start_ord": s[0], "end_ord": s[1], "span_class": s[2]} for event_id, s in spans.items()])
+
+    tl = conn.execute(select(_timelines.c.id, _timelines.c.data)
+                      .where(_timelines.c.collection_id == collection_id)).first()
+    if tl is not None and isinstance(tl.data, dict) and "items" in tl.data:
+        items, seen = [], set()
+        for item in tl.data["items"] if isinstance(tl.data["items"], list) else []:
+            if not isinstance(item, dict):
+                continue
+            item = dict(item)
+            if not isinstance(item.get("id"), str) or not item["id"] or item["id"] in seen:
+                item["id"] = str(uuid.uuid4())
+            if event_ids is not None and _event_of(item):
+                item["eventId"] = event_ids.get(item["eventId"], item["eventId"])
+            seen.add(item["id"])
+            items.append(item)
+        conn.execute(delete(_entries).where(_entries.c.collection_id == collection_id, _entries.c.kind == "item"))
+        rows = _item_rows(conn, collection_id, items)
+        if rows:
+            conn.execute(insert(_entries), rows)
+        conn.execute(update(_timelines).where(_timelines.c.id == tl.id)
+                     .values(data={k: v for k, v in tl.data.items() if k != "items"}))
+        return
+
+    rows = conn.execute(select(_entries.c.id, _entries.c.event_id)
+                        .where(_entries.c.collection_id == collection_id, _entries.c.kind == "item")).all()
+    if rows:
+        empty = (None, None, None)
+        conn.execute(update(_entries).where(_entries.c.id == bindparam("b_id")).values(
+            start_ord=bindparam("b_start"), end_ord=bindparam("b_end"), span_class=bindparam("b_class")),
+            [dict(zip(("b_start", "b_end", "b_class"), spans.get(r.event_id, empty)), b_id=r.id) for r in rows])
+
+
+# ---------- Fenêtre ---------------------------------------------------------
+
+_WINDOW_STMTS = {}
+
+
+def window_stmt(widest):
+    """Requête de fenêtre pour les classes de durée présentes (construite une fois par forme)."""
+    stmt = _WINDOW_STMTS.get(widest)
+    if stmt is not None:
+        return stmt
+    lo, hi = bindparam("lo", type_=Integer), bindparam("hi", type_=Integer)
+    arms = [
+        select(_entries.c.id).where(_entries.c.collection_id == bindparam("cid"), _entries.c.kind == kind,
+                                    _entries.c.span_class == c,
+                                    _entries.c.start_ord.between(lo - ((1 << c) - 1), hi), _entries.c.end_ord >= lo)
+        for kind, top in zip(KINDS, widest) if top is not None for c in range(top + 1)
+    ]
+    ids = (union_all(*arms) if len(arms) > 1 else arms[0]).subquery()
+    stmt = _WINDOW_STMTS[widest] = (
+        select(_entries.c.kind, _entries.c.event_id, _entries.c.data)
+        .where(_entries.c.id.in_(select(ids.c.id)))
+        .order_by(_entries.c.start_ord, _entries.c.kind.desc(), _entries.c.seq, _entries.c.id)
+        .limit(bindparam("limit", type_=Integer)))
+    return stmt
+
+
+def window(collection_id, start: date, end: date, limit=None) -> dict:
+    """Éléments de la frise et événements qui recoupent [start, end], triés par début.
+
+    Bornés à `limit` lignes (éléments + événements, au plus TIMELINE_WINDOW_LIMIT) ;
+    `truncated` si la fenêtre en contient davantage.
+    """
+    cap = current_app.config.get("TIMELINE_WINDOW_LIMIT", DEFAULT_WINDOW_LIMIT)
+    limit = min(limit or cap, cap)
+    lo, hi = start.toordinal(), end.toordinal()
+    in_collection = _entries.c.collection_id == collection_id
+    widest = tuple(db.session.execute(select(*(
+        select(func.max(_entries.c.span_class)).where(in_collection, _entries.c.kind == kind).scalar_subquery()
+        for kind in KINDS))).one())
+
+    out = {"items": [], "events": [], "truncated": False}
+    if widest == (None, None):
+        return out
+    rows = db.session.execute(window_stmt(widest), {"cid": collection_id, "lo": lo, "hi": hi,
+                                                     "limit": limit + 1}).all()
+    if len(rows) > limit:
+        rows, out["truncated"] = rows[:limit], True
+
+    event_ids = [r.event_id for r in rows if r.kind == "event"]
+    events = {}
+    for i in range(0, len(event_ids), _BATCH):
+        for ev in (Event.query
+                   .options(load_only(Event.id, Event.name, Event.start_date, Event.end_date, Event.images),
+                            selectinload(Event.tags))
+                   .filter(Event.id.in_(event_ids[i:i + _BATCH]))):
+            events[ev.id] = ev
+    for r in rows:
+        if r.kind == "item":
+            out["items"].append(r.data)
+        elif r.event_id in events:
+            ev = events[r.event_id]
+            out["events"].append({
+                "id": ev.id,
+                "name": ev.name,
+                "startDate": ev.start_date.isoformat(),
+                "endDate": ev.end_date.isoformat() if ev.end_date else None,
+                "coverUrl": (ev.images or [None])[0],
+                "tags": [t.to_dict() for t in ev.tags],
+            })
+    return out
+
+
+# ---------- Hooks -----------------------------------------------------------
+
+def span_stmt(event_id, start, end):
+    """Bornes de la ligne de l'événement et des éléments qui le placent."""
+    return update(_entries).where(_entries.c.event_id == event_id).values(**_span(start, end))
+
+
+def _span(start, end):
+    return dict(zip(("start_ord", "end_ord", "span_class"), ordinals(start, end)))
+
+
+def _set_span(conn, event_id, collection_id, start, end, new):
+    done = conn.execute(span_stmt(event_id, start, end)).rowcount
+    if new or not done:
+        conn.execute(insert(_entries).values(collection_id=collection_id, kind="event", event_id=event_id,
+                                             **_span(start, end)))
+
+
+def _before_flush(session, flush_context, instances):
+    """Collection ou événement supprimé : ses lignes de frise avec lui (éléments gardés, sans bornes)."""
+    conn = None
+    for obj in session.deleted:
+        if isinstance(obj, (Collection, Event)):
+            conn = conn or session.connection()
+        if isinstance(obj, Collection):
+            conn.execute(delete(_entries).where(_entries.c.collection_id == obj.id))
+        elif isinstance(obj, Event):
+            conn.execute(delete(_entries).where(_entries.c.event_id == obj.id, _entries.c.kind == "event"))
+            conn.execute(update(_entries).where(_entries.c.event_id == obj.id)
+                         .values(start_ord=None, end_ord=None, span_class=None))
+
+
+def _after_flush(session, flush_context):
+    """Événement créé ou redaté : bornes de sa ligne et des éléments qui le placent."""
+    conn = None
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Event):
+            continue
+        new = obj in session.new
+        if not new:
+            state = inspect(obj)
+            if not any(state.attrs[a].history.has_changes() for a in ("start_date", "end_date")):
+                continue
+        conn = conn or session.connection()
+        _set_span(conn, obj.id, obj.collection_id, obj.start_date, obj.end_date, new)
+
+
+def rebuild_all() -> int:
+    conn = db.session.connection()
+    ids = list(conn.execute(select(Collection.id)).scalars())
+    for collection_id in ids:
+        rebuild(conn, collection_id)
+    db.session.commit()
+    return len(ids)
+
+
+def init_app(app):
+    if not event.contains(db.session, "before_flush", _before_flush):
+        event.listen(db.session, "before_flush", _before_flush)
+    if not event.contains(db.session, "after_flush", _after_flush):
+        event.listen(db.session, "after_flush", _after_flush)
+
+    @app.cli.command("timeline-reindex")
+    def timeline_reindex_command():
+        """Reconstruit les bornes des frises et l'index des événements."""
+        print(f"{rebuild_all()} collection(s) réindexée(s)")
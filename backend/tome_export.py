@@ -0,0 +1,264 @@
+# backend/tome_export.py
+"""Export PDF d'un tome.
+
+Le HTML est écrit chapitre par chapitre dans un fichier temporaire (jamais
+le tome entier en mémoire) ; le nettoyage (_cleanup_html) est mis en cache
+par hash de contenu, en mémoire (EXPORT_HTML_CACHE_BUDGET octets, LRU).
+
+Le PDF rendu est gardé sur disque (EXPORT_DIR, par défaut instance/exports),
+un fichier par tome, nommé par une clé calculée à partir des versions des
+chapitres : tant qu'aucun chapitre ne change, les téléchargements suivants
+servent ce fichier.
+"""
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from threading import RLock
+from flask import current_app
+from markupsafe import escape
+from sqlalchemy import func
+from .database import db
+from .models import Tome, Chapter, ChapterOp, ChapterStats
+from .chapter_ops import materialize
+from .text_stats import content_hash
+
+DEFAULT_HTML_CACHE_BUDGET = 64 * 1024 * 1024
+
+# à incrémenter quand le gabarit ou le nettoyage change (invalide les caches)
+RENDER_VERSION = "1"
+
+STREAM_BATCH = 20
+
+
+class ExportError(Exception):
+    def __init__(self, details: dict):
+        super().__init__("PDF export failed")
+        self.details = details
+
+
+def _cleanup_html(html: str) -> str:
+    """Retire les marqueurs internes (liens d'app, data-*) pour un export propre."""
+    try:
+        from bs4 import BeautifulSoup  # pip install beautifulsoup4 (facultatif)
+        soup = BeautifulSoup(html or "", "html.parser")
+        # unwrap des liens internes
+        for a in soup.find_all("a", attrs={"data-app-link": True}):
+            a.unwrap()
+        # retire quelques data-* (adapte si besoin)
+        for el in soup.find_all(attrs={"data-entity": True}):
+            del el["data-entity"]
+        return str(soup)
+    except Exception:
+        return html or ""
+
+
+# ---------- Cache du HTML nettoyé -------------------------------------------
+
+_lock = RLock()
+_html_cache: "OrderedDict[str, str]" = OrderedDict()
+_html_cache_size = 0
+
+
+def cleaned_html(html: str) -> str:
+    """_cleanup_html mis en cache par hash du contenu."""
+    global _html_cache_size
+    key = content_hash(html)
+    with _lock:
+        cached = _html_cache.get(key)
+        if cached is not None:
+            _html_cache.move_to_end(key)
+            return cached
+    cleaned = _cleanup_html(html)
+    budget = current_app.config.get("EXPORT_HTML_CACHE_BUDGET", DEFAULT_HTML_CACHE_BUDGET)
+    with _lock:
+        if key not in _html_cache:
+            _html_cache[key] = cleaned
+            _html_cache_size += 2 * len(cleaned)
+            while _html_cache_size > budget and len(_html_cache) > 1:
+                _k, old = _html_cache.popitem(last=False)
+                _html_cache_size -= 2 * len(old)
+    return cleaned
+
+
+# ---------- HTML du tome ----------------------------------------------------
+
+_HEAD = """<!doctype html>
+<html lang="fr">
+<head>
+<meta charset="utf-8"/>
+<title>{title}</title>
+<meta name="viewport" content="width=device-width, initial-scale=1"/>
+<style>
+  @page {{ margin: 20mm; }}
+  body {{
+    font-family: system-ui, -apple-system, Segoe UI, Roboto, Arial, sans-serif;
+    line-height: 1.6; color: #111;
+  }}
+  .container {{ max-width: 800px; margin: 0 auto; padding: 24px; }}
+  header h1 {{ font-size: 2rem; margin: 0 0 8px; }}
+  .toc {{ margin: 16px 0 32px; }}
+  .toc h2 {{ font-size: 1.1rem; margin: 0 0 8px; }}
+  .toc ul {{ margin: 0; padding-left: 20px; }}
+  .chapter h1 {{ font-size: 1.6rem; margin: 24px 0 12px; }}
+  .chapter:not(.first) {{ page-break-before: always; }}
+  .chapter-content img {{ max-width: 100%; height: auto; }}
+</style>
+</head>
+<body>
+  <div class="container">
+    <header><h1>{title}</h1></header>
+"""
+
+_FOOT = """  </div>
+</body>
+</html>"""
+
+
+def _ordered(q):
+    return q.order_by(Chapter.rank.asc(), Chapter.created_at.asc())
+
+
+def _pending_chapter_ids(tome_id):
+    """Chapitres dont des ops ne sont pas encore compactées dans `content`."""
+    return {cid for (cid,) in (
+        db.session.query(ChapterOp.chapter_id)
+        .join(Chapter, Chapter.id == ChapterOp.chapter_id)
+        .filter(Chapter.tome_id == tome_id, ChapterOp.seq > Chapter.ops_seq)
+        .distinct()
+    )}
+
+
+def write_tome_html(tome: Tome, out, progress=None):
+    """Écrit le HTML complet du tome dans `out` (fichier texte), chapitre par chapitre.
+
+    Le contenu est lu par lots de STREAM_BATCH chapitres (requêtes entièrement
+    consommées : aucun curseur ouvert entre deux lots). `progress(done, total)`
+    est appelé après chaque lot si fourni.
+    """
+    title = escape(tome.name)
+    out.write(_HEAD.format(title=title))
+
+    toc = _ordered(db.session.query(Chapter.id, Chapter.title).filter(Chapter.tome_id == tome.id)).all()
+    out.write('    <nav class="toc">\n      <h2>Sommaire</h2>\n      <ul>')
+    for ch_id, ch_title in toc:
+        out.write(f'<li><a href="#ch-{ch_id}">{escape(ch_title)}</a></li>')
+    out.write("</ul>\n    </nav>\n")
+
+    pending = _pending_chapter_ids(tome.id)
+    for start in range(0, len(toc), STREAM_BATCH):
+        batch = toc[start:start + STREAM_BATCH]
+        contents = dict(
+            db.session.query(Chapter.id, Chapter.content)
+            .filter(Chapter.id.in_([ch_id for ch_id, _t in batch]))
+            .all()
+        )
+        for i, (ch_id, ch_title) in enumerate(batch, start=start):
+            content = contents.get(ch_id)
+            if content is None:
+                continue  # supprimé entre-temps
+            if ch_id in pending:
+                content = materialize(db.session.get(Chapter, ch_id))[0]
+            out.write(f"""
+          <section class="chapter{' first' if i == 0 else ''}">
+            <h1 id="ch-{ch_id}">{escape(ch_title)}</h1>
+            <div class="chapter-content">
+              {cleaned_html(content)}
+            </div>
+          </section>
+        """)
+        if progress is not None:
+            progress(start + len(batch), len(toc))
+    out.write(_FOOT)
+
+
+# ---------- PDF ------------------------------------------------------------
+
+def pdf_cache_key(tome: Tome) -> str:
+    """Hash des versions des chapitres du tome (titre, contenu, ops en attente).
+
+    La version du contenu est le hash de chapter_stats (tenu à jour à chaque
+    snapshot) ou, à défaut, la date de modification.
+    """
+    last_op = (
+        db.session.query(ChapterOp.chapter_id, func.max(ChapterOp.seq).label("seq"))
+        .group_by(ChapterOp.chapter_id)
+        .subquery()
+    )
+    rows = _ordered(
+        db.session.query(
+            Chapter.id, Chapter.title,
+            ChapterStats.content_hash, Chapter.updated_at, Chapter.created_at,
+            Chapter.ops_seq, last_op.c.seq,
+        )
+        .outerjoin(ChapterStats, ChapterStats.chapter_id == Chapter.id)
+        .outerjoin(last_op, last_op.c.chapter_id == Chapter.id)
+        .filter(Chapter.tome_id == tome.id)
+    )
+    h = hashlib.sha1(f"{RENDER_VERSION}\0{tome.name}".encode("utf-8"))
+    for ch_id, title, chash, updated, created, ops_seq, last_seq in rows:
+        version = chash or (updated or created).isoformat()
+        h.update(f"\0{ch_id}\0{title}\0{version}\0{max(ops_seq or 0, last_seq or 0)}".encode("utf-8"))
+    return h.hexdigest()
+
+
+def export_dir() -> str:
+    path = current_app.config.get("EXPORT_DIR") or os.path.join(current_app.instance_path, "exports")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _render(html_path: str, pdf_path: str):
+    try:
+        from weasyprint import HTML  # pip install weasyprint (lib Cairo/Pango requises)
+        HTML(filename=html_path, base_url=os.path.dirname(html_path)).write_pdf(target=pdf_path)
+        return
+    except Exception as e:
+        # --- Fallback wkhtmltopdf (si installé) ---
+        try:
+            import pdfkit  # pip install pdfkit  (+ wkhtmltopdf côté OS)
+            pdfkit.from_file(html_path, pdf_path, options={"enable-local-file-access": ""})
+        except Exception as e2:
+            raise ExportError({"weasyprint": str(e), "wkhtmltopdf": str(e2)})
+
+
+def cached_tome_pdf(tome: Tome, key: str = None):
+    """Chemin du PDF en cache pour les versions actuelles du tome, ou None."""
+    path = os.path.join(export_dir(), f"tome-{tome.id}-{key or pdf_cache_key(tome)}.pdf")
+    return path if os.path.exists(path) else None
+
+
+def tome_pdf(tome: Tome, progress=None) -> str:
+    """Chemin du PDF du tome, rendu seulement si aucune version en cache ne correspond.
+
+    `progress(fraction)` : écriture du HTML jusqu'à 30 %, puis rendu.
+    """
+    key = pdf_cache_key(tome)
+    directory = export_dir()
+    path = os.path.join(directory, f"tome-{tome.id}-{key}.pdf")
+    if os.path.exists(path):
+        return path
+
+    fd, html_path = tempfile.mkstemp(suffix=".html", dir=directory)
+    tmp_pdf = f"{html_path}.pdf"
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as out:
+            write_tome_html(tome, out, progress and (lambda done, total: progress(0.3 * done / total)))
+        if progress is not None:
+            progress(0.3)
+        _render(html_path, tmp_pdf)
+        os.replace(tmp_pdf, path)
+    finally:
+        for p in (html_path, tmp_pdf):
+            if os.path.exists(p):
+                os.remove(p)
+
+    # un seul PDF par tome : les versions précédentes sont obsolètes
+    prefix = f"tome-{tome.id}-"
+    for name in os.listdir(directory):
+        if name.startswith(prefix) and name != os.path.basename(path):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+    return path
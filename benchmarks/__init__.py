@@ -0,0 +1 @@
+"""Benchmarks du backend (à lancer depuis la racine du repo : python -m benchmarks.<nom>)."""
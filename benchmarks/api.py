@@ -0,0 +1,356 @@
+"""Latence des routes chaudes de l'API sur un projet synthétique.
+
+Crée une base neuve (dossier temporaire), la remplit (benchmarks.seed), puis
+rejoue chaque scénario via le client de test Flask (ou un serveur WSGI local
+avec --wsgi) : p50 / p95 / p99 en ms et nombre de requêtes SQL par appel.
+Les résultats sont écrits en JSON (benchmarks/results/ par défaut) ;
+--compare affiche l'écart avec un run précédent.
+
+    python -m benchmarks.api --size medium --iterations 200
+    python -m benchmarks.api --compare benchmarks/results/api-20261017-120000.json
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import logging
+import math
+import os
+import platform
+import sqlite3
+import subprocess
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+from sqlalchemy import event
+
+from backend.app import create_app
+from backend.database import db
+from backend.models import Tome
+from backend.tome_export import write_tome_html
+from .seed import SIZES, seed_project
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+# ---------- Clients ---------------------------------------------------------
+
+class _HttpResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self._body = body
+
+    def get_json(self):
+        return json.loads(self._body) if self._body else None
+
+
+class HttpClient:
+    """Même interface (open / get_json) que le client de test, sur un vrai serveur HTTP."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def open(self, path, method="GET", json=None):
+        data = None if json is None else _dumps(json)
+        req = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                     headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(req) as res:
+                return _HttpResponse(res.status, res.read())
+        except urllib.error.HTTPError as e:
+            return _HttpResponse(e.code, e.read())
+
+
+def _dumps(obj):
+    return json.dumps(obj).encode("utf-8")
+
+
+@contextlib.contextmanager
+def wsgi_client(app):
+    from werkzeug.serving import make_server
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)  # pas de ligne de log par requête
+    server = make_server("127.0.0.1", 0, app, threaded=False)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield HttpClient(f"http://127.0.0.1:{server.server_port}")
+    finally:
+        server.shutdown()
+
+
+# ---------- Scénarios -------------------------------------------------------
+#
+# Un scénario reçoit (client, données du seed, état mutable) et fait un appel ;
+# il retourne le code HTTP (les échecs sont comptés à part).
+
+SCENARIOS = {}
+
+
+def scenario(name):
+    def register(fn):
+        SCENARIOS[name] = fn
+        return fn
+    return register
+
+
+@scenario("autocomplete")
+def _autocomplete(client, data, state):
+    prefixes = state.setdefault("prefixes", itertools.cycle(["a", "ca", "le", "ser", "tri", "z", "dra"]))
+    cid = data["collectionIds"][0]
+    return client.open(f"/api/collections/{cid}/autocomplete?q={next(prefixes)}").status_code
+
+
+def _list(kind):
+    def run(client, data, state):
+        cid = data["collectionIds"][0]
+        return client.open(f"/api/collections/{cid}/{kind}?limit=50").status_code
+    return run
+
+
+for _kind in ("characters", "places", "items", "events", "tags"):
+    scenario(f"list {_kind}")(_list(_kind))
+
+
+@scenario("list chapters")
+def _chapters(client, data, state):
+    return client.open(f"/api/tomes/{data['tomeIds'][0]}/chapters").status_code
+
+
+@scenario("project tree")
+def _tree(client, data, state):
+    return client.open(f"/api/projects/{data['projectId']}/tree").status_code
+
+
+@scenario("get board")
+def _board(client, data, state):
+    return client.open(f"/api/projects/{data['projectId']}/board").status_code
+
+
+@scenario("get map")
+def _map(client, data, state):
+    return client.open(f"/api/projects/{data['projectId']}/game-design/{data['mapComponentId']}").status_code
+
+
+@scenario("pan map (viewport)")
+def _map_region(client, data, state):
+    # viewport 1920x1080 qui balaie la carte (découpée au premier appel)
+    x = state["x"] = (state.get("x", -1920) + 1920) % 20000
+    return client.open(f"/api/projects/{data['projectId']}/game-design/{data['mapComponentId']}"
+                       f"/map/region?x0={x}&y0=8000&x1={x + 1920}&y1=9080").status_code
+
+
+@scenario("load timeline (full)")
+def _timeline_full(client, data, state):
+    return client.open(f"/api/collections/{data['collectionIds'][0]}/timeline").status_code
+
+
+@scenario("timeline window (10 years)")
+def _timeline_window(client, data, state):
+    # fenêtre de 10 ans qui balaie les 300 ans de la frise
+    year = state["year"] = 1200 + (state.get("year", 1190) - 1200 + 10) % 300
+    return client.open(f"/api/collections/{data['collectionIds'][0]}/timeline/items"
+                       f"?from={year}&to={year + 9}").status_code
+
+
+@scenario("timeline density (zoomed out)")
+def _timeline_density(client, data, state):
+    # toute la frise (300 ans) : buckets annuels
+    return client.open(f"/api/collections/{data['collectionIds'][0]}/timeline/density"
+                       f"?from=1200&to=1499").status_code
+
+
+@scenario("save chapter (ops)")
+def _save_ops(client, data, state):
+    chapter_id = data["chapterIds"][0]
+    if "version" not in state:
+        state["version"] = client.open(f"/api/chapters/{chapter_id}").get_json()["version"]
+    res = client.open(f"/api/chapters/{chapter_id}/ops", method="PATCH", json={
+        "baseVersion": state["version"],
+        "content": [{"at": 0, "delete": 0, "insert": "x"}],
+    })
+    if res.status_code in (200, 409):
+        state["version"] = res.get_json()["version"]
+    return res.status_code
+
+
+@scenario("save chapter (put)")
+def _save_put(client, data, state):
+    chapter_id = data["chapterIds"][1]
+    n = state["n"] = state.get("n", 0) + 1
+    return client.open(f"/api/chapters/{chapter_id}", method="PUT", json={
+        "content": f"<p>Révision {n}</p>" + "<p>Il était une fois.</p>" * 50,
+    }).status_code
+
+
+@scenario("move chapter")
+def _move_chapter(client, data, state):
+    chapter_id = data["chapterIds"][0]
+    n = data["sizes"]["chapters"]
+    state["to"] = n if state.get("to", 1) == 1 else 1
+    return client.open(f"/api/chapters/{chapter_id}/move", method="PUT",
+                       json={"toPosition": state["to"]}).status_code
+
+
+@scenario("move ticket")
+def _move_ticket(client, data, state):
+    ticket_id = data["ticketIds"][0]
+    columns = data["columnIds"]
+    state["col"] = (state.get("col", 0) + 1) % len(columns)
+    return client.open(f"/api/projects/{data['projectId']}/board/tickets/{ticket_id}/move", method="PUT",
+                       json={"columnId": columns[state["col"]], "position": 0}).status_code
+
+
+@scenario("export tome (html)")
+def _export(client, data, state):
+    # le rendu PDF (WeasyPrint, job de fond) n'est pas mesuré : seulement la génération du HTML
+    app = state["app"]
+    with app.app_context():
+        write_tome_html(db.session.get(Tome, data["tomeIds"][0]), io.StringIO())
+        db.session.remove()
+    return 200
+
+
+# ---------- Mesure ----------------------------------------------------------
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *_args):
+        self.count += 1
+
+
+def percentile(sorted_values, p):
+    """Percentile au rang le plus proche (valeurs déjà triées)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def measure(fn, client, data, state, counter, iterations, warmup):
+    for _ in range(warmup):
+        fn(client, data, state)
+    latencies, queries, errors = [], [], 0
+    for _ in range(iterations):
+        counter.count = 0
+        t0 = time.perf_counter()
+        status = fn(client, data, state)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        queries.append(counter.count)
+        errors += status >= 400
+    latencies.sort()
+    return {
+        "iterations": iterations,
+        "errors": errors,
+        "p50Ms": round(percentile(latencies, 50), 3),
+        "p95Ms": round(percentile(latencies, 95), 3),
+        "p99Ms": round(percentile(latencies, 99), 3),
+        "meanMs": round(sum(latencies) / len(latencies), 3),
+        "queriesPerRequest": round(sum(queries) / len(queries), 2),
+        "maxQueries": max(queries),
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(size="medium", iterations=100, warmup=5, only=None, wsgi=False, sizes=None):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'bench.sqlite')}",
+            "EXPORT_DIR": tmp,
+        })
+        with app.app_context():
+            db.create_all()
+            t0 = time.perf_counter()
+            data = seed_project(size, **(sizes or {}))
+            seed_seconds = time.perf_counter() - t0
+            counter = QueryCounter(db.engine)
+
+        results = {}
+        with (wsgi_client(app) if wsgi else contextlib.nullcontext(app.test_client())) as client:
+            for name, fn in SCENARIOS.items():
+                if only and name not in only:
+                    continue
+                results[name] = measure(fn, client, data, {"app": app}, counter, iterations, warmup)
+        with app.app_context():
+            db.engine.dispose()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "revision": _git_revision(),
+            "size": size,
+            "sizes": data["sizes"],
+            "chapters": len(data["chapterIds"]),
+            "tickets": len(data["ticketIds"]),
+            "seedSeconds": round(seed_seconds, 2),
+            "client": "wsgi" if wsgi else "test_client",
+            "iterations": iterations,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+        },
+        "results": results,
+    }
+
+
+def print_report(report, previous=None):
+    meta = report["meta"]
+    print(f"{meta['size']} : {meta['chapters']} chapitres, {meta['tickets']} tickets "
+          f"(seed {meta['seedSeconds']} s), {meta['iterations']} appels / scénario, {meta['client']}")
+    print(f"{'scénario':<22}{'p50':>9}{'p95':>9}{'p99':>9}{'req SQL':>9}{'err':>5}"
+          + (f"{'Δ p95':>10}" if previous else ""))
+    for name, r in report["results"].items():
+        line = (f"{name:<22}{r['p50Ms']:>9.2f}{r['p95Ms']:>9.2f}{r['p99Ms']:>9.2f}"
+                f"{r['queriesPerRequest']:>9.1f}{r['errors']:>5}")
+        before = (previous or {}).get("results", {}).get(name)
+        if before and before["p95Ms"]:
+            line += f"{(r['p95Ms'] / before['p95Ms'] - 1) * 100:>+9.1f}%"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", choices=SIZES, default="medium")
+    for key in SIZES["medium"]:
+        parser.add_argument(f"--{key}", type=int, help=f"surcharge la taille ({key})")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--only", action="append", choices=SCENARIOS, help="scénario (répétable)")
+    parser.add_argument("--wsgi", action="store_true", help="serveur WSGI local au lieu du client de test")
+    parser.add_argument("--output", help="fichier JSON (défaut : benchmarks/results/api-<date>.json)")
+    parser.add_argument("--compare", help="JSON d'un run précédent")
+    args = parser.parse_args(argv)
+
+    sizes = {key: getattr(args, key) for key in SIZES["medium"]}
+    report = run(args.size, args.iterations, args.warmup, args.only, args.wsgi, sizes)
+
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+    print_report(report, previous)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"api-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"résultats : {output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
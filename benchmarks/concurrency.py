@@ -0,0 +1,156 @@
+"""Concurrence SQLite : N rédacteurs en autosave pendant que M lecteurs listent des fiches.
+
+Compare la configuration SQLAlchemy / SQLite par défaut (journal rollback,
+synchronous=FULL) à la configuration de backend.database (WAL, synchronous=NORMAL,
+mmap, cache, pool). Chaque mode tourne sur une base neuve dans un dossier temporaire.
+
+    python -m benchmarks.concurrency --writers 8 --readers 8 --seconds 10
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from backend.app import create_app
+from backend.database import db
+
+# ce que donnent SQLAlchemy + sqlite3 sans configuration (timeout sqlite3 : 5 s)
+BASELINE_PRAGMAS = {
+    "journal_mode": "DELETE",
+    "synchronous": "FULL",
+    "mmap_size": 0,
+    "cache_size": -2000,
+    "busy_timeout": 5000,
+    "temp_store": "DEFAULT",
+}
+
+MODES = {
+    "default": {"SQLITE_PRAGMAS": BASELINE_PRAGMAS, "DB_POOL_SIZE": 5, "DB_MAX_OVERFLOW": 10},
+    "tuned": {},
+}
+
+
+def _seed(client, writers, characters):
+    project = client.post("/api/projects", json={"name": "bench"}).get_json()
+    collection = client.post(f"/api/projects/{project['id']}/collections", json={"name": "c"}).get_json()
+    saga = client.post(f"/api/collections/{collection['id']}/sagas", json={"name": "s"}).get_json()
+    tome = client.post(f"/api/sagas/{saga['id']}/tomes", json={"name": "t"}).get_json()
+    chapters = [
+        client.post(f"/api/tomes/{tome['id']}/chapters",
+                    json={"title": f"Chapitre {i}", "content": "<p>Il était une fois</p>" * 200}).get_json()
+        for i in range(writers)
+    ]
+    for i in range(characters):
+        client.post(f"/api/collections/{collection['id']}/characters",
+                    json={"firstname": f"Prénom{i}", "lastname": f"Nom{i % 37}"})
+    return collection["id"], [c["id"] for c in chapters]
+
+
+def _writer(app, chapter_id, stop, stats):
+    client = app.test_client()
+    version = client.get(f"/api/chapters/{chapter_id}").get_json()["version"]
+    at = 0
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        res = client.patch(f"/api/chapters/{chapter_id}/ops", json={
+            "baseVersion": version,
+            "content": [{"at": at, "delete": 0, "insert": "x"}],
+        })
+        stats.record("write", res.status_code, time.perf_counter() - t0)
+        if res.status_code == 200:
+            version = res.get_json()["version"]
+            at += 1
+        elif res.status_code == 409:
+            version = res.get_json()["version"]
+
+
+def _reader(app, collection_id, stop, stats):
+    client = app.test_client()
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        res = client.get(f"/api/collections/{collection_id}/characters?limit=50")
+        stats.record("read", res.status_code, time.perf_counter() - t0)
+
+
+class _Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ok = {"read": 0, "write": 0}
+        self.errors = {"read": 0, "write": 0}
+        self.latency = {"read": [], "write": []}
+
+    def record(self, kind, status, elapsed):
+        with self.lock:
+            if status < 400:
+                self.ok[kind] += 1
+                self.latency[kind].append(elapsed)
+            else:
+                self.errors[kind] += 1
+
+
+def _p95(values):
+    values = sorted(values)
+    return values[int(0.95 * (len(values) - 1))] * 1000 if values else 0.0
+
+
+def run_mode(mode, writers, readers, seconds, characters):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'bench.sqlite')}",
+            "EXPORT_DIR": tmp,
+            **MODES[mode],
+        })
+        with app.app_context():
+            db.create_all()
+        collection_id, chapter_ids = _seed(app.test_client(), writers, characters)
+
+        stats, stop = _Stats(), threading.Event()
+        threads = [threading.Thread(target=_writer, args=(app, cid, stop, stats)) for cid in chapter_ids]
+        threads += [threading.Thread(target=_reader, args=(app, collection_id, stop, stats))
+                    for _ in range(readers)]
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        with app.app_context():
+            db.engine.dispose()
+    return {
+        kind: {
+            "perSecond": stats.ok[kind] / seconds,
+            "errors": stats.errors[kind],
+            "p95Ms": _p95(stats.latency[kind]),
+        }
+        for kind in ("write", "read")
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--characters", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    results = {}
+    for mode in MODES:
+        results[mode] = run_mode(mode, args.writers, args.readers, args.seconds, args.characters)
+
+    print(f"{args.writers} rédacteurs, {args.readers} lecteurs, {args.seconds:g} s par mode")
+    print(f"{'mode':<10}{'écritures/s':>13}{'p95 (ms)':>10}{'err':>6}{'lectures/s':>13}{'p95 (ms)':>10}{'err':>6}")
+    for mode, r in results.items():
+        w, rd = r["write"], r["read"]
+        print(f"{mode:<10}{w['perSecond']:>13.1f}{w['p95Ms']:>10.1f}{w['errors']:>6}"
+              f"{rd['perSecond']:>13.1f}{rd['p95Ms']:>10.1f}{rd['errors']:>6}")
+    base, tuned = results["default"], results["tuned"]
+    for kind in ("write", "read"):
+        if base[kind]["perSecond"]:
+            print(f"gain {kind}: x{tuned[kind]['perSecond'] / base[kind]['perSecond']:.2f}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
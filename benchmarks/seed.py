@@ -0,0 +1,166 @@
+"""Projet synthétique pour les benchmarks, créé directement via les modèles.
+
+Taille réglable : `SIZES` (small / medium / large) ou valeurs individuelles.
+Contenu déterministe (graine fixe) : deux runs de même taille sont comparables.
+"""
+import random
+import uuid
+from datetime import date, timedelta
+
+from backend.database import db
+from backend.lexorank import key_for_index
+from backend.timeline_index import save as save_timeline
+from backend.models import (
+    Project, Collection, Saga, Tome, Chapter, Character, Place, Item, Event, Tag, CollectionTimeline,
+    ProjectMember, TicketBoard, GameDesignComponentModel, TicketColumn, Ticket, TicketTag, TicketChecklistItem, TicketAssignee,
+)
+
+SIZES = {
+    # collections, sagas/collection, tomes/saga, chapitres/tome, fiches de chaque type/collection,
+    # tags/collection, colonnes, tickets/colonne, membres, salles de la carte (map-editor)
+    "small": dict(collections=1, sagas=2, tomes=2, chapters=10, entities=200, tags=20,
+                  columns=3, tickets=100, members=5, rooms=500),
+    "medium": dict(collections=2, sagas=3, tomes=3, chapters=25, entities=1000, tags=50,
+                   columns=4, tickets=200, members=20, rooms=2000),
+    "large": dict(collections=3, sagas=4, tomes=5, chapters=50, entities=3000, tags=100,
+                  columns=5, tickets=500, members=40, rooms=8000),
+}
+
+WORDS = (
+    "le la les un une des et mais donc or ni car il elle ils nuit jour épée château forêt roi reine "
+    "mer vent ombre lumière chemin village dragon lettre secret souvenir porte pierre feu rivière "
+    "regard silence voix main cœur temps guerre paix nord sud hiver printemps étoile lune soleil"
+).split()
+
+NAMES = (
+    "Alaric Brune Cassien Delphine Elouan Faustine Gaspard Héloïse Isaure Jorah Kélian Léonie "
+    "Maël Nérée Oriane Perceval Quitterie Roch Séraphine Tristan Ursule Victor Wendeline Yseult Zéphyr"
+).split()
+
+BATCH = 500
+
+
+def _text(rng, paragraphs, words):
+    return "".join(
+        "<p>" + " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + ".</p>"
+        for _ in range(paragraphs)
+    )
+
+
+def _flush(objects):
+    db.session.add_all(objects)
+    db.session.flush()
+    objects.clear()
+
+
+def _map_state(rng, rooms):
+    """État du map-editor (cf. src/types/gameDesign.ts) : zones ▸ étages, salles et stickers."""
+    zones = [{"id": str(uuid.uuid4()), "name": f"Zone {z + 1}",
+              "layers": [{"index": i, "name": f"{i + 1}F", "visible": True} for i in range(3)]}
+             for z in range(max(1, rooms // 200))]
+    colors = ("#f87171", "#60a5fa", "#34d399", "#fbbf24", "#a78bfa")
+    out = {"zones": zones, "rooms": [], "stickers": [], "roomBank": [],
+           "activeZoneId": zones[0]["id"], "activeLayerIndex": 0, "mode": "edit", "tool": "select",
+           "camera": {"x": 0, "y": 0, "zoom": 1}}
+    for i in range(rooms):
+        zone = rng.choice(zones)
+        x, y = rng.randint(0, 20000), rng.randint(0, 20000)
+        room = {"id": str(uuid.uuid4()), "name": f"Salle {i + 1}", "type": "rect", "x": x, "y": y,
+                "w": rng.randint(40, 400), "h": rng.randint(40, 400), "color": rng.choice(colors),
+                "zoneId": zone["id"], "layerIndex": rng.randint(0, 2)}
+        if i % 5 == 0:
+            room["type"] = "poly"
+            room["points"] = [{"x": x + rng.randint(0, 300), "y": y + rng.randint(0, 300)} for _ in range(6)]
+        out["rooms"].append(room)
+        out["stickers"].append({"id": str(uuid.uuid4()), "x": x + 10, "y": y + 10,
+                                "tag": rng.choice(("key-item", "door", "save-point", "enemy", "npc")),
+                                "label": rng.choice(WORDS), "zoneId": zone["id"],
+                                "layerIndex": room["layerIndex"]})
+    return out
+
+
+def seed_project(size="medium", seed=42, **overrides) -> dict:
+    """Crée un projet complet et retourne les ids utiles aux scénarios (commit inclus)."""
+    sizes = {**SIZES[size], **{k: v for k, v in overrides.items() if v is not None}}
+    rng = random.Random(seed)
+    pending = []
+
+    project = Project(name=f"Benchmark {size}")
+    db.session.add(project)
+    db.session.flush()
+
+    out = {"sizes": sizes, "projectId": project.id, "collectionIds": [], "tomeIds": [],
+           "chapterIds": [], "columnIds": [], "ticketIds": [], "mapComponentId": None}
+    for c in range(sizes["collections"]):
+        collection = Collection(id=str(uuid.uuid4()), name=f"Collection {c + 1}", project_id=project.id)
+        pending.append(collection)
+        out["collectionIds"].append(collection.id)
+        for s in range(sizes["sagas"]):
+            saga = Saga(id=str(uuid.uuid4()), name=f"Saga {s + 1}", collection_id=collection.id)
+            pending.append(saga)
+            for t in range(sizes["tomes"]):
+                tome = Tome(id=str(uuid.uuid4()), name=f"Tome {t + 1}", saga_id=saga.id)
+                pending.append(tome)
+                out["tomeIds"].append(tome.id)
+                for n in range(sizes["chapters"]):
+                    chapter = Chapter(id=str(uuid.uuid4()), title=f"Chapitre {n + 1}", tome_id=tome.id,
+                                      rank=key_for_index(n), content=_text(rng, rng.randint(10, 30), 60))
+                    pending.append(chapter)
+                    out["chapterIds"].append(chapter.id)
+                    if len(pending) >= BATCH:
+                        _flush(pending)
+
+        tags = [Tag(id=str(uuid.uuid4()), collection_id=collection.id, name=f"tag-{i}",
+                    scope=("character", "place", "item", "event")[i % 4]) for i in range(sizes["tags"])]
+        pending.extend(tags)
+        start = date(1200, 1, 1)
+        event_ids = []
+        for i in range(sizes["entities"]):
+            pending.append(Character(firstname=rng.choice(NAMES), lastname=f"{rng.choice(NAMES)}{i}",
+                                     collection_id=collection.id, content={}))
+            pending.append(Place(name=f"{rng.choice(WORDS).capitalize()} {i}", collection_id=collection.id))
+            pending.append(Item(name=f"{rng.choice(WORDS).capitalize()} {i}", collection_id=collection.id))
+            begin = start + timedelta(days=rng.randint(0, 365 * 300))
+            event = Event(id=str(uuid.uuid4()), name=f"Événement {i}", collection_id=collection.id,
+                          start_date=begin, end_date=begin + timedelta(days=rng.choice((0, 3, 30, 365 * 5))))
+            pending.append(event)
+            event_ids.append(event.id)
+            if len(pending) >= BATCH:
+                _flush(pending)
+        _flush(pending)
+        # frise : un élément par événement
+        timeline = CollectionTimeline(collection_id=collection.id)
+        db.session.add(timeline)
+        save_timeline(timeline, {"version": 1, "options": {"title": "", "description": ""}, "items": [
+            {"id": str(uuid.uuid4()), "eventId": event_id, "lane": i % 4} for i, event_id in enumerate(event_ids)]})
+
+    members = [ProjectMember(id=str(uuid.uuid4()), project_id=project.id, name=rng.choice(NAMES))
+               for _ in range(sizes["members"])]
+    board = TicketBoard(id=str(uuid.uuid4()), project_id=project.id)
+    pending.extend(members + [board])
+    for col in range(sizes["columns"]):
+        column = TicketColumn(id=str(uuid.uuid4()), board_id=board.id, name=f"Colonne {col + 1}",
+                              rank=key_for_index(col))
+        pending.append(column)
+        out["columnIds"].append(column.id)
+        for pos in range(sizes["tickets"]):
+            ticket = Ticket(id=str(uuid.uuid4()), column_id=column.id, rank=key_for_index(pos),
+                            title=" ".join(rng.choice(WORDS) for _ in range(6)),
+                            description=_text(rng, 2, 30))
+            pending.append(ticket)
+            out["ticketIds"].append(ticket.id)
+            pending.append(TicketTag(ticket_id=ticket.id, name=rng.choice(WORDS)))
+            pending.extend(TicketChecklistItem(ticket_id=ticket.id, text=rng.choice(WORDS), position=i)
+                           for i in range(3))
+            if members:
+                pending.append(TicketAssignee(ticket_id=ticket.id, member_id=rng.choice(members).id))
+            if len(pending) >= BATCH:
+                _flush(pending)
+    if sizes["rooms"]:
+        component = GameDesignComponentModel(id=str(uuid.uuid4()), project_id=project.id,
+                                             component_type="map-editor", data=_map_state(rng, sizes["rooms"]))
+        pending.append(component)
+        out["mapComponentId"] = component.id
+    _flush(pending)
+    db.session.commit()
+    return out
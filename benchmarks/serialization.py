@@ -0,0 +1,136 @@
+"""Sérialisation JSON et octets envoyés pour les plus grosses réponses de l'API.
+
+Récupère chaque payload une fois (projet synthétique, benchmarks.seed), puis
+mesure sur le même objet Python :
+- le temps de sérialisation : fournisseur par défaut de Flask (clés triées,
+  \\uXXXX), json standard compact, orjson (s'il est installé) ;
+- la taille : JSON par défaut, JSON compact, puis gzip et brotli (s'il est
+  installé) aux réglages de backend.compression.
+
+    python -m benchmarks.serialization --size medium --iterations 50
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from flask.json.provider import DefaultJSONProvider
+
+from backend.app import create_app
+from backend.compression import brotli, compress
+from backend.database import db
+from backend.json_provider import orjson
+from .api import RESULTS_DIR, percentile
+from .seed import SIZES, seed_project
+
+ENDPOINTS = {
+    "chapter": lambda d: f"/api/chapters/{d['chapterIds'][0]}",
+    "tome": lambda d: f"/api/tomes/{d['tomeIds'][0]}",
+    "board": lambda d: f"/api/projects/{d['projectId']}/board",
+    "project tree (depth 4)": lambda d: f"/api/projects/{d['projectId']}/tree?depth=4",
+    "map": lambda d: f"/api/projects/{d['projectId']}/game-design/{d['mapComponentId']}",
+    "characters (200)": lambda d: f"/api/collections/{d['collectionIds'][0]}/characters?limit=200",
+}
+
+
+def _serializers(app):
+    flask_default = DefaultJSONProvider(app)
+    out = {
+        "flask default": flask_default.dumps,
+        "json compact": lambda o: json.dumps(o, ensure_ascii=False, separators=(",", ":")),
+    }
+    if orjson is not None:
+        out["orjson"] = lambda o: orjson.dumps(o).decode("utf-8")
+    return out
+
+
+def _median_ms(fn, obj, iterations):
+    times = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn(obj)
+        times.append((time.perf_counter() - t0) * 1000)
+    times.sort()
+    return round(percentile(times, 50), 3)
+
+
+def run(size="medium", iterations=50, sizes=None):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'bench.sqlite')}"})
+        with app.app_context():
+            db.create_all()
+            data = seed_project(size, **(sizes or {}))
+        client = app.test_client()
+        serializers = _serializers(app)
+
+        results = {}
+        for name, path in ENDPOINTS.items():
+            res = client.get(path(data), headers={"Accept-Encoding": "identity"})
+            if res.status_code != 200:
+                results[name] = {"error": res.status_code}
+                continue
+            obj = json.loads(res.get_data())
+            default_body = serializers["flask default"](obj).encode("utf-8")
+            compact_body = serializers["json compact"](obj).encode("utf-8")
+            result = {
+                "serializeMs": {label: _median_ms(fn, obj, iterations) for label, fn in serializers.items()},
+                "bytes": {"default": len(default_body), "compact": len(compact_body),
+                          "gzip": len(compress(compact_body, "gzip", app.config))},
+            }
+            if brotli is not None:
+                result["bytes"]["br"] = len(compress(compact_body, "br", app.config))
+            results[name] = result
+        with app.app_context():
+            db.engine.dispose()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "size": size,
+            "iterations": iterations,
+            "orjson": orjson is not None,
+            "brotli": brotli is not None,
+        },
+        "results": results,
+    }
+
+
+def print_report(report):
+    rows = report["results"]
+    labels = next((list(r["serializeMs"]) for r in rows.values() if "serializeMs" in r), [])
+    encodings = next((list(r["bytes"]) for r in rows.values() if "bytes" in r), [])
+    print(f"{'réponse':<24}" + "".join(f"{label + ' ms':>16}" for label in labels)
+          + "".join(f"{e + ' Ko':>12}" for e in encodings))
+    for name, r in rows.items():
+        if "error" in r:
+            print(f"{name:<24}HTTP {r['error']}")
+            continue
+        print(f"{name:<24}" + "".join(f"{r['serializeMs'][label]:>16.3f}" for label in labels)
+              + "".join(f"{r['bytes'][e] / 1024:>12.1f}" for e in encodings))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", choices=SIZES, default="medium")
+    for key in SIZES["medium"]:
+        parser.add_argument(f"--{key}", type=int, help=f"surcharge la taille ({key})")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--output", help="fichier JSON (défaut : benchmarks/results/serialization-<date>.json)")
+    args = parser.parse_args(argv)
+
+    report = run(args.size, args.iterations, {key: getattr(args, key) for key in SIZES["medium"]})
+    print_report(report)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"serialization-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"résultats : {output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""replace integer positions with lexorank keys (chapters, ticket columns, tickets)
+
+Revision ID: 4d1a7c9e2b58
+Revises: 6b3e9d1f4c72
+Create Date: 2026-10-18 09:12:40.318527
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d1a7c9e2b58'
+down_revision = '6b3e9d1f4c72'
+branch_labels = None
+depends_on = None
+
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+BASE = len(DIGITS)
+WIDTH = 6
+STEP = BASE ** 3
+
+# table -> (colonne du parent, ancien index, nouvel index, tri de l'ancien ordre, première position)
+_TABLES = {
+    'chapters': ('tome_id', 'ix_chapters_tome_position', 'ix_chapters_tome_rank', ('created_at',), 1),
+    'ticket_columns': ('board_id', 'ix_ticket_columns_board_position', 'ix_ticket_columns_board_rank',
+                       ('created_at',), 0),
+    'tickets': ('column_id', 'ix_tickets_column_position', 'ix_tickets_column_rank', ('created_at',), 0),
+}
+
+
+def _encode(value, width):
+    digits = []
+    for _ in range(width):
+        value, d = divmod(value, BASE)
+        digits.append(DIGITS[d])
+    return ''.join(reversed(digits)).rstrip('0')
+
+
+def _spread(n):
+    """Même répartition que backend.lexorank.spread."""
+    width = WIDTH
+    while BASE ** width // (n + 1) < BASE:
+        width += 1
+    step = min(STEP, BASE ** width // (n + 1)) if width == WIDTH else BASE ** width // (n + 1)
+    return [_encode((i + 1) * step, width) for i in range(n)]
+
+
+def _groups(bind, name, parent, order):
+    t = sa.table(name, sa.column('id'), sa.column(parent), *(sa.column(c) for c in order),
+                 sa.column('position'), sa.column('rank'))
+    rows = bind.execute(sa.select(t.c.id, t.c[parent])
+                        .order_by(t.c[parent], t.c.position, *(t.c[c] for c in order), t.c.id)).all()
+    groups = {}
+    for row_id, parent_id in rows:
+        groups.setdefault(parent_id, []).append(row_id)
+    return t, groups
+
+
+def upgrade():
+    bind = op.get_bind()
+    for name, (parent, old_index, new_index, order, _first) in _TABLES.items():
+        with op.batch_alter_table(name, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('rank', sa.String(length=64), nullable=True))
+
+        # ordre actuel (position, puis date de création) -> clés régulièrement espacées
+        t, groups = _groups(bind, name, parent, order)
+        for ids in groups.values():
+            bind.execute(sa.update(t).where(t.c.id == sa.bindparam('row_id')).values(rank=sa.bindparam('key')),
+                         [{'row_id': row_id, 'key': key} for row_id, key in zip(ids, _spread(len(ids)))])
+
+        with op.batch_alter_table(name, schema=None) as batch_op:
+            batch_op.alter_column('rank', existing_type=sa.String(length=64), nullable=False)
+            batch_op.drop_index(old_index)
+            batch_op.drop_column('position')
+            batch_op.create_index(new_index, [parent, 'rank', *order] if name == 'chapters' else [parent, 'rank'],
+                                  unique=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+    for name, (parent, old_index, new_index, order, first) in _TABLES.items():
+        with op.batch_alter_table(name, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('position', sa.Integer(), nullable=True))
+
+        t = sa.table(name, sa.column('id'), sa.column(parent), sa.column('rank'), sa.column('position'),
+                     *(sa.column(c) for c in order))
+        groups = {}
+        for row_id, parent_id in bind.execute(sa.select(t.c.id, t.c[parent])
+                                              .order_by(t.c[parent], t.c.rank, *(t.c[c] for c in order))):
+            groups.setdefault(parent_id, []).append(row_id)
+        for ids in groups.values():
+            bind.execute(sa.update(t).where(t.c.id == sa.bindparam('row_id')).values(position=sa.bindparam('pos')),
+                         [{'row_id': row_id, 'pos': i} for i, row_id in enumerate(ids, first)])
+
+        with op.batch_alter_table(name, schema=None) as batch_op:
+            if name != 'chapters':
+                batch_op.alter_column('position', existing_type=sa.Integer(), nullable=False)
+            batch_op.drop_index(new_index)
+            batch_op.drop_column('rank')
+            batch_op.create_index(old_index, [parent, 'position', *order] if name == 'chapters'
+                                  else [parent, 'position'], unique=False)
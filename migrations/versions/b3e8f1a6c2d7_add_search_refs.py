@@ -0,0 +1,44 @@
+"""add search_refs ((kind, ref_id) -> rowid of the FTS5 search index)
+
+Revision ID: b3e8f1a6c2d7
+Revises: 2f8b6d4e9a31
+Create Date: 2026-10-19 09:42:37.615204
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3e8f1a6c2d7'
+down_revision = '2f8b6d4e9a31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS search_refs (
+            id INTEGER PRIMARY KEY,
+            kind VARCHAR NOT NULL,
+            ref_id VARCHAR NOT NULL,
+            collection_id VARCHAR,
+            CONSTRAINT uq_search_refs_kind_ref UNIQUE (kind, ref_id)
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_search_refs_collection ON search_refs (collection_id)")
+
+    # rowids existants conservés ; doublons éventuels (kind, ref_id) retirés de l'index
+    op.execute("DELETE FROM search_refs")
+    op.execute("INSERT OR IGNORE INTO search_refs (id, kind, ref_id, collection_id) "
+               "SELECT rowid, kind, ref_id, collection_id FROM search_index ORDER BY rowid DESC")
+    op.execute("DELETE FROM search_index WHERE rowid NOT IN (SELECT id FROM search_refs)")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP INDEX IF EXISTS ix_search_refs_collection")
+    op.execute("DROP TABLE IF EXISTS search_refs")
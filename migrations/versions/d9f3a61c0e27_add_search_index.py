@@ -0,0 +1,100 @@
+"""add FTS5 search index
+
+Revision ID: d9f3a61c0e27
+Revises: c41d7e2a9b10
+Create Date: 2026-10-17 11:03:18.220741
+
+"""
+import html
+import json
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9f3a61c0e27'
+down_revision = 'c41d7e2a9b10'
+branch_labels = None
+depends_on = None
+
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def _strip(s):
+    return re.sub(r'\s+', ' ', html.unescape(_TAG_RE.sub(' ', s or ''))).strip()
+
+
+def _fields(content):
+    if not content:
+        return ''
+    if isinstance(content, str):
+        content = json.loads(content)
+    out = []
+    def walk(v):
+        if isinstance(v, str):
+            out.append(_strip(v))
+        elif isinstance(v, dict):
+            for x in v.values():
+                walk(x)
+        elif isinstance(v, list):
+            for x in v:
+                walk(x)
+    walk(content)
+    return ' '.join(s for s in out if s)
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+    op.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+            kind UNINDEXED, ref_id UNINDEXED, collection_id UNINDEXED,
+            title, subtitle, body,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    """)
+    op.execute("DELETE FROM search_index")
+
+    insert = sa.text(
+        "INSERT INTO search_index (kind, ref_id, collection_id, title, subtitle, body) "
+        "VALUES (:k, :id, :cid, :t, :s, :b)"
+    )
+    rows = []
+    for id_, first, last, content, cid in bind.execute(sa.text(
+            "SELECT id, firstname, lastname, content, collection_id FROM characters")):
+        rows.append({'k': 'character', 'id': id_, 'cid': cid, 't': f'{first} {last}'.strip(),
+                     's': '', 'b': _fields(content)})
+    for id_, name, loc, desc, content, cid in bind.execute(sa.text(
+            "SELECT id, name, location, description, content, collection_id FROM places")):
+        rows.append({'k': 'place', 'id': id_, 'cid': cid, 't': name, 's': loc or '',
+                     'b': f'{_strip(desc)} {_fields(content)}'.strip()})
+    for id_, name, cat, desc, content, cid in bind.execute(sa.text(
+            "SELECT id, name, category, description, content, collection_id FROM items")):
+        rows.append({'k': 'item', 'id': id_, 'cid': cid, 't': name, 's': cat or '',
+                     'b': f'{_strip(desc)} {_fields(content)}'.strip()})
+    for id_, name, desc, content, cid in bind.execute(sa.text(
+            "SELECT id, name, description, content, collection_id FROM events")):
+        rows.append({'k': 'event', 'id': id_, 'cid': cid, 't': name, 's': '',
+                     'b': f'{_strip(desc)} {_fields(content)}'.strip()})
+    if rows:
+        bind.execute(insert, rows)
+
+    # chapitres : par lots pour ne pas charger tout le HTML d'un coup
+    result = bind.execution_options(stream_results=True).execute(sa.text(
+        "SELECT c.id, c.title, c.content, s.collection_id FROM chapters c "
+        "JOIN tomes t ON t.id = c.tome_id JOIN sagas s ON s.id = t.saga_id"))
+    while True:
+        batch = result.fetchmany(200)
+        if not batch:
+            break
+        bind.execute(insert, [{'k': 'chapter', 'id': id_, 'cid': cid, 't': title, 's': '', 'b': _strip(content)}
+                              for id_, title, content, cid in batch])
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP TABLE IF EXISTS search_index")
@@ -1,11 +1,44 @@
 // src/components/Editor/ChapterEditor.tsx
 import { useEffect, useRef, useState, useMemo } from 'react'
 import { Editor } from '@tinymce/tinymce-react'
-import { apiGet, apiPut } from '../../utils/fetcher'
+import { apiGet, apiPatch, apiPut } from '../../utils/fetcher'
 import AutocompletePopover, { type AcItem } from '../common/AutoCompletePopover'
 import { useTranslation } from '../../i18n'
 
-type Chapter = { id: string; title: string; content: string; position?: number }
+type Chapter = { id: string; title: string; content: string; position?: number; version?: string }
+
+// Op texte pour PATCH chapters/:id/ops (positions en unités UTF-16, comme String.length)
+type TextOp = { at: number; delete: number; insert: string }
+
+// Diff minimal : un seul remplacement entre le préfixe et le suffixe communs
+function diffOps(before: string, after: string): TextOp[] {
+  if (before === after) return []
+  const max = Math.min(before.length, after.length)
+  let start = 0
+  while (start < max && before.charCodeAt(start) === after.charCodeAt(start)) start++
+  if (start > 0 && (before.charCodeAt(start - 1) & 0xfc00) === 0xd800) start-- // ne pas couper une paire
+  let end = 0
+  while (end < max - start && before.charCodeAt(before.length - 1 - end) === after.charCodeAt(after.length - 1 - end)) end++
+  if (end > 0 && (before.charCodeAt(before.length - end) & 0xfc00) === 0xdc00) end--
+  return [{ at: start, delete: before.length - start - end, insert: after.slice(start, after.length - end) }]
+}
+
+function applyOps(text: string, ops: TextOp[]): string {
+  return ops.reduce((s, op) => s.slice(0, op.at) + op.insert + s.slice(op.at + op.delete), text)
+}
+
+// Nos ops (diff depuis la base) rejouées après celles d'un autre rédacteur (même base) ;
+// null si les deux modifications se recouvrent
+function rebaseOps(ours: TextOp[], theirs: TextOp[]): TextOp[] | null {
+  if (!ours.length || !theirs.length) return ours
+  const [o] = ours, [s] = theirs
+  if (o.at === s.at) return null
+  if (o.at + o.delete <= s.at) return ours
+  if (s.at + s.delete <= o.at) return [{ ...o, at: o.at + s.insert.length - s.delete }]
+  return null
+}
+
+const isConflict = (e: unknown) => e instanceof Error && e.message.startsWith('API 409')
 
 interface ChapterEditorProps {
   chapterId: string
@@ -27,6 +60,8 @@ export default function ChapterEditor({ chapterId, onSaved, collectionId: collec
   const [panelTab, setPanelTab] = useState<'notes'|'analytics'>('notes')
   const [annotations, setAnnotations] = useState<Record<string, AnnotationData>>({})
   const annotationsRef = useRef(annotations)
+  // dernier état connu du serveur : base des sauvegardes incrémentales
+  const savedRef = useRef<{ content: string; notes: string; annotations: string; version?: string } | null>(null)
   useEffect(() => { annotationsRef.current = annotations }, [annotations])
   const [annOpen, setAnnOpen] = useState(false)
   const [annMode, setAnnMode] = useState<'create'|'edit'>('create')
@@ -86,7 +121,7 @@ export default function ChapterEditor({ chapterId, onSaved, collectionId: collec
     useEffect(()=>{
       const collId = collectionIdRef.current
       const run = async () => {
-        if (!collId || (q || '').trim().length < 2) { setResults([]); return }
+        if (!collId || !(q || '').trim()) { setResults([]); return }
         setLoading(true)
         try {
           const rows: Suggestion[] = await apiGet(`collections/${collId}/autocomplete?q=${encodeURIComponent(q)}&limit=8`)
@@ -153,6 +188,12 @@ export default function ChapterEditor({ chapterId, onSaved, collectionId: collec
         const fromApiNotes   = (c as any).notes
         const fromLocalNotes = localStorage.getItem(`chapter:${chapterId}:notes`) || ''
         setNotes(typeof fromApiNotes === 'string' ? fromApiNotes : fromLocalNotes)
+        savedRef.current = {
+          content: c.content || '',
+          notes: typeof fromApiNotes === 'string' ? fromApiNotes : '',
+          annotations: JSON.stringify((c as any).annotations ?? []),
+          version: c.version,
+        }
       
         // NEW: annotations
         const fromApiAnn   = (c as any).annotations as AnnotationData[] | undefined
@@ -194,11 +235,52 @@ export default function ChapterEditor({ chapterId, onSaved, collectionId: collec
   }, [chapterId, collectionIdProp])
 
   // Sauvegarde (notes incluses) + fallback localStorage
+  // Envoie seulement le diff depuis la dernière version connue ; PUT complet si
+  // le chapitre n'a pas encore de version. Base périmée (409) : nos modifications
+  // sont rejouées sur la version du serveur, ou le conflit est soumis à l'auteur.
   const save = async () => {
     setSaving(true)
     try {
-      await apiPut(`chapters/${chapterId}`, { content, notes, annotations: Object.values(annotationsRef.current) }) // le backend peut ignorer "notes" si non pris en charge
-      localStorage.setItem(`chapter:${chapterId}:notes`, notes || '')
+      const annList = Object.values(annotationsRef.current)
+      const annJson = JSON.stringify(annList)
+      const base = savedRef.current
+      let saved = { content, notes, annotations: annJson }
+      let version: string | undefined
+      if (base?.version) {
+        const patch = (baseVersion: string, contentOps: TextOp[], notesOps: TextOp[]) => {
+          const body: Record<string, unknown> = { baseVersion, content: contentOps, notes: notesOps }
+          if (annJson !== base.annotations) body.annotations = annList
+          return apiPatch<{ version: string }>(`chapters/${chapterId}/ops`, body)
+        }
+        try {
+          version = (await patch(base.version, diffOps(base.content, content), diffOps(base.notes, notes))).version
+        } catch (e) {
+          if (!isConflict(e)) throw e
+          const server = await apiGet<Chapter>(`chapters/${chapterId}`)
+          const theirs = {
+            content: server.content || '',
+            notes: typeof (server as any).notes === 'string' ? (server as any).notes : '',
+            annotations: JSON.stringify((server as any).annotations ?? []),
+          }
+          const contentOps = rebaseOps(diffOps(base.content, content), diffOps(base.content, theirs.content))
+          const notesOps = rebaseOps(diffOps(base.notes, notes), diffOps(base.notes, theirs.notes))
+          if (contentOps && notesOps) {
+            saved = { ...saved, content: applyOps(theirs.content, contentOps), notes: applyOps(theirs.notes, notesOps) }
+            version = (await patch(server.version!, contentOps, notesOps)).version
+          } else if (confirm(t('editor.saveConflict'))) {
+            version = (await patch(server.version!, diffOps(theirs.content, content), diffOps(theirs.notes, notes))).version
+          } else {
+            saved = theirs
+            version = server.version
+          }
+          setContent(saved.content)
+          setNotes(saved.notes)
+        }
+      } else {
+        version = (await apiPut<Chapter>(`chapters/${chapterId}`, { content, notes, annotations: annList })).version
+      }
+      savedRef.current = { ...saved, version }
+      localStorage.setItem(`chapter:${chapterId}:notes`, saved.notes || '')
       localStorage.setItem(`chapter:${chapterId}:annotations`, JSON.stringify(Object.values(annotationsRef.current)))
       onSaved?.()
     } finally { setSaving(false) }
@@ -6,10 +6,6 @@ import {
 } from 'lucide-react'
 
 type Collection = { id:string; name:string }
-type Saga = { id:string; name:string }
-type Tome = { id:string; name:string }
-type ChapterMeta = { id:string; title:string; position?:number }
-type ChapterFull = ChapterMeta & { content:string }
 type EntityType = 'character'|'place'|'item'|'event'
 
 type ChapterRow = {
@@ -22,71 +18,15 @@ type ChapterRow = {
   position?:number
   wordCount:number
   entities:{ id:string; type:EntityType; label:string; count:number }[]
-  _html?: string
 }
-
-/* -------------------- Stopwords & utils texte -------------------- */
-const STOPWORDS_FR = new Set([
-  'a','à','â','afin','ai','aie','aient','ainsi','ait','alors','après','assez','au','aucun','aucune','aujourd','aujourd’hui','aupres','auquel','aura','aurai','auraient','aurais','aurait','auras','aurez','auriez','aurions','aurons','auront','aussi','autre','autres','aux','auxquelles','auxquels','avaient','avais','avait','avant','avec','avez','aviez','avions','avoir','avons','ayant','ayez','ayons',
-  'car','ce','ceci','cela','celle','celles','celui','cependant','certain','certaine','certaines','certains','ces','cet','cette','ceux','chacun','chaque','chez','ci','comme','comment','contre','d','dans','de','des','du','dedans','dehors','depuis','devant','doit','doivent','donc','dont','dos','droite','début','désormais',
-  'elle','elles','en','encore','ensuite','entre','envers','environ','est','et','etaient','etais','etait','etant','ete','etes','etre','eux',
-  'fait','faite','faites','fois','font','furent','fut',
-  'grande','grandes','grand','grands','haut','hors','ici','il','ils','je','jusqu','juste',
-  'l','la','le','les','leur','leurs','là','lequel','lesquels','lesquelles','lors','lui',
-  'ma','mais','mal','me','meme','mes','mien','mienne','miennes','miens','moi','moins','mon',
-  'ne','ni','nommés','nos','notre','nous','nouveaux','on','ont','ou','où',
-  'par','parce','parole','pas','pendant','personne','peu','peut','peuvent','peux','plus','plusieurs','plutôt','pour','pourquoi',
-  'pourra','pourrais','pourrait','pourrez','pourrions','pourront','près','puis','puisque',
-  'qu','quand','que','quel','quelle','quelles','quels','qui','quoi',
-  'sa','sans','se','sera','serai','seraient','serais','serait','seras','serez','seriez','serions','serons','seront','ses','seulement',
-  'si','sien','sienne','siennes','siens','soi','soit','sommes','son','sont','sous','souvent','sur',
-  'ta','tandis','tel','telle','telles','tels','tes','toi','ton','tous','tout','toute','toutes','trois','trop','très','tu',
-  'un','une','unes','uns','voici','voilà','vos','votre','vous','y'
-])
-
-function htmlToText(html:string):string {
-  const doc = new DOMParser().parseFromString(`<div>${html||''}</div>`, 'text/html')
-  return (doc.body?.textContent || '').replace(/\s+/g, ' ').trim()
-}
-function countWords(text:string):number {
-  if (!text) return 0
-  const tokens = text.toLowerCase().match(/[\p{L}\p{N}’']+/gu) || []
-  return tokens.length
-}
-function topWords(htmls:string[], limit=20){
-  const freq: Record<string,number> = {}
-  for (const html of htmls) {
-    const text = htmlToText(html).toLowerCase()
-    const tokens = text.match(/[\p{L}\p{N}’']+/gu) || []
-    for (const t of tokens) {
-      if (t.length < 3) continue
-      if (STOPWORDS_FR.has(t)) continue
-      freq[t] = (freq[t] || 0) + 1
-    }
-  }
-  return Object.entries(freq)
-    .sort((a,b)=> b[1]-a[1])
-    .slice(0, limit)
-    .map(([label, value]) => ({ label, value }))
-}
-function parseEntities(html:string){
-  const res: { id:string; type:EntityType; label:string }[] = []
-  try {
-    const doc = new DOMParser().parseFromString(`<div>${html||''}</div>`, 'text/html')
-    const spans = Array.from(doc.querySelectorAll('span.wv-entity')) as HTMLElement[]
-    for (const el of spans) {
-      const type = (el.getAttribute('data-entity-type') || '') as EntityType
-      const id   = el.getAttribute('data-entity-id') || ''
-      const label = (el.textContent || '').trim()
-      if (type && id) res.push({ id, type, label })
-    }
-  } catch {}
-  return res
-}
-function groupCounts<T extends string>(arr:T[]){
-  const m = new Map<T, number>()
-  for (const x of arr) m.set(x, (m.get(x)||0)+1)
-  return m
+type WordDatum = { label:string; value:number }
+type CollectionAnalytics = {
+  collectionId:string
+  totalWords:number
+  totalChapters:number
+  chapters:ChapterRow[]
+  topWords:WordDatum[]
+  topWordsByTome:Record<string, WordDatum[]>
 }
 
 /* -------------------- UI Helpers -------------------- */
@@ -232,6 +172,7 @@ export function AnalyticsPage({ projectId }:{ projectId:string }) {
   const [collectionId, setCollectionId] = useState<string>('')
   const [loading, setLoading] = useState(false)
   const [rows, setRows] = useState<ChapterRow[]>([])
+  const [vocab, setVocab] = useState<{ all:WordDatum[]; byTome:Record<string, WordDatum[]> }>({ all: [], byTome: {} })
   const [error, setError] = useState<string>('')
 
   // UI state
@@ -283,58 +224,12 @@ export function AnalyticsPage({ projectId }:{ projectId:string }) {
     setError('')
     setLoading(true)
     try {
-      const sagas = await apiGet<Saga[]>(`collections/${cid}/sagas`)
-      const allTomes: Tome[] = (await Promise.all(sagas.map(s => apiGet<Tome[]>(`sagas/${s.id}/tomes`)))).flat()
-      const tomeWithChapters = await Promise.all(allTomes.map(async (t) => {
-        const td = await apiGet<{ id:string; name:string; chapters:ChapterMeta[] }>(`tomes/${t.id}`)
-        return { tome: t, chapters: td.chapters || [], tomeName: td.name }
-      }))
-
-      // fetch chapitres en petits lots
-      const limit = 8
-      const chunks: ChapterMeta[][] = []
-      const allMeta = tomeWithChapters.flatMap(x => x.chapters)
-      for (let i=0; i<allMeta.length; i+=limit) chunks.push(allMeta.slice(i,i+limit))
-
-      const metaToFull = new Map<string, ChapterFull>()
-      for (const chunk of chunks) {
-        const data = await Promise.all(chunk.map(m => apiGet<ChapterFull>(`chapters/${m.id}`)))
-        for (const ch of data) metaToFull.set(ch.id, ch)
-      }
-
-      const out: ChapterRow[] = []
-      for (const twc of tomeWithChapters) {
-        for (const ch of twc.chapters) {
-          const full = metaToFull.get(ch.id)
-          const html = full?.content || ''
-          const text = htmlToText(html)
-          const wordCount = countWords(text)
-          const ents = parseEntities(html)
-
-          const counter = groupCounts(ents.map(e => `${e.type}:${e.id}`))
-          const byEntity = Array.from(counter.entries()).map(([k, count]) => {
-            const [type, id] = k.split(':') as [EntityType,string]
-            const anyLabel = ents.find(e => e.id === id && e.type === type)?.label || id
-            return { id, type, label: anyLabel, count }
-          })
-
-          out.push({
-            collectionId: cid,
-            sagaId: '',
-            tomeId: twc.tome.id,
-            tomeName: twc.tomeName || '',
-            chapterId: ch.id,
-            chapterTitle: full?.title || ch.title,
-            position: ch.position,
-            wordCount,
-            entities: byEntity.sort((a,b)=> b.count - a.count || a.label.localeCompare(b.label)),
-            _html: html,
-          })
-        }
-      }
-
+      // stats calculées côté serveur (un seul appel, pas de HTML rapatrié)
+      const data = await apiGet<CollectionAnalytics>(`collections/${cid}/analytics`)
+      const out = data.chapters
       out.sort((a,b) => a.tomeName.localeCompare(b.tomeName) || (a.position||0) - (b.position||0))
       setRows(out)
+      setVocab({ all: data.topWords, byTome: data.topWordsByTome })
       setTomeFilter('') // reset filtre tome à chaque collection
     } catch (e:any) {
       setError(e?.message || t('analytics.loadError'))
@@ -385,8 +280,8 @@ export function AnalyticsPage({ projectId }:{ projectId:string }) {
   }, [scopedRows])
 
   const topWordsScoped = useMemo(
-    () => topWords(scopedRows.map(r => r._html || ''), vocabLimit),
-    [scopedRows, vocabLimit]
+    () => (tomeFilter ? (vocab.byTome[tomeFilter] || []) : vocab.all).slice(0, vocabLimit),
+    [vocab, tomeFilter, vocabLimit]
   )
 
   function topEntities(type:EntityType, limit=12, src=scopedRows) {
@@ -1,6 +1,6 @@
 import { useEffect, useMemo, useState } from 'react'
 import type { ReactNode } from 'react'
-import { apiGet, apiPost, apiDelete } from '../../utils/fetcher'
+import { apiGet, apiPost, apiDelete, type Page } from '../../utils/fetcher'
 import { Plus, Trash2, Edit3 } from 'lucide-react'
 import { CharacterForm } from './CharacterForm'
 import TagFilterPopover from '../common/TagFilterPopover'
@@ -10,6 +10,8 @@ import { useTranslation } from '../../i18n'
 type Collection = { id: string; name: string }
 type Tag = { id: string; name: string; color?: string; note?: string }
 
+const PAGE_SIZE = 60
+
 export function CharactersPage({ projectId }: { projectId: string }) {
   const { t } = useTranslation()
   const [collections, setCollections] = useState<Collection[]>([])
@@ -18,6 +20,7 @@ export function CharactersPage({ projectId }: { projectId: string }) {
   const [tags, setTags] = useState<Tag[]>([])
   const [selectedTagIds, setSelectedTagIds] = useState<string[]>([])
   const [q, setQ] = useState('')
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
   const [cards, setCards] = useState<any[]>([])
 
   const [editingId, setEditingId] = useState<string | null>(null)
@@ -48,14 +51,17 @@ export function CharactersPage({ projectId }: { projectId: string }) {
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [collectionId, selectedTagIds, q, matchMode])
 
-  const fetchCharacters = async () => {
+  const fetchCharacters = async (cursor?: string) => {
     if (!collectionId) return
     const qs = new URLSearchParams()
     if (selectedTagIds.length) qs.set('tags', selectedTagIds.join(','))
     if (q.trim()) qs.set('query', q.trim())
     qs.set('match', matchMode)
-    const data = await apiGet<any[]>(`collections/${collectionId}/characters?${qs.toString()}`)
-    setCards(data)
+    qs.set('limit', String(PAGE_SIZE))
+    if (cursor) qs.set('cursor', cursor)
+    const data = await apiGet<Page<any>>(`collections/${collectionId}/characters?${qs.toString()}`)
+    setCards(prev => cursor ? [...prev, ...data.items] : data.items)
+    setNextCursor(data.nextCursor)
   }
 
   const createCharacter = async () => {
@@ -281,6 +287,12 @@ export function CharactersPage({ projectId }: { projectId: string }) {
         </div>
       )}
 
+      {nextCursor && (
+        <div className="flex justify-center">
+          <button onClick={() => fetchCharacters(nextCursor)} className="btn-secondary">{t('common.loadMore')}</button>
+        </div>
+      )}
+
       {/* VIEW */}
       {viewingId && (
         <CharacterView
@@ -180,6 +180,7 @@ export function ChronologyPage({ projectId }: { projectId: string }) {
     try {
       const qs = new URLSearchParams()
       if (q.trim()) qs.set('query', q.trim())
+      qs.set('fields', 'description') // utilisée pour le paragraphe par défaut
       const data = await apiGet<EventCard[]>(`collections/${collectionId}/events?${qs.toString()}`)
       setEvents(data)
     } finally {
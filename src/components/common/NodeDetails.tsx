@@ -20,6 +20,8 @@ type TomeDetail = {
   chapters: { id: string; title: string; position?: number }[]
 }
 
+type ExportJob = { id: string; status: 'queued'|'running'|'done'|'failed'; progress: number }
+
 export const NodeDetails = ({ selected, onRefreshHierarchy }: NodeDetailsProps) => {
   const { t } = useTranslation()
   const [data, setData] = useState<any>(null)
@@ -30,6 +32,7 @@ export const NodeDetails = ({ selected, onRefreshHierarchy }: NodeDetailsProps)
   // État pour renommer un chapitre
   const [isEditingTitle, setIsEditingTitle] = useState(false)
   const [draftTitle, setDraftTitle] = useState('')
+  const [exporting, setExporting] = useState<number | null>(null)
 
   const [viewingCharacterId, setViewingCharacterId] = useState<string|null>(null)
   const [viewingPlaceId, setViewingPlaceId] = useState<string|null>(null)
@@ -170,9 +173,30 @@ export const NodeDetails = ({ selected, onRefreshHierarchy }: NodeDetailsProps)
     setIsEditingTitle(false)
   }
 
+  // Rendu PDF en tâche de fond : création du job, suivi, puis téléchargement
   const exportPdf = async () => {
     if (!selected || selected.level !== 'tome') return
-    const res = await fetch(`/api/tomes/${selected.id}/export/pdf`, { credentials: 'include', headers: { Accept: 'application/pdf' } })
+    setExporting(0)
+    try {
+      const created = await fetch(`/api/tomes/${selected.id}/export/pdf/jobs`, { method: 'POST', credentials: 'include' })
+      if (!created.ok) { alert(t('nodeDetails.pdfFailed')); return }
+      let job: ExportJob = await created.json()
+      while (job.status === 'queued' || job.status === 'running') {
+        await new Promise((r) => setTimeout(r, 1000))
+        const res = await fetch(`/api/jobs/${job.id}`, { credentials: 'include' })
+        if (!res.ok) { alert(t('nodeDetails.pdfFailed')); return }
+        job = await res.json()
+        setExporting(job.progress)
+      }
+      if (job.status !== 'done') { alert(t('nodeDetails.pdfFailed')); return }
+      await downloadJob(job.id)
+    } finally {
+      setExporting(null)
+    }
+  }
+
+  const downloadJob = async (jobId: string) => {
+    const res = await fetch(`/api/jobs/${jobId}/download`, { credentials: 'include', headers: { Accept: 'application/pdf' } })
     if (!res.ok) { alert(t('nodeDetails.pdfFailed')); return }
     const blob = await res.blob()
     const url = URL.createObjectURL(blob)
@@ -202,8 +226,9 @@ export const NodeDetails = ({ selected, onRefreshHierarchy }: NodeDetailsProps)
           <div className="flex gap-2 sm:ml-auto">
             <button onClick={saveNode} className="btn-primary">{t('common.save')}</button>
             {isTome && (
-              <button onClick={exportPdf} className="btn-secondary inline-flex items-center gap-2">
+              <button onClick={exportPdf} className="btn-secondary inline-flex items-center gap-2" disabled={exporting !== null}>
                 <FileDown className="w-4 h-4" /> {t('nodeDetails.exportPdf')}
+                {exporting !== null && <span className="text-xs opacity-70">{Math.round(exporting * 100)}%</span>}
               </button>
             )}
             <button onClick={removeNode} className="btn-danger">{t('common.delete')}</button>
@@ -1,6 +1,6 @@
 import { useEffect, useMemo, useState, type ReactNode } from 'react'
 import { Plus, Trash2, Edit3 } from 'lucide-react'
-import { apiGet, apiPost, apiDelete } from '../../utils/fetcher'
+import { apiGet, apiPost, apiDelete, type Page } from '../../utils/fetcher'
 import TagFilterPopover from '../common/TagFilterPopover'
 import { EventsForm } from './EventsForm'
 import { EventView } from './EventView'
@@ -9,6 +9,8 @@ import { useTranslation } from '../../i18n'
 type Collection = { id: string; name: string }
 type Tag = { id: string; name: string; color?: string; note?: string }
 
+const PAGE_SIZE = 60
+
 export function EventsPage({ projectId }: { projectId: string }) {
   const { t } = useTranslation()
   const [collections, setCollections] = useState<Collection[]>([])
@@ -19,6 +21,7 @@ export function EventsPage({ projectId }: { projectId: string }) {
   const [q, setQ] = useState('')
   const [dateFrom, setDateFrom] = useState<string>('') // YYYY-MM-DD
   const [dateTo, setDateTo] = useState<string>('')     // YYYY-MM-DD
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
   const [cards, setCards] = useState<any[]>([])
 
   const [editingId, setEditingId] = useState<string | null>(null)
@@ -46,7 +49,7 @@ export function EventsPage({ projectId }: { projectId: string }) {
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [collectionId, selectedTagIds, q, dateFrom, dateTo, matchMode])
 
-  const fetchEvents = async () => {
+  const fetchEvents = async (cursor?: string) => {
     if (!collectionId) return
     const qs = new URLSearchParams()
     if (selectedTagIds.length) qs.set('tags', selectedTagIds.join(','))
@@ -54,8 +57,11 @@ export function EventsPage({ projectId }: { projectId: string }) {
     if (dateFrom) qs.set('from', dateFrom)
     if (dateTo) qs.set('to', dateTo)
     qs.set('match', matchMode)
-    const data = await apiGet<any[]>(`collections/${collectionId}/events?${qs.toString()}`)
-    setCards(data)
+    qs.set('limit', String(PAGE_SIZE))
+    if (cursor) qs.set('cursor', cursor)
+    const data = await apiGet<Page<any>>(`collections/${collectionId}/events?${qs.toString()}`)
+    setCards(prev => cursor ? [...prev, ...data.items] : data.items)
+    setNextCursor(data.nextCursor)
   }
 
   const todayISO = () => new Date().toISOString().slice(0, 10)
@@ -291,6 +297,12 @@ export function EventsPage({ projectId }: { projectId: string }) {
         </div>
       )}
 
+      {nextCursor && (
+        <div className="flex justify-center">
+          <button onClick={() => fetchEvents(nextCursor)} className="btn-secondary">{t('common.loadMore')}</button>
+        </div>
+      )}
+
       {/* VIEW */}
       {viewingId && (
         <EventView
@@ -1,7 +1,7 @@
 // src/components/places/PlacesPage.tsx
 import { useEffect, useMemo, useState } from 'react'
 import type { ReactNode } from 'react'
-import { apiGet, apiPost, apiDelete } from '../../utils/fetcher'
+import { apiGet, apiPost, apiDelete, type Page } from '../../utils/fetcher'
 import { Plus, Trash2, MapPin, Edit3 } from 'lucide-react'
 import TagFilterPopover from '../common/TagFilterPopover'
 import { useTranslation } from '../../i18n'
@@ -19,6 +19,8 @@ type Card = {
   tags: Tag[]
 }
 
+const PAGE_SIZE = 60
+
 export function PlacesPage({ projectId }: { projectId: string }) {
   const { t } = useTranslation()
   const [collections, setCollections] = useState<Collection[]>([])
@@ -27,6 +29,7 @@ export function PlacesPage({ projectId }: { projectId: string }) {
   const [tags, setTags] = useState<Tag[]>([])
   const [selectedTagIds, setSelectedTagIds] = useState<string[]>([])
   const [q, setQ] = useState('')
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
   const [cards, setCards] = useState<Card[]>([])
 
   const [editingId, setEditingId] = useState<string | null>(null)
@@ -55,14 +58,17 @@ export function PlacesPage({ projectId }: { projectId: string }) {
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [collectionId, selectedTagIds, q, matchMode])
 
-  const fetchPlaces = async () => {
+  const fetchPlaces = async (cursor?: string) => {
     if (!collectionId) return
     const qs = new URLSearchParams()
     if (selectedTagIds.length) qs.set('tags', selectedTagIds.join(','))
     if (q.trim()) qs.set('query', q.trim())
     qs.set('match', matchMode)
-    const data = await apiGet<Card[]>(`collections/${collectionId}/places?${qs.toString()}`)
-    setCards(data)
+    qs.set('limit', String(PAGE_SIZE))
+    if (cursor) qs.set('cursor', cursor)
+    const data = await apiGet<Page<Card>>(`collections/${collectionId}/places?${qs.toString()}`)
+    setCards(prev => cursor ? [...prev, ...data.items] : data.items)
+    setNextCursor(data.nextCursor)
   }
 
   const createPlace = async () => {
@@ -274,6 +280,12 @@ export function PlacesPage({ projectId }: { projectId: string }) {
         </div>
       )}
 
+      {nextCursor && (
+        <div className="flex justify-center">
+          <button onClick={() => fetchPlaces(nextCursor)} className="btn-secondary">{t('common.loadMore')}</button>
+        </div>
+      )}
+
       {/* VIEW */}
       {viewingId && (
         <PlaceView
@@ -24,6 +24,7 @@ export const translations = {
   'common.continue': { en: 'Continue →', fr: 'Continuer →' },
   'common.retry': { en: 'Retry', fr: 'Réessayer' },
   'common.noResult': { en: 'No results', fr: 'Aucun résultat' },
+  'common.loadMore': { en: 'Load more', fr: 'Afficher plus' },
   'common.tip': { en: 'Tip: use the sidebar to navigate between sections.', fr: 'Astuce : utilisez la barre latérale pour naviguer entre les sections.' },
   'common.ok': { en: 'OK', fr: 'OK' },
   'common.remove': { en: 'Remove', fr: 'Retirer' },
@@ -226,6 +227,7 @@ export const translations = {
   'editor.modeRender': { en: 'Mode: Render', fr: 'Mode : Rendu' },
   'editor.showNotes': { en: 'Show Notes & Analysis', fr: 'Afficher Notes & Analyse' },
   'editor.hideNotes': { en: 'Hide Notes & Analysis', fr: 'Masquer Notes & Analyse' },
+  'editor.saveConflict': { en: 'This chapter was modified elsewhere at the same place. OK: keep your version (replaces the other changes). Cancel: load the other version.', fr: 'Ce chapitre a été modifié ailleurs au même endroit. OK : garder votre version (remplace les autres modifications). Annuler : charger l’autre version.' },
   'editor.character': { en: 'Character', fr: 'Personnage' },
   'editor.place': { en: 'Place', fr: 'Lieu' },
   'editor.item': { en: 'Item', fr: 'Objet' },
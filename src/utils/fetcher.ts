@@ -1,5 +1,8 @@
 const API_BASE = 'http://10.1.106.20:5000/api'
 
+// Listes paginées (?limit=&cursor=) : nextCursor vaut null sur la dernière page
+export type Page<T> = { items: T[]; nextCursor: string | null }
+
 export async function apiFetch<T>(
   path: string,
   init?: Omit<RequestInit, 'body'> & { body?: unknown }
@@ -39,4 +42,5 @@ export async function apiFetch<T>(
 export const apiGet = <T>(path: string) => apiFetch<T>(path, { method: 'GET' })
 export const apiPost = <T>(path: string, body: unknown) => apiFetch<T>(path, { method: 'POST', body })
 export const apiPut = <T>(path: string, body: unknown) => apiFetch<T>(path, { method: 'PUT', body })
+export const apiPatch = <T>(path: string, body: unknown) => apiFetch<T>(path, { method: 'PATCH', body })
 export const apiDelete = (path: string) => apiFetch<void>(path, { method: 'DELETE' })
\ No newline at end of file
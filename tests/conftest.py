@@ -0,0 +1,23 @@
+import pytest
+from backend.app import create_app
+from backend.database import db
+
+
+@pytest.fixture
+def app(tmp_path):
+    """App sur une base SQLite temporaire (schéma créé par create_all)."""
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'wanvil.sqlite'}",
+        "EXPORT_DIR": str(tmp_path / "exports"),
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,77 @@
+"""Listes de personnages / lieux / objets / événements : nombre de requêtes SQL
+indépendant du nombre de lignes (tags chargés en une requête, pas de N+1)."""
+from datetime import date
+import pytest
+from sqlalchemy import event
+from backend.database import db
+from backend.models import Character, Collection, Event, Item, Place, Project, Tag
+
+
+def _character(i, collection_id):
+    return Character(firstname=f"Prénom{i}", lastname=f"Nom{i}", collection_id=collection_id)
+
+
+def _place(i, collection_id):
+    return Place(name=f"Lieu {i}", collection_id=collection_id)
+
+
+def _item(i, collection_id):
+    return Item(name=f"Objet {i}", collection_id=collection_id)
+
+
+def _event(i, collection_id):
+    return Event(name=f"Événement {i}", start_date=date(1000 + i, 1, 1), collection_id=collection_id)
+
+
+LISTS = [
+    ("characters", "character", _character),
+    ("places", "place", _place),
+    ("items", "item", _item),
+    ("events", "event", _event),
+]
+
+
+def _seed(path, scope, build, n):
+    """Collection de n entités portant chacune deux tags (sur trois)."""
+    project = Project(name=f"{path} x{n}")
+    collection = Collection(name="Collection", project=project)
+    db.session.add_all([project, collection])
+    db.session.flush()
+    tags = [Tag(collection_id=collection.id, name=f"tag {k}", scope=scope) for k in range(3)]
+    db.session.add_all(tags)
+    for i in range(n):
+        entity = build(i, collection.id)
+        entity.tags = [tags[i % 3], tags[(i + 1) % 3]]
+        db.session.add(entity)
+    db.session.commit()
+    return collection.id, tags
+
+
+def _count_queries(client, url):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return len(statements), response.get_json()
+
+
+@pytest.mark.parametrize("path, scope, build", LISTS, ids=[path for path, _s, _b in LISTS])
+def test_list_query_count_does_not_grow_with_rows(client, path, scope, build):
+    counts = {}
+    for n in (3, 60):
+        collection_id, tags = _seed(path, scope, build, n)
+        url = f"/api/collections/{collection_id}/{path}?limit=200"
+        for query in (url, f"{url}&tags={tags[0].id}"):
+            count, body = _count_queries(client, query)
+            assert all(len(row["tags"]) == 2 for row in body["items"])
+            counts.setdefault(query != url, []).append(count)
+        assert len(_count_queries(client, url)[1]["items"]) == n
+    for filtered, (small, large) in counts.items():
+        assert small == large, f"{path} (tags filter: {filtered}): {small} queries for 3 rows, {large} for 60"
@@ -0,0 +1,10 @@
+"""Requêtes principales des routes servies par un index (cf. backend/query_plans.py)."""
+import pytest
+from backend.query_plans import CHECKS, explain, problems
+
+
+@pytest.mark.parametrize("name", list(CHECKS))
+def test_query_plan(app, name):
+    build, is_sorted = CHECKS[name]
+    plan = explain(build())
+    assert not problems(plan, is_sorted), "\n".join(plan)